@@ -0,0 +1,252 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : pf_bench.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Timing benchmarks for the simulation engine. Results are
+#		written as JSON, and can be compared against a stored baseline to
+#		catch slowdowns, e.g.
+#
+#		python bench/pf_bench.py --output baseline.json
+#		python bench/pf_bench.py --compare baseline.json
+#
+###############################################################################
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'classes'))
+
+import accounts
+import simScenario
+import historySink
+from history import historyTable
+from datetime import date
+from numpy.random import default_rng
+import numpy
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import time
+
+###############################################################################
+#
+#	Benchmark Matrix
+#
+###############################################################################
+
+#horizons in years, number of loans and of investments, and ensemble sizes
+horizons = [1, 10, 40]
+accountCounts = [1, 10, 100]
+ensembleSizes = [100, 1000, 10000]
+ensembleHorizon = 10
+
+#smaller matrix for a quick check
+quickHorizons = [1, 10]
+quickAccountCounts = [1, 10]
+quickEnsembleSizes = [100, 1000]
+
+def buildScenario(years, nAccounts, expenseDOM):
+	#a household with nAccounts loans and nAccounts investments, two
+	#jobs and two expenses spent on expenseDOM (-1 for every day).
+	#Values are drawn from a fixed seed so every run times the same work
+	rng = default_rng(0)
+	scen = simScenario.simScenario()
+	scen.startDate = date(2018, 1, 1)
+	scen.endTime = 365*years
+	scen.initialCash = 20000.
+
+	for ind in range(nAccounts):
+		loan = accounts.loan()
+		loan.initialPrincipal = float(rng.uniform(1000., 50000.))
+		loan.interestRate = float(rng.uniform(2., 9.))
+		loan.minimumPayment = loan.initialPrincipal/120.
+		loan.paymentDOM = int(rng.integers(1, 29))
+		scen.addLoans([loan])
+
+		investment = accounts.investment()
+		investment.initialPrincipal = float(rng.uniform(1000., 50000.))
+		investment.interestRate = float(rng.uniform(2., 9.))
+		scen.addInvestments([investment])
+
+	for payDOM, salary in [(1, 90000.), (15, 60000.)]:
+		job = accounts.job()
+		job.payDOM = payDOM
+		job.initialSalary = salary
+		job.withholding = salary/12*0.2
+		scen.addJobs([job])
+
+	for mean in [30., 900.]:
+		expense = accounts.expense()
+		expense.mean = mean
+		expense.std = mean/10
+		expense.spendDOM = expenseDOM
+		scen.addExpenses([expense])
+	return scen
+
+def timeIt(function, repeat):
+	#best of repeat calls, in seconds
+	best = float('inf')
+	for ind in range(repeat):
+		start = time.perf_counter()
+		function()
+		best = min(best, time.perf_counter() - start)
+	return best
+
+###############################################################################
+#
+#	Benchmarks
+#
+###############################################################################
+
+def benchPropagate(horizons, accountCounts, repeat):
+	results = {}
+	for years in horizons:
+		for nAccounts in accountCounts:
+			for expenses, expenseDOM in [('daily', -1), ('monthly', 1)]:
+				scen = buildScenario(years, nAccounts, expenseDOM)
+				name = 'propagate/%dy/%daccounts/%s' % \
+					(years, nAccounts, expenses)
+				results[name] = timeIt(scen.propagate, repeat)
+	return results
+
+def benchEnsemble(ensembleSizes, accountCounts, repeat):
+	results = {}
+	for nPaths in ensembleSizes:
+		for nAccounts in accountCounts:
+			scen = buildScenario(ensembleHorizon, nAccounts, -1)
+			name = 'ensemble/%dy/%daccounts/%dpaths' % \
+				(ensembleHorizon, nAccounts, nPaths)
+			results[name] = timeIt(
+				lambda: scen.propagateEnsemble(nPaths, rng=default_rng(0)),
+				repeat)
+	return results
+
+def benchPayTaxes(repeat, nCalls=1000):
+	#payTaxes() for both jurisdictions, nCalls times
+	scen = buildScenario(1, 1, -1)
+	scen.initializeRun()
+	for job in scen.jobList:
+		job.currentYearToDatePay = job.initialSalary
+
+	def payTaxes():
+		for ind in range(nCalls):
+			scen.payTaxes('California')
+			scen.payTaxes('Federal')
+	return {'payTaxes/%dcalls' % nCalls: timeIt(payTaxes, repeat)}
+
+def benchRecording(repeat, nSteps=365*40, nFields=6):
+	#recording nSteps steps of nFields values, as one object of a run
+	#does, into each kind of history table
+	values = [1., 2., 3., 4., 5., 6.][:nFields]
+	fields = ['field' + str(ind) for ind in range(nFields)]
+	tables = {
+		'memory': lambda: historyTable(fields),
+		'memoryReserved': lambda: historyTable(fields, nSteps),
+		'null': lambda: historySink.lastValueTable(fields, fields)
+	}
+	results = {}
+	for kind in tables:
+		def record():
+			table = tables[kind]()
+			for ind in range(nSteps):
+				table.record(values)
+		results['record/%s/%dsteps' % (kind, nSteps)] = \
+			timeIt(record, repeat)
+	return results
+
+def runBenchmarks(quick=False, repeat=3):
+	'''!
+	Run every benchmark and return a dict of benchmark name to best
+	time in seconds.
+	'''
+	if quick:
+		matrix = (quickHorizons, quickAccountCounts, quickEnsembleSizes)
+	else:
+		matrix = (horizons, accountCounts, ensembleSizes)
+	results = {}
+	results.update(benchPropagate(matrix[0], matrix[1], repeat))
+	results.update(benchEnsemble(matrix[2], matrix[1], repeat))
+	results.update(benchPayTaxes(repeat))
+	results.update(benchRecording(repeat))
+	return results
+
+###############################################################################
+#
+#	Results
+#
+###############################################################################
+
+def machineInfo():
+	#what the results were measured on, so baselines from different
+	#machines aren't confused
+	try:
+		commit = subprocess.check_output(
+			['git', 'rev-parse', '--short', 'HEAD'],
+			cwd=os.path.dirname(os.path.abspath(__file__)),
+			stderr=subprocess.DEVNULL).decode().strip()
+	except:
+		commit = -1
+	return {
+		'date': datetime.datetime.now().isoformat(timespec='seconds'),
+		'commit': commit,
+		'python': platform.python_version(),
+		'numpy': numpy.__version__,
+		'machine': platform.machine(),
+		'processor': platform.processor(),
+		'system': platform.system()
+	}
+
+def loadResults(path):
+	#benchmark times from a file written by main()
+	with open(path) as f:
+		return json.load(f)['results']
+
+def compare(results, baseline, threshold=0.1):
+	'''!
+	Benchmarks more than threshold (a fraction) slower than baseline.
+	Returns a list of (name, baseline seconds, seconds, ratio), worst
+	first. Benchmarks missing from either side are skipped.
+	'''
+	regressions = []
+	for name in results:
+		if name not in baseline: continue
+		ratio = results[name]/baseline[name]
+		if ratio > 1 + threshold:
+			regressions.append((name, baseline[name], results[name], ratio))
+	return sorted(regressions, key=lambda x: -x[3])
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(
+		description='Time the simulation engine')
+	parser.add_argument('--output', default='bench_output.json',
+		help='file to write results to')
+	parser.add_argument('--compare', default=None,
+		help='baseline results file to flag regressions against')
+	parser.add_argument('--threshold', type=float, default=0.1,
+		help='fraction slower than baseline that counts as a regression')
+	parser.add_argument('--repeat', type=int, default=3,
+		help='runs of each benchmark, the best is kept')
+	parser.add_argument('--quick', action='store_true',
+		help='run a smaller matrix')
+	args = parser.parse_args(argv)
+
+	results = runBenchmarks(args.quick, args.repeat)
+	for name in sorted(results):
+		print('%-50s %10.4f s' % (name, results[name]))
+	with open(args.output, 'w') as f:
+		json.dump({'machine': machineInfo(), 'results': results},
+			f, indent=1, sort_keys=True)
+
+	if args.compare is None: return 0
+	baseline = loadResults(args.compare)
+	regressions = compare(results, baseline, args.threshold)
+	for name, before, after, ratio in regressions:
+		print('REGRESSION %-39s %10.4f s -> %.4f s (%.2fx)' %
+			(name, before, after, ratio))
+	if len(regressions) == 0: print('no regressions')
+	return int(len(regressions) > 0)
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,247 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : accountBook.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Struct of arrays store for a scenario's loans and
+#		investments, so that accrual and payments are whole array
+#		operations instead of a method call per account
+#
+###############################################################################
+from numpy import array, exp, minimum, vstack, zeros
+from history import historyView
+from historySink import memorySink, seriesName
+
+class bookField:
+	#descriptor for an account value that lives in an accountBook while
+	#the account is bound to one, and on the account itself otherwise.
+	#row is the name of the book array that holds it
+	def __init__(self, row):
+		self.row = row
+
+	def __set_name__(self, owner, name):
+		self.storage = '_' + name
+
+	def __get__(self, account, owner=None):
+		if account is None: return self
+		book = account.__dict__.get('book')
+		if book is None: return account.__dict__[self.storage]
+		return getattr(book, self.row)[account.bookIndex]
+
+	def __set__(self, account, value):
+		book = account.__dict__.get('book')
+		if book is None: account.__dict__[self.storage] = value
+		else: getattr(book, self.row)[account.bookIndex] = value
+
+class accountBook:
+	def __init__(self, loanList, investmentList, sink=None):
+		#sink is the historySink the book's history tables come from.
+		#A memorySink is used if none is given
+		self.loanList = list(loanList)
+		self.investmentList = list(investmentList)
+		nLoans = len(self.loanList)
+		nInvestments = len(self.investmentList)
+
+		#simCalendar of the run, which says how many payments fall in
+		#each step. See setCalendar()
+		self.calendar = None
+
+		#investments with a return model grow along a path drawn
+		#before the run instead. See setReturnPaths()
+		self.modelIndex = []
+		self.modelLogGrowth = zeros((0, 1))
+		self.modelStep = 0
+		self.refresh()
+
+		#current values. Each state array has one row per value, in
+		#the order of the account class's historyFields, so that a
+		#whole step is recorded with one write. The named rows are
+		#views into the state arrays
+		self.loanState = zeros((len(loanHistoryRows), nLoans))
+		self.investmentState = \
+			zeros((len(investmentHistoryRows), nInvestments))
+		self.viewRows()
+
+		if sink is None:
+			sink = memorySink()
+			sink.open(None)
+		self.loanHistory = self.sinkTable(
+			sink, 'loanList', self.loanList, loanHistoryRows)
+		self.investmentHistory = self.sinkTable(
+			sink, 'investmentList', self.investmentList,
+			investmentHistoryRows)
+
+	def sinkTable(self, sink, listName, accounts, rows):
+		#one table for every account in accounts. Fields are ordered
+		#like the raveled state array, and are named in the sink after
+		#the account history each one backs
+		fields = []
+		names = []
+		for row in range(len(rows)):
+			for ind, account in enumerate(accounts):
+				fields.append(rows[row] + str(ind))
+				names.append(seriesName(
+					listName, ind, account.historyFields[row]))
+		return sink.table(fields, names)
+
+	def viewRows(self):
+		for ind, row in enumerate(loanHistoryRows):
+			setattr(self, row, self.loanState[ind])
+		for ind, row in enumerate(investmentHistoryRows):
+			setattr(self, row, self.investmentState[ind])
+
+	def __getstate__(self):
+		#the named rows would be copied as arrays of their own, so they
+		#are left out of copies and pickles and made again from the
+		#state arrays
+		state = self.__dict__.copy()
+		for row in loanHistoryRows + investmentHistoryRows:
+			del state[row]
+		return state
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self.viewRows()
+
+	def refresh(self):
+		#read per account parameters. This is done when the book is
+		#built, and again if they change part way through a run
+		self.loanInterestRate = array(
+			[loan.interestRate for loan in self.loanList], dtype=float)
+		self.loanMinimumPayment = array(
+			[loan.minimumPayment for loan in self.loanList], dtype=float)
+		self.loanPaymentDOM = array(
+			[loan.paymentDOM for loan in self.loanList], dtype=int)
+		self.investmentInterestRate = array(
+			[investment.interestRate for investment in self.investmentList],
+			dtype=float)
+
+		#number of payments each loan is due in each step, as a
+		#(steps x loans) array, and whether any are due in each step
+		if self.calendar is None:
+			self.loanPaymentCounts = zeros((0, len(self.loanList)))
+		else:
+			self.loanPaymentCounts = \
+				zeros((len(self.calendar), len(self.loanList)))
+			for ind, dom in enumerate(self.loanPaymentDOM.tolist()):
+				self.loanPaymentCounts[:, ind] = self.calendar.count(dom)
+		self.loanPaymentSteps = self.loanPaymentCounts.any(axis=1).tolist()
+
+		#growth factors exp(r*t) for each step length seen so far
+		self.growthCache = {}
+
+	def setCalendar(self, calendar):
+		#calendar is the simCalendar of the steps the book will take
+		self.calendar = calendar
+		self.refresh()
+
+	def bind(self):
+		#make every account's current values views into this book.
+		#Current values are carried over, and each account's history
+		#becomes a view of its rows of the book's history
+		for accounts, rows, table in [
+			(self.loanList, loanHistoryRows, self.loanHistory),
+			(self.investmentList, investmentHistoryRows,
+				self.investmentHistory)]:
+			for ind, account in enumerate(accounts):
+				values = [getattr(account, current[row]) for row in rows]
+				account.book = self
+				account.bookIndex = ind
+				for row, value in zip(rows, values):
+					setattr(account, current[row], value)
+				account.history = historyView(table, dict(
+					(field, row + str(ind))
+					for field, row in zip(account.historyFields, rows)))
+
+	def unbind(self):
+		#copy current values back onto the accounts and detach them
+		for accounts, rows in [
+			(self.loanList, loanHistoryRows),
+			(self.investmentList, investmentHistoryRows)]:
+			for account in accounts:
+				values = [getattr(account, current[row]) for row in rows]
+				account.book = None
+				for row, value in zip(rows, values):
+					setattr(account, current[row], value.item())
+
+	def reserve(self, nSteps):
+		self.loanHistory.reserve(nSteps)
+		self.investmentHistory.reserve(nSteps)
+
+	def growth(self, stepLength):
+		if stepLength not in self.growthCache:
+			t = stepLength/365.
+			self.growthCache[stepLength] = (
+				exp(self.loanInterestRate/100.*t),
+				exp(self.investmentInterestRate/100.*t))
+		return self.growthCache[stepLength]
+
+	def accrue(self, stepLength):
+		# A = P*e^(rt), as in loan.accrue() and investment.accrue()
+		self.accrueLoans(stepLength)
+		self.accrueInvestments(stepLength)
+
+	def accrueLoans(self, stepLength):
+		newPrincipal = self.loanPrincipal*self.growth(stepLength)[0]
+		self.loanAccruedInterest[:] = newPrincipal - self.loanPrincipal
+		self.loanPrincipal[:] = newPrincipal
+		self.loanPayment[:] = 0
+
+	def setReturnPaths(self, indices, logGrowth):
+		#investments at indices grow along paths of cumulative log
+		#growth, one per investment, from returnModels. Element j+1 of
+		#a path is the growth through calendar step j
+		self.modelIndex = list(indices)
+		self.modelLogGrowth = vstack(logGrowth)
+		self.modelStep = 0
+
+	def accrueInvestments(self, stepLength, ind=None):
+		#ind is the calendar step being taken, needed only when some
+		#investments have a return model
+		growth = self.growth(stepLength)[1]
+		if len(self.modelIndex) > 0:
+			growth = growth.copy()
+			growth[self.modelIndex] = exp(
+				self.modelLogGrowth[:, ind + 1] - \
+				self.modelLogGrowth[:, self.modelStep])
+			self.modelStep = ind + 1
+		newPrincipal = self.investmentPrincipal*growth
+		self.investmentInterest[:] = \
+			newPrincipal - self.investmentPrincipal
+		self.investmentPrincipal[:] = newPrincipal
+
+	def payLoans(self, ind):
+		#pay the minimum on every loan for each payment due in calendar
+		#step ind, or the rest of the principal if that is less, as in
+		#loan.makePayment(). Returns the total paid, which the caller
+		#takes out of cash
+		if not self.loanPaymentSteps[ind]: return 0
+		payment = minimum(self.loanPrincipal,
+			self.loanPaymentCounts[ind]*self.loanMinimumPayment)
+		self.loanPrincipal -= payment
+		self.loanPayment += payment
+		return payment.sum()
+
+	def recordValues(self):
+		self.loanHistory.record(self.loanState.ravel())
+		self.investmentHistory.record(self.investmentState.ravel())
+
+	def resetInvestments(self):
+		#same as investment.resetCurrent() for every investment
+		self.investmentInterest[:] = 0
+		self.investmentContribution[:] = 0
+
+#rows of the state arrays, in the order of loan.historyFields and
+#investment.historyFields, and the account attribute each one backs
+loanHistoryRows = ['loanAccruedInterest', 'loanPayment', 'loanPrincipal']
+investmentHistoryRows = [
+	'investmentPrincipal', 'investmentInterest', 'investmentContribution']
+current = {
+	'loanAccruedInterest': 'currentAccruedInterest',
+	'loanPayment': 'currentPayment',
+	'loanPrincipal': 'currentPrincipal',
+	'investmentPrincipal': 'currentPrincipal',
+	'investmentInterest': 'currentInterest',
+	'investmentContribution': 'currentContribution'
+}
@@ -7,14 +7,31 @@
 #	Synopsis: Vehicle portion of the explorer object model
 # 
 ###############################################################################
-from numpy import hstack, exp, array
+from numpy import exp, array
 from datetime import date
-from numpy.random import normal
+from math import sqrt
+from numpy.random import default_rng
+from history import historyTable
+from accountBook import bookField
+import amortization
+import returnModels
+import datetime
 import sys
-import pdb
 sys.path.insert(0, 'util')
 
 class investment:
+	historyFields = [
+		'principalHistory', 'interestHistory', 'contributionHistory']
+	configFields = [
+		'name', 'interestRate', 'contributionDOM', 'taxed',
+		'initialPrincipal', 'returnModel']
+
+	#while the investment is in a running scenario these live in the
+	#scenario's accountBook
+	currentPrincipal = bookField('investmentPrincipal')
+	currentInterest = bookField('investmentInterest')
+	currentContribution = bookField('investmentContribution')
+
 	def __init__(self):
 		self.name = -1
 		self.interestRate = -1
@@ -22,6 +39,10 @@ class investment:
 		self.taxed = -1
 		self.initialPrincipal = 0
 
+		#random return model from returnModels.py. If None the
+		#investment grows at interestRate
+		self.returnModel = None
+
 		#use reset methods to initialize values and history arrays
 		self.resetCurrent(resetPrincipal=1)
 		self.resetHistory()
@@ -40,28 +61,28 @@ class investment:
 		self.principalHistory = []
 		self.interestHistory = []
 		self.contributionHistory = []
+		self.history = historyTable(self.historyFields)
 	def resetChildren(self):
 		pass
 
 	def recordValues(self):
-		self.principalHistory = hstack([
-			self.principalHistory, self.currentPrincipal])
-		self.interestHistory = hstack([
-			self.interestHistory, self.currentInterest])
-		self.contributionHistory = hstack([
-			self.contributionHistory, self.currentContribution])
+		self.history.record([
+			self.currentPrincipal,
+			self.currentInterest,
+			self.currentContribution])
 
 	def recordFinalValues(self):
-		self.finalPrincipal = self.principalHistory[-1]
-		self.finalInterest = self.interestHistory[-1]
-		self.finalContribution = self.contributionHistory[-1]
+		self.history.publish(self)
+		self.finalPrincipal = self.history.last('principalHistory')
+		self.finalInterest = self.history.last('interestHistory')
+		self.finalContribution = self.history.last('contributionHistory')
 
 	def accrue(self):
 		# A = P*e^(rt)
 		# A = P*(1+r/n)^(nt))
 		P = self.currentPrincipal
 		r = self.interestRate/100.
-		t = self.simScenario.timeStep/365.
+		t = self.simScenario.currentStepLength/365.
 
 		newPrincipal = P*exp(r*t)
 		self.currentInterest = newPrincipal - self.currentPrincipal 
@@ -73,9 +94,23 @@ class investment:
 		self.simScenario.currentCash -= amount
 
 class loan:
+	historyFields = [
+		'accruedInterestHistory', 'paymentHistory', 'principalHistory']
+	configFields = [
+		'name', 'interestRate', 'initialPrincipal', 'minimumPayment',
+		'paymentDOM']
+
+	#while the loan is in a running scenario these live in the
+	#scenario's accountBook
+	currentAccruedInterest = bookField('loanAccruedInterest')
+	currentPayment = bookField('loanPayment')
+	currentPrincipal = bookField('loanPrincipal')
+
 	def __init__(self):
 		self.name = -1
 		self.interestRate = -1
+		self.minimumPayment = 0
+		self.paymentDOM = 1
 		#Initial values
 		self.initialPrincipal = 0
 		#use reset methods to initialize values and history arrays
@@ -99,14 +134,22 @@ class loan:
 		self.accruedInterestHistory = []
 		self.paymentHistory = []
 		self.principalHistory = []
+		self.history = historyTable(self.historyFields)
 
 	def resetChildren(self):
 		pass
 
+	def recordValues(self):
+		self.history.record([
+			self.currentAccruedInterest,
+			self.currentPayment,
+			self.currentPrincipal])
+
 	def recordFinalValues(self):
-		self.finalAccruedInterest = self.accruedInterestHistory[-1]
-		self.finalPayment = self.paymentHistory[-1]
-		self.finalPrincipal = self.principalHistory[-1]
+		self.history.publish(self)
+		self.finalAccruedInterest = self.history.last('accruedInterestHistory')
+		self.finalPayment = self.history.last('paymentHistory')
+		self.finalPrincipal = self.history.last('principalHistory')
 
 	def accrue(self):
 		# A = P*e^(rt)
@@ -115,21 +158,41 @@ class loan:
 		self.currentPayment = 0
 		P = self.currentPrincipal
 		r = self.interestRate/100.
-		t = self.simScenario.timeStep/365.
+		t = self.simScenario.currentStepLength/365.
 		newPrincipal = P*exp(r*t)
 		self.currentAccruedInterest = \
 			newPrincipal - P
 		self.currentPrincipal = newPrincipal
 
+	def amortize(self,extraPayment=0,**kwargs):
+		#month by month payoff schedule for this loan paying
+		#minimumPayment + extraPayment. extraPayment may be an array
+		#to compare many payment levels at once. The schedule starts
+		#at the loan's scenario start unless startDate is given
+		try:
+			startDate = kwargs['startDate']
+		except:
+			startDate = self.simScenario.startDate + \
+				datetime.timedelta(self.simScenario.startTime)
+		try:
+			maxMonths = kwargs['maxMonths']
+		except:
+			maxMonths = 1200
+		return amortization.amortize(
+			self.initialPrincipal,
+			self.interestRate,
+			self.minimumPayment + extraPayment,
+			startDate,
+			maxMonths,
+			self.paymentDOM)
+
 	def makePayment(self,**kwargs):
 		try:
 			amt = kwargs['amt']
 		except:
 			amt = self.minimumPayment
 
-		paymentDOM = 1
-
-		if self.simScenario.currentDate.day == 1:
+		if self.simScenario.currentDay == self.paymentDOM:
 			if self.currentPrincipal > amt:
 				self.currentPrincipal -= amt
 				self.simScenario.currentCash -= amt
@@ -140,6 +203,13 @@ class loan:
 				self.currentPrincipal = 0
 
 class job:
+	historyFields = [
+		'salaryHistory', 'IRAContributionHistory',
+		'_401kContributionHistory', 'monthlyPayHistory',
+		'withheldTaxHistory', 'yearToDatePayHistory']
+	configFields = [
+		'name', 'payDOM', 'withholding', 'initialSalary']
+
 	def __init__(self):
 		self.name = -1
 		self.payDOM = -1
@@ -159,9 +229,16 @@ class job:
 		except:
 			pass
 
+		self.currentMonthlyPay = 0
+
+		#year to date values carry from step to step until taxes are
+		#paid, so the main loop clears them with resetYearToDate=0
+		try:
+			if kwargs['resetYearToDate'] == 0: return
+		except:
+			pass
 		self.currentIRAContributions = 0
 		self.current401kContributions = 0
-		self.currentMonthlyPay = 0
 		self.currentWithheldTax = 0
 		self.currentYearToDatePay = 0
 
@@ -173,43 +250,46 @@ class job:
 		self.monthlyPayHistory = []
 		self.withheldTaxHistory = []
 		self.yearToDatePayHistory = []
+		self.history = historyTable(self.historyFields)
 
 	def resetChildren(self):
 		self.retirementAccounts = []
 
 	def recordValues(self):
-		self.salaryHistory = hstack([
-			self.salaryHistory, self.currentSalary])
-		self.IRAContributionHistory = hstack([
-			self.IRAContributionHistory, self.currentIRAContributions])
-		self._401kContributionHistory = hstack([
-			self._401kContributionHistory, self.current401kContributions])
-		self.monthlyPayHistory = hstack([
-			self.monthlyPayHistory, self.currentMonthlyPay])
-		self.withheldTaxHistory = hstack([
-			self.withheldTaxHistory, self.currentWithheldTax])
-		self.yearToDatePayHistory = hstack([
-			self.yearToDatePayHistory, self.currentYearToDatePay])
+		self.history.record([
+			self.currentSalary,
+			self.currentIRAContributions,
+			self.current401kContributions,
+			self.currentMonthlyPay,
+			self.currentWithheldTax,
+			self.currentYearToDatePay])
 
 	def recordFinalValues(self):
-		self.finalSalary = self.salaryHistory[-1]
-		self.finalIRAContributions = self.IRAContributionHistory[-1]
-		self.final401kContributions = self._401kContributionHistory[-1]
-		self.finalMonthlyPay = self.monthlyPayHistory[-1]
-		self.finalWithheldTax = self.withheldTaxHistory[-1]
-		self.finalYearToDatePay = self.yearToDatePayHistory[-1]
-
-
-
-	def payday(self):
-		if self.simScenario.currentDate.day == self.payDOM:
-			self.currentMonthlyPay = self.currentSalary/12
+		self.history.publish(self)
+		self.finalSalary = self.history.last('salaryHistory')
+		self.finalIRAContributions = self.history.last('IRAContributionHistory')
+		self.final401kContributions = self.history.last('_401kContributionHistory')
+		self.finalMonthlyPay = self.history.last('monthlyPayHistory')
+		self.finalWithheldTax = self.history.last('withheldTaxHistory')
+		self.finalYearToDatePay = self.history.last('yearToDatePayHistory')
+
+
+
+	def payday(self,count=None):
+		#count is the number of paydays in the step being taken, from
+		#simCalendar.count(). Without it the job is paid if today is
+		#its payDOM
+		if count is None:
+			count = int(self.simScenario.currentDay == self.payDOM)
+		if count > 0:
+			self.currentMonthlyPay = count*self.currentSalary/12
 			self.currentYearToDatePay += self.currentMonthlyPay
-			#pay taxes
-			self.withhold()
+			for payday in range(count):
+				#pay taxes
+				self.withhold()
 
-			#pay to 401k account
-			self.contribute()
+				#pay to 401k account
+				self.contribute()
 
 			self.simScenario.currentCash += self.currentMonthlyPay
 
@@ -235,20 +315,51 @@ class job:
 
 
 class expense:
+	historyFields = ['spendHistory']
+	configFields = ['name', 'spendDOM', 'mean', 'std']
+
+	#most standard normal draws made at once. A run draws for all of
+	#its spending days up front if there are no more than this
+	drawBlockSize = 65536
+
 	def __init__(self):
 		self.name = -1
 		self.spendDOM = -1
 
+		#this expense's own random stream. A scenario replaces it
+		#with one spawned from its seed at the start of each run
+		self.rng = default_rng()
+
 		#use reset methods to initialize values and history arrays
 		self.resetCurrent()
+		self.resetDraws()
 		self.resetHistory()
 
-	def spend(self):
-		if self.spendDOM == -1:
-			self.currentSpend = normal(self.mean,self.std)
-			self.simScenario.currentCash -= self.currentSpend		
-		elif self.simScenario.currentDate.day == self.spendDOM :
-			self.currentSpend = normal(self.mean,self.std)
+	def resetDraws(self,nDraws=0):
+		#draw nDraws standard normals up front, e.g. one for every
+		#day this expense will spend on in a run
+		self.draws = self.rng.standard_normal(nDraws)
+		self.drawIndex = 0
+
+	def draw(self,n=1):
+		#next amount spent, totalled over n independent spending days
+		#with a single draw. Draws are scaled as they are used so that
+		#changes to mean and std take effect immediately
+		if self.drawIndex == len(self.draws):
+			self.resetDraws(self.drawBlockSize)
+		z = self.draws[self.drawIndex]
+		self.drawIndex += 1
+		return n*self.mean + self.std*sqrt(n)*z
+
+	def spend(self,count=None):
+		#count is the number of spending days in the step being taken,
+		#from simCalendar.count(). Without it this expense spends
+		#daily (spendDOM = -1) or if today is its spendDOM
+		if count is None:
+			count = int(self.spendDOM == -1 or \
+				self.simScenario.currentDay == self.spendDOM)
+		if count > 0:
+			self.currentSpend = self.draw(count)
 			self.simScenario.currentCash -= self.currentSpend
 		else:
 			self.currentSpend = 0
@@ -258,13 +369,14 @@ class expense:
 
 	def resetHistory(self):
 		self.spendHistory = []
+		self.history = historyTable(self.historyFields)
 
 	def recordValues(self):
-		self.spendHistory = hstack([
-			self.spendHistory, self.currentSpend])
+		self.history.record([self.currentSpend])
 
 	def recordFinalValues(self):
-		self.finalSpend = self.spendHistory[-1]
+		self.history.publish(self)
+		self.finalSpend = self.history.last('spendHistory')
 
 	def resetChildren(self):
 		pass
@@ -283,6 +395,33 @@ class home:
 		self.valueHistory = []
 
 		#lists of objects belonging to home object
-		
 
 
+###############################################################################
+#
+#	Account configurations are plain dicts of the values listed in each
+#	class's configFields. They carry no history and no reference back to
+#	the simScenario, so they are cheap to pickle or write to a file
+#
+###############################################################################
+
+def getConfig(account):
+	config = {}
+	for field in account.configFields:
+		if not hasattr(account, field): continue
+		value = getattr(account, field)
+		#numpy scalars become plain python numbers, and return
+		#models become dicts
+		if hasattr(value, 'item'): value = value.item()
+		if hasattr(value, 'getConfig'): value = value.getConfig()
+		config[field] = value
+	return config
+
+def fromConfig(accountClass, config):
+	account = accountClass()
+	for field in config:
+		value = config[field]
+		if field == 'returnModel' and value is not None:
+			value = returnModels.fromConfig(value)
+		setattr(account, field, value)
+	return account
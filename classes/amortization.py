@@ -0,0 +1,165 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : amortization.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Month stepped loan amortization. Uses the same continuous
+#		accrual and payment rules as accounts.loan, evaluated for many
+#		loans or payment levels at once
+#
+###############################################################################
+from numpy import arange, array, broadcast_arrays, clip, cumsum, datetime64
+from numpy import diff, empty, exp, full, minimum, put_along_axis
+from numpy import take_along_axis, zeros
+
+class amortizationSchedule:
+	def __init__(self):
+		#dates payments are made on, shape (months,)
+		self.dates = []
+
+		#schedule table. Each is (months,) + the broadcast shape of the
+		#inputs. principal is the balance left after that month's payment
+		self.interest = []
+		self.payment = []
+		self.principal = []
+
+		#summaries, one per loan. monthsToPayoff is -1 and payoffDate
+		#is NaT for loans that are not paid off within maxMonths
+		self.monthsToPayoff = -1
+		self.payoffDate = -1
+		self.totalInterest = -1
+		self.totalPayment = -1
+
+def paymentDates(startDate, nMonths, paymentDOM=1):
+	#loans are paid on paymentDOM. The first payment is on the first
+	#paymentDOM after startDate, since the simulation's first day is
+	#startDate + 1. Months too short to have paymentDOM are skipped,
+	#as they are in the daily simulation
+	months = datetime64(startDate, 'M') + arange(2*nMonths + 2)
+	dates = months.astype('datetime64[D]') + (paymentDOM - 1)
+	valid = (dates.astype('datetime64[M]') == months) & \
+		(dates > datetime64(startDate, 'D'))
+	return dates[valid][:nMonths]
+
+def amortize(
+	principal, interestRate, payment, startDate, maxMonths=1200,
+	paymentDOM=1):
+	'''!
+	Amortize loans of principal at interestRate (percent, continuously
+	compounded as in loan.accrue()) paying payment on day paymentDOM of
+	every month after startDate. Each of principal, interestRate and payment may
+	be a scalar or an array; they are broadcast together so that many
+	loans or payment levels are evaluated in one call. Returns an
+	amortizationSchedule.
+	'''
+	principal, interestRate, payment = broadcast_arrays(
+		array(principal, dtype=float),
+		array(interestRate, dtype=float),
+		array(payment, dtype=float))
+	shape = principal.shape
+	dates = paymentDates(startDate, maxMonths, paymentDOM)
+	days = diff(dates, prepend=datetime64(startDate, 'D')).astype(float)
+	r = interestRate/100.
+
+	interestTable = zeros((maxMonths,) + shape)
+	paymentTable = zeros((maxMonths,) + shape)
+	principalTable = zeros((maxMonths,) + shape)
+	monthsToPayoff = full(shape, -1)
+
+	P = principal.copy()
+	nMonths = 0
+	for month in range(maxMonths):
+		newPrincipal = P*exp(r*days[month]/365.)
+		interestTable[month] = newPrincipal - P
+		paid = minimum(newPrincipal, payment)
+		P = newPrincipal - paid
+		paymentTable[month] = paid
+		principalTable[month] = P
+		nMonths = month + 1
+
+		monthsToPayoff[(P == 0) & (monthsToPayoff == -1)] = nMonths
+		if not P.any(): break
+
+	schedule = amortizationSchedule()
+	schedule.dates = dates[:nMonths]
+	schedule.interest = interestTable[:nMonths]
+	schedule.payment = paymentTable[:nMonths]
+	schedule.principal = principalTable[:nMonths]
+	schedule.monthsToPayoff = monthsToPayoff
+	schedule.payoffDate = empty(shape, dtype='datetime64[D]')
+	schedule.payoffDate[...] = 'NaT'
+	paidOff = monthsToPayoff > 0
+	schedule.payoffDate[paidOff] = dates[monthsToPayoff[paidOff] - 1]
+	schedule.totalInterest = schedule.interest.sum(axis=0)
+	schedule.totalPayment = schedule.payment.sum(axis=0)
+	return schedule
+
+def amortizeLoans(
+	principal, interestRate, minimumPayment, surplus, order,
+	startDate, maxMonths=1200, paymentDOM=1):
+	'''!
+	Pay off several loans together under many allocation policies at
+	once. Each loan is paid on its own paymentDOM (a scalar or one per
+	loan) and accrues between its payments as in amortize(). Month m is
+	the m'th payment of every loan, at which each is paid its
+	minimumPayment. What is left of the monthly budget, i.e. surplus plus
+	the minimums of loans already paid off, goes to the loans in priority
+	order. order is a (policies x loans) array of loan indices, highest
+	priority first. Returns an amortizationSchedule with summaries shaped
+	(policies x loans) and no per month table.
+	'''
+	principal = array(principal, dtype=float)
+	r = array(interestRate, dtype=float)/100.
+	minimumPayment = array(minimumPayment, dtype=float)
+	order = array(order)
+	nPolicies, nLoans = order.shape
+	budget = minimumPayment.sum() + surplus
+
+	#(months x loans) payment dates and days since each loan's last
+	#payment
+	paymentDOM = zeros(nLoans, dtype=int) + array(paymentDOM)
+	dates = array([paymentDates(startDate, maxMonths, dom)
+		for dom in paymentDOM]).T
+	days = diff(dates, axis=0,
+		prepend=datetime64(startDate, 'D')).astype(float)
+
+	P = zeros((nPolicies, nLoans)) + principal
+	totalInterest = zeros((nPolicies, nLoans))
+	totalPayment = zeros((nPolicies, nLoans))
+	monthsToPayoff = full((nPolicies, nLoans), -1)
+
+	for month in range(maxMonths):
+		newPrincipal = P*exp(r*days[month]/365.)
+		totalInterest += newPrincipal - P
+		P = newPrincipal
+
+		paid = minimum(P, minimumPayment)
+		P -= paid
+
+		#hand out the rest of the budget in priority order. Each loan
+		#gets whatever is left after the loans ahead of it are cleared
+		extra = budget - paid.sum(axis=1)
+		ordered = take_along_axis(P, order, axis=1)
+		ahead = cumsum(ordered, axis=1) - ordered
+		allocated = clip(extra[:, None] - ahead, 0, ordered)
+		put_along_axis(P, order, ordered - allocated, axis=1)
+		allocation = zeros((nPolicies, nLoans))
+		put_along_axis(allocation, order, allocated, axis=1)
+		totalPayment += paid + allocation
+
+		monthsToPayoff[(P == 0) & (monthsToPayoff == -1)] = month + 1
+		if not P.any(): break
+
+	schedule = amortizationSchedule()
+	schedule.monthsToPayoff = monthsToPayoff
+	schedule.payoffDate = empty((nPolicies, nLoans), dtype='datetime64[D]')
+	schedule.payoffDate[...] = 'NaT'
+	paidOff = monthsToPayoff > 0
+	loanIndex = zeros((nPolicies, nLoans), dtype=int) + arange(nLoans)
+	schedule.payoffDate[paidOff] = \
+		dates[monthsToPayoff[paidOff] - 1, loanIndex[paidOff]]
+	schedule.totalInterest = totalInterest
+	schedule.totalPayment = totalPayment
+	return schedule
+
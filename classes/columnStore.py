@@ -0,0 +1,127 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : columnStore.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Export a propagated scenario as a directory of history
+#		columns, and load it back with the columns memory mapped so that
+#		only the series and dates that are used get read
+#
+###############################################################################
+from numpy import array, empty, memmap, searchsorted
+from historySink import seriesName, writeManifest
+import simScenario
+import datetime
+import json
+import os
+
+def historyOwners(scen):
+	#(object, series names) for the scenario and each of its accounts,
+	#named as a historySink names them
+	owners = [(scen, list(scen.historyFields))]
+	for listName in ['loanList', 'investmentList', 'jobList', 'expenseList']:
+		for ind, owner in enumerate(getattr(scen, listName)):
+			owners.append((owner,
+				[seriesName(listName, ind, x) for x in owner.historyFields]))
+	return owners
+
+def exportScenario(scen, directory):
+	'''!
+	Write every *History of a propagated scenario to directory, one file
+	of raw little endian float64 values per series, plus a manifest.json
+	holding the scenario's config. This is the same layout a
+	historySink.diskSink writes, so a run recorded to disk doesn't need
+	exporting.
+	'''
+	os.makedirs(directory, exist_ok=True)
+	columns = {}
+	for owner, names in historyOwners(scen):
+		for field, name in zip(owner.historyFields, names):
+			path = os.path.join(directory, name + '.f8')
+			values = getattr(owner, field)
+			#histories that are already memmaps of this file are
+			#left alone, since rewriting would truncate them
+			if getattr(values, 'filename', None) != os.path.abspath(path):
+				array(values, dtype='<f8').tofile(path)
+			columns[name] = {'file': name + '.f8', 'length': len(values)}
+	writeManifest(directory, scen.getConfig(), columns)
+
+class columnArchive:
+	#read only access to a directory written by exportScenario() or a
+	#diskSink. Nothing is read until a column is used
+	def __init__(self, directory):
+		self.directory = directory
+		with open(os.path.join(directory, 'manifest.json')) as f:
+			self.manifest = json.load(f)
+		self.config = self.manifest['config']
+		self.startDate = \
+			datetime.date.fromisoformat(self.config['startDate'])
+		self.columns = self.manifest['columns']
+
+	def names(self):
+		return sorted(self.columns)
+
+	def column(self, name):
+		column = self.columns[name]
+		if column['length'] == 0: return empty(0)
+		return memmap(os.path.join(self.directory, column['file']),
+			dtype=self.manifest['dtype'], mode='r',
+			shape=(column['length'],))
+
+	def stepRange(self, startDate=None, endDate=None):
+		#slice of the steps taken from startDate through endDate. Only
+		#the time column is read
+		time = self.column('timeHistory')
+		start = 0
+		end = len(time)
+		if startDate is not None:
+			start = searchsorted(
+				time, (startDate - self.startDate).days, 'left')
+		if endDate is not None:
+			end = searchsorted(
+				time, (endDate - self.startDate).days, 'right')
+		return slice(int(start), int(end))
+
+	def select(self, name, startDate=None, endDate=None):
+		'''!
+		Values of series name from startDate through endDate, as a view
+		of the memmapped column.
+		'''
+		return self.column(name)[self.stepRange(startDate, endDate)]
+
+class archiveTable:
+	#the rows of a columnArchive that belong to one object, standing in
+	#for its historyTable so that recordFinalValues() works unchanged
+	def __init__(self, archive, fields, names, steps):
+		self.archive = archive
+		self.fields = list(fields)
+		self.names = dict(zip(fields, names))
+		self.steps = steps
+		#number of steps in range, as historyTable.length
+		self.length = len(self.column(self.fields[0]))
+
+	def column(self, field):
+		return self.archive.column(self.names[field])[self.steps]
+
+	def last(self, field):
+		return self.column(field)[-1]
+
+	def publish(self, owner):
+		for field in self.fields:
+			setattr(owner, field, self.column(field))
+
+def importScenario(directory, startDate=None, endDate=None):
+	'''!
+	Rebuild a scenario written by exportScenario() or a diskSink. Every
+	*History is a memmap of its column limited to startDate through
+	endDate, and final values are the last ones in that range.
+	'''
+	archive = columnArchive(directory)
+	scen = simScenario.fromConfig(archive.config)
+	steps = archive.stepRange(startDate, endDate)
+	for owner, names in historyOwners(scen):
+		owner.history = \
+			archiveTable(archive, owner.historyFields, names, steps)
+		owner.recordFinalValues()
+	return scen
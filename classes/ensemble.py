@@ -0,0 +1,399 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : ensemble.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Vectorized Monte Carlo engine. Propagates many paths of a
+#		simScenario at once, with every path's cash and account values
+#		held in arrays. Account values are (accounts x paths) while
+#		running, so each account's paths are contiguous, and are handed
+#		back as (paths x accounts)
+#
+###############################################################################
+from numpy import zeros, empty, exp, array, repeat, minimum, sqrt
+from numpy import concatenate, diff
+from numpy.random import default_rng
+from quasiRandom import variateSampler
+from returnModels import lognormalReturn
+
+class ensembleResult:
+	def __init__(self, nPaths):
+		self.nPaths = nPaths
+		self.loanNames = []
+		self.investmentNames = []
+		self.expenseNames = []
+
+		#final values. Scalars per path are shape (paths,), per account
+		#values are shape (paths x accounts)
+		self.finalTime = -1
+		self.finalCash = -1
+		self.finalLoanPrincipal = -1
+		self.finalInvestmentPrincipal = -1
+		#lowest cash of each path at the end of any step
+		self.minCash = -1
+
+		#totals accumulated over the run
+		self.totalLoanInterest = -1
+		self.totalLoanPayment = -1
+		self.totalInvestmentInterest = -1
+		self.totalSpend = -1
+		self.totalTaxesPaid = -1
+
+		#per path histories, only filled in if recordHistory=1.
+		#cashHistory is (paths x steps), account histories are
+		#(paths x steps x accounts)
+		self.timeHistory = []
+		self.cashHistory = []
+		self.loanPrincipalHistory = []
+		self.investmentPrincipalHistory = []
+		self.spendHistory = []
+
+		#the fanChart.fanChart passed in, if any, with every path added
+		self.fanChart = None
+
+		#control variates, (paths x controls), each with expected value
+		#0, and what each one is. See controlVariates()
+		self.controlNames = []
+		self.controls = -1
+
+###############################################################################
+#
+#	Per path parameters. Any of these can be given a different value on
+#	every path through the parameters argument of propagateEnsemble(),
+#	keyed by 'initialCash' or parameterKey(), e.g. 'loanList[0].interestRate'
+#
+###############################################################################
+
+#investments with a return model draw this many steps of their return
+#paths at a time, so memory doesn't grow with the horizon
+returnBlockSteps = 512
+
+#most values of each series buffered before they are added to a
+#fanChart
+fanChartBlockValues = 1 << 20
+
+pathParameters = {
+	'loanList': ['initialPrincipal', 'interestRate', 'minimumPayment'],
+	'investmentList': ['initialPrincipal', 'interestRate'],
+	'jobList': ['initialSalary', 'withholding'],
+	'expenseList': ['mean', 'std']
+}
+
+def parameterKey(listName, ind, field):
+	return '%s[%d].%s' % (listName, ind, field)
+
+def parameterArray(scen, listName, field, parameters, used, nPaths):
+	#field for every account in the scenario's listName as a
+	#(1 x accounts) array, or (paths x accounts) if any account's value
+	#is overridden in parameters. Keys that are applied go into used
+	accountList = getattr(scen, listName)
+	values = array(
+		[getattr(account, field) for account in accountList],
+		dtype=float).reshape(1, len(accountList))
+	for ind in range(len(accountList)):
+		key = parameterKey(listName, ind, field)
+		if key not in parameters: continue
+		if values.shape[0] == 1: values = repeat(values, nPaths, axis=0)
+		values[:, ind] = parameters[key]
+		used.add(key)
+	return values
+
+def propagateEnsemble(
+	scen, nPaths, recordHistory=0, rng=None, historyStride=1,
+	parameters=None, fanChart=None, sampling='random'):
+	'''!
+	Run nPaths independent paths of scen together. The model is the same
+	as simScenario.propagate(): expense draws differ between paths, and
+	so does anything given per path in parameters, a dict from parameter
+	names (see pathParameters) to arrays of nPaths values.
+	rng is a numpy.random.Generator, used for expense draws and for the
+	paths of investments with a returnModel. If it is not given,
+	default_rng(scen.seed) is used, so a seeded scenario gives a
+	repeatable ensemble. If recordHistory is set, every historyStride'th
+	step is kept (starting with the first). Every path is also added to
+	fanChart, a fanChart.fanChart, if one is given, without keeping
+	histories. sampling is how expense draws and model returns are
+	spread over paths, one of quasiRandom.samplingMethods: 'random',
+	'antithetic', 'latinHypercube' or 'sobol' (see
+	quasiRandom.variateSampler). The result's controls can be used as
+	control variates, see monteCarlo.controlledMean(). Returns an
+	ensembleResult.
+	'''
+	if parameters is None: parameters = {}
+	if rng is None: rng = default_rng(scen.seed)
+	if sampling != 'random': rng = variateSampler(rng, sampling, nPaths)
+	used = set()
+	calendar = scen.buildCalendar()
+	nSteps = len(calendar)
+	result = ensembleResult(nPaths)
+
+	###############################################################
+	#
+	# Initialize Values
+	#
+	###############################################################
+
+	def parameter(listName, field):
+		#(accounts x 1), or (accounts x paths) if it varies by path
+		return parameterArray(
+			scen, listName, field, parameters, used, nPaths).T
+
+	cash = zeros(nPaths) + scen.initialCash
+	if 'initialCash' in parameters:
+		cash[:] = parameters['initialCash']
+		used.add('initialCash')
+	minCash = cash.copy()
+	taxesPaid = zeros(nPaths)
+
+	#account values are (accounts x 1) unless they vary by path, in
+	#which case they are (accounts x paths). Either broadcasts against
+	#the (accounts x paths) state arrays. Broadcasting along the long
+	#paths axis is several times faster than along a short accounts
+	#axis, which is why paths come last
+	loanList = scen.loanList
+	result.loanNames = [loan.name for loan in loanList]
+	loanRate = parameter('loanList', 'interestRate')/100.
+	loanMinimum = parameter('loanList', 'minimumPayment')
+	#number of payments due on each loan in each step, as in
+	#accountBook.refresh()
+	loanPaymentCounts = zeros((nSteps, len(loanList), 1))
+	for ind, loan in enumerate(loanList):
+		loanPaymentCounts[:, ind, 0] = calendar.count(loan.paymentDOM)
+	loanPaymentSteps = loanPaymentCounts.any(axis=(1, 2)).tolist()
+	loanInitialPrincipal = parameter('loanList', 'initialPrincipal')
+	loanPrincipal = zeros((len(loanList), nPaths)) + loanInitialPrincipal
+	loanPayment = zeros((len(loanList), nPaths))
+
+	investmentList = scen.investmentList
+	result.investmentNames = [
+		investment.name for investment in investmentList]
+	investmentRate = parameter('investmentList', 'interestRate')/100.
+	investmentInitialPrincipal = \
+		parameter('investmentList', 'initialPrincipal')
+	investmentPrincipal = zeros((len(investmentList), nPaths)) + \
+		investmentInitialPrincipal
+
+	#investments with a return model grow along (paths x steps) paths
+	#drawn from rng a block of steps at a time instead of at their
+	#interestRate
+	modelIndex = [ind for ind, investment in enumerate(investmentList)
+		if investment.returnModel is not None]
+	modelState = [None for ind in modelIndex]
+	modelGrowth = [None for ind in modelIndex]
+	if len(modelIndex) > 0:
+		times = concatenate([[scen.startTime], calendar.times])
+
+	#(loan, investment) growth factors for each step length seen so far
+	growth = {}
+
+	jobList = scen.jobList
+	salary = parameter('jobList', 'initialSalary')
+	jobWithholding = parameter('jobList', 'withholding')
+	yearToDatePay = zeros((len(jobList), nPaths))
+	withheldTax = zeros((len(jobList), nPaths))
+	paydays = [calendar.countList(job.payDOM) for job in jobList]
+
+	expenseList = scen.expenseList
+	result.expenseNames = [expense.name for expense in expenseList]
+	#kept as scalars unless they vary by path, since the generator is
+	#noticeably faster given scalar arguments
+	expenseMean = parameter('expenseList', 'mean')
+	expenseStd = parameter('expenseList', 'std')
+	expenseMean = [
+		expenseMean[ind] if expenseMean.shape[1] > 1
+		else expenseMean[ind, 0] for ind in range(len(expenseList))]
+	expenseStd = [
+		expenseStd[ind] if expenseStd.shape[1] > 1
+		else expenseStd[ind, 0] for ind in range(len(expenseList))]
+	spend = [zeros(nPaths) for expense in expenseList]
+	spendDays = [calendar.countList(expense.spendDOM)
+		for expense in expenseList]
+
+	unused = set(parameters) - used
+	if len(unused) > 0:
+		raise ValueError(
+			'Cannot vary by path: ' + ', '.join(sorted(unused)))
+
+	if recordHistory:
+		nRecorded = -(-nSteps//historyStride)
+		timeHistory = empty(nRecorded)
+		cashHistory = empty((nRecorded, nPaths))
+		loanPrincipalHistory = empty((nRecorded, len(loanList), nPaths))
+		investmentPrincipalHistory = \
+			empty((nRecorded, len(investmentList), nPaths))
+		spendHistory = zeros((nRecorded, len(expenseList), nPaths))
+
+	#steps kept by fanChart are buffered and added a block at a time
+	if fanChart is not None:
+		fanStride = fanChart.historyStride
+		fanChart.start(calendar.times[::fanStride])
+		fanRows = max(1, fanChartBlockValues//nPaths)
+		fanCash = empty((fanRows, nPaths))
+		fanNetWorth = empty((fanRows, nPaths))
+		fanStart = 0
+		fanCount = 0
+
+	###############################################################
+	#
+	# Main Simulation Loop
+	#
+	###############################################################
+
+	currentTime = scen.startTime
+	for step in range(nSteps):
+		currentTime = calendar.timeList[step]
+		stepLength = calendar.stepLengthList[step]
+		if stepLength not in growth:
+			t = stepLength/365.
+			investmentGrowth = exp(investmentRate*t)
+			investmentGrowth[modelIndex] = 1.
+			growth[stepLength] = (exp(loanRate*t), investmentGrowth)
+		loanGrowth, investmentGrowth = growth[stepLength]
+		record = recordHistory and step%historyStride == 0
+
+		#loans accrue every step and pay their minimum for each of
+		#their paymentDOMs in the step. Interest isn't accumulated
+		#here; it is recovered from the final principal and payments
+		#once the run is done, which keeps the per step work to one
+		#multiply per account type
+		loanPrincipal *= loanGrowth
+		if loanPaymentSteps[step]:
+			payment = minimum(
+				loanPrincipal, loanPaymentCounts[step]*loanMinimum)
+			loanPrincipal = loanPrincipal - payment
+			loanPayment += payment
+			cash -= payment.sum(axis=0)
+
+		investmentPrincipal *= investmentGrowth
+		if len(modelIndex) > 0:
+			block = step%returnBlockSteps
+			if block == 0:
+				stepLengths = diff(times[step:step + returnBlockSteps + 1])
+				for model, ind in enumerate(modelIndex):
+					logGrowth, modelState[model] = \
+						investmentList[ind].returnModel.sample(
+							stepLengths, nPaths, rng, modelState[model])
+					#(steps x paths), so each step is contiguous
+					modelGrowth[model] = exp(logGrowth.T)
+			for model, ind in enumerate(modelIndex):
+				investmentPrincipal[ind] *= modelGrowth[model][block]
+
+		#jobs pay on their payDOM. This mirrors job.payday()
+		for ind in range(len(jobList)):
+			count = paydays[ind][step]
+			if count > 0:
+				monthlyPay = count*salary[ind]/12
+				yearToDatePay[ind] += monthlyPay
+				withheldTax[ind] += count*jobWithholding[ind]
+				cash += monthlyPay
+
+		#taxes. This mirrors simScenario.payTaxes() for both
+		#jurisdictions. Withholding is credited against the first
+		#bill only, exactly as payTaxes() does
+		if calendar.taxDayList[step]:
+			taxableIncome = yearToDatePay.sum(axis=0)
+			withholding = withheldTax.sum(axis=0)
+			for taxType in ['California', 'Federal']:
+				taxBill, FICABill = scen.computeTax(
+					taxType, taxableIncome, calendar.year[step] - 1)
+				taxes = taxBill + FICABill - withholding
+				withholding = 0
+				taxesPaid += taxes
+				cash -= taxes
+			yearToDatePay[:] = 0
+			withheldTax[:] = 0
+
+		#spending over several days in one step is a single draw of
+		#their total. This mirrors expense.draw()
+		for ind in range(len(expenseList)):
+			count = spendDays[ind][step]
+			if count > 0:
+				draw = rng.normal(count*expenseMean[ind],
+					sqrt(count)*expenseStd[ind], nPaths)
+				spend[ind] += draw
+				cash -= draw
+				if record:
+					spendHistory[step//historyStride, ind] = draw
+
+		minimum(minCash, cash, out=minCash)
+
+		if record:
+			row = step//historyStride
+			timeHistory[row] = currentTime
+			cashHistory[row] = cash
+			loanPrincipalHistory[row] = loanPrincipal
+			investmentPrincipalHistory[row] = investmentPrincipal
+
+		if fanChart is not None and step%fanStride == 0:
+			fanCash[fanCount] = cash
+			fanNetWorth[fanCount] = cash + \
+				investmentPrincipal.sum(axis=0) - loanPrincipal.sum(axis=0)
+			fanCount += 1
+			if fanCount == fanRows or step + fanStride >= nSteps:
+				fanChart.add('cash', fanStart, fanCash[:fanCount])
+				fanChart.add('netWorth', fanStart, fanNetWorth[:fanCount])
+				fanStart += fanCount
+				fanCount = 0
+
+	###############################################################
+	#
+	# 	Record Final values
+	#
+	###############################################################
+
+	if fanChart is not None:
+		fanChart.addPaths(nPaths)
+		result.fanChart = fanChart
+	result.finalTime = currentTime
+	result.finalCash = cash
+	result.minCash = minCash
+	result.finalLoanPrincipal = loanPrincipal.T.copy()
+	result.finalInvestmentPrincipal = investmentPrincipal.T.copy()
+	result.totalLoanInterest = \
+		(loanPrincipal + loanPayment - loanInitialPrincipal).T.copy()
+	result.totalLoanPayment = loanPayment.T.copy()
+	result.totalInvestmentInterest = \
+		(investmentPrincipal - investmentInitialPrincipal).T.copy()
+	result.totalSpend = zeros((nPaths, len(expenseList)))
+	for ind in range(len(expenseList)):
+		result.totalSpend[:, ind] = spend[ind]
+	result.totalTaxesPaid = taxesPaid
+	result.controlNames, result.controls = controlVariates(
+		scen, result, expenseMean, spendDays, investmentInitialPrincipal.T)
+
+	if recordHistory:
+		result.timeHistory = timeHistory
+		result.cashHistory = cashHistory.T
+		result.loanPrincipalHistory = loanPrincipalHistory.transpose(2, 0, 1)
+		result.investmentPrincipalHistory = \
+			investmentPrincipalHistory.transpose(2, 0, 1)
+		result.spendHistory = spendHistory.transpose(2, 0, 1)
+
+	return result
+
+def controlVariates(
+	scen, result, expenseMean, spendDays, investmentInitialPrincipal):
+	#values of each path that move with its random draws and whose
+	#expected value is known: their value in the deterministic run, with
+	#every expense at its mean and every return at its drift. Each is
+	#returned less that expected value. They are the total spend of each
+	#expense and the final principal of each investment with a
+	#lognormal return model. Returns (names, (paths x controls) array)
+	names = []
+	controls = []
+	for ind in range(len(scen.expenseList)):
+		names.append(parameterKey('expenseList', ind, 'totalSpend'))
+		controls.append(result.totalSpend[:, ind] - \
+			sum(spendDays[ind])*expenseMean[ind])
+	years = (result.finalTime - scen.startTime)/365.
+	for ind, investment in enumerate(scen.investmentList):
+		if not isinstance(investment.returnModel, lognormalReturn): continue
+		names.append(parameterKey('investmentList', ind, 'finalPrincipal'))
+		controls.append(result.finalInvestmentPrincipal[:, ind] - \
+			investmentInitialPrincipal[:, ind]* \
+			exp(investment.returnModel.drift/100.*years))
+	values = zeros((result.nPaths, len(controls)))
+	for ind, control in enumerate(controls):
+		values[:, ind] = control
+	return names, values
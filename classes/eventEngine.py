@@ -0,0 +1,45 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : eventEngine.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Event driven propagation. Steps a simScenario only on days
+#		where cash moves and accrues interest in closed form across the
+#		gaps in between
+#
+###############################################################################
+
+def eventSteps(calendar, scen):
+	'''!
+	Indices into calendar of the steps on which something other than
+	interest accrual happens: loan payments on each loan's paymentDOM,
+	paydays, expenses and the tax date. The final step is always included
+	so that the run ends where propagate() does.
+	'''
+	isEvent = calendar.isTaxDay.copy()
+	for loan in scen.loanList:
+		isEvent |= calendar.isDOM(loan.paymentDOM)
+	for job in scen.jobList:
+		isEvent |= calendar.isDOM(job.payDOM)
+	for expense in scen.expenseList:
+		#daily expenses (spendDOM = -1) make every step an event
+		isEvent |= calendar.isDOM(expense.spendDOM)
+	if len(calendar) > 0: isEvent[-1] = True
+
+	return isEvent.nonzero()[0].tolist()
+
+def propagateEvents(scen):
+	'''!
+	Equivalent to scen.propagate(), but scen.step() is only called on
+	eventSteps(). loan.accrue() and investment.accrue() grow principal
+	by P*exp(r*dt) over the whole gap since the previous event, so final
+	balances match the daily loop up to floating point rounding. History
+	arrays get one entry per event, and per step values such as
+	interestHistory hold the total over the gap since the previous event.
+	'''
+	steps = eventSteps(scen.buildCalendar(), scen)
+	scen.initializeRun(len(steps))
+	for ind in steps:
+		scen.step(ind)
+	scen.finalizeRun()
@@ -0,0 +1,217 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : fanChart.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Percentile bands of cash and net worth over time across
+#		any number of paths, folded in a batch at a time so that memory
+#		doesn't grow with the number of paths
+#
+###############################################################################
+from numpy import arange, arcsin, argsort, bincount, clip
+from numpy import cumsum, empty, floor, full, hstack, inf, maximum
+from numpy import minimum, ones, pi, sqrt, take_along_axis, where, zeros
+from numpy import asarray
+
+class quantileSketch:
+	'''!
+	Mergeable sketch of the distribution of a value at each of nSteps
+	steps, in the style of a t-digest: each step keeps at most
+	compression weighted centroids, smaller towards the tails so that
+	extreme percentiles stay accurate. Alongside it an exact running
+	count, mean, variance, min and max are kept. Memory is (nSteps x
+	compression) whatever the number of paths added.
+	'''
+	def __init__(self, nSteps, compression=200):
+		self.nSteps = nSteps
+		self.compression = compression
+		#centroids of each step, sorted by mean. Unused ones have
+		#weight 0
+		self.centroidMean = zeros((nSteps, compression))
+		self.centroidWeight = zeros((nSteps, compression))
+		self.count = zeros(nSteps)
+		self.mean = zeros(nSteps)
+		self.m2 = zeros(nSteps)
+		self.min = full(nSteps, inf)
+		self.max = full(nSteps, -inf)
+
+	def add(self, start, values):
+		#fold in values, a (steps x paths) array of the value at steps
+		#start, start + 1, ... for a batch of paths
+		values = asarray(values, dtype=float)
+		rows = slice(start, start + values.shape[0])
+		nPaths = values.shape[1]
+		batchMean = values.mean(axis=1)
+		self.mergeMoments(rows, nPaths, batchMean,
+			((values - batchMean[:, None])**2).sum(axis=1),
+			values.min(axis=1), values.max(axis=1))
+		self.compress(rows,
+			hstack([self.centroidMean[rows], values]),
+			hstack([self.centroidWeight[rows], ones(values.shape)]))
+
+	def merge(self, other):
+		#fold in another sketch of the same steps
+		self.mergeMoments(slice(None), other.count, other.mean, other.m2,
+			other.min, other.max)
+		self.compress(slice(None),
+			hstack([self.centroidMean, other.centroidMean]),
+			hstack([self.centroidWeight, other.centroidWeight]))
+
+	def mergeMoments(self, rows, count, mean, m2, low, high):
+		#Chan et al.'s pairwise update of count, mean and sum of squared
+		#deviations, which is exact however batches are split
+		oldCount = self.count[rows]
+		total = oldCount + count
+		delta = mean - self.mean[rows]
+		share = where(total > 0, count/maximum(total, 1), 0)
+		self.mean[rows] += delta*share
+		self.m2[rows] += m2 + delta**2*oldCount*share
+		self.count[rows] = total
+		self.min[rows] = minimum(self.min[rows], low)
+		self.max[rows] = maximum(self.max[rows], high)
+
+	def compress(self, rows, means, weights):
+		#merge each row of weighted points into compression centroids.
+		#Points are sorted and each goes to the centroid for its
+		#cumulative weight on the t-digest k1 scale, which gives
+		#centroids spanning less weight near the tails
+		order = argsort(means, axis=1, kind='stable')
+		means = take_along_axis(means, order, axis=1)
+		weights = take_along_axis(weights, order, axis=1)
+		cumulative = cumsum(weights, axis=1)
+		total = cumulative[:, -1:]
+		q = (cumulative - weights/2)/maximum(total, 1e-300)
+		k = self.compression
+		bucket = clip(floor(k*(arcsin(clip(2*q - 1, -1, 1))/pi + 0.5)),
+			0, k - 1).astype(int)
+
+		nRows = means.shape[0]
+		index = (arange(nRows)[:, None]*k + bucket).ravel()
+		newWeight = bincount(index, weights.ravel(), nRows*k).reshape(nRows, k)
+		newSum = bincount(
+			index, (weights*means).ravel(), nRows*k).reshape(nRows, k)
+		self.centroidWeight[rows] = newWeight
+		self.centroidMean[rows] = where(
+			newWeight > 0, newSum/where(newWeight > 0, newWeight, 1), 0)
+
+	def variance(self):
+		return where(self.count > 1, self.m2/maximum(self.count - 1, 1), 0)
+
+	def std(self):
+		return sqrt(self.variance())
+
+	def percentile(self, percentiles):
+		'''!
+		Estimated percentiles (0 to 100) of every step, as a
+		(len(percentiles) x steps) array. Between centroids the value is
+		interpolated by cumulative weight, and below the first and above
+		the last centroid towards the min and max seen.
+		'''
+		#used centroids first, then unused ones, which are made to sit
+		#at the max so that they act as the upper end point
+		order = argsort(self.centroidWeight == 0, axis=1, kind='stable')
+		means = take_along_axis(self.centroidMean, order, axis=1)
+		weights = take_along_axis(self.centroidWeight, order, axis=1)
+		total = weights.sum(axis=1)
+		centers = cumsum(weights, axis=1) - weights/2
+		unused = weights == 0
+		means = where(unused, self.max[:, None], means)
+		centers = where(unused, total[:, None], centers)
+		means = hstack([self.min[:, None], means, self.max[:, None]])
+		centers = hstack([zeros((self.nSteps, 1)), centers, total[:, None]])
+
+		rows = arange(self.nSteps)
+		result = empty((len(percentiles), self.nSteps))
+		for ind, p in enumerate(percentiles):
+			target = total*p/100.
+			upper = clip((centers < target[:, None]).sum(axis=1),
+				1, centers.shape[1] - 1)
+			lower = upper - 1
+			span = centers[rows, upper] - centers[rows, lower]
+			fraction = where(span > 0,
+				(target - centers[rows, lower])/where(span > 0, span, 1), 1)
+			result[ind] = means[rows, lower] + \
+				fraction*(means[rows, upper] - means[rows, lower])
+		return result
+
+class fanChart:
+	'''!
+	Percentile bands and running mean and std of cash and net worth
+	(cash plus investments less loans) at every historyStride'th step of
+	a run, over every path folded in. Give one to
+	ensemble.propagateEnsemble() or monteCarlo.runMonteCarlo() to fill
+	it as paths are run, or add propagated scenarios with addScenario().
+	Charts of the same steps can be merged, e.g. from worker processes.
+	'''
+	seriesNames = ['cash', 'netWorth']
+
+	def __init__(self, percentiles=[5, 25, 50, 75, 95], compression=200,
+		historyStride=1):
+		self.percentiles = list(percentiles)
+		self.compression = compression
+		self.historyStride = historyStride
+		self.nPaths = 0
+		#times of the steps kept, set by the first run folded in
+		self.timeHistory = []
+		self.sketches = {}
+
+	def emptyCopy(self):
+		#a chart with the same settings and no paths
+		return fanChart(
+			self.percentiles, self.compression, self.historyStride)
+
+	def start(self, times):
+		#size the chart for a run whose kept steps are at times. Charts
+		#can only take runs of the same steps
+		times = asarray(times, dtype=float)
+		if len(self.sketches) == 0:
+			self.timeHistory = times
+			for name in self.seriesNames:
+				self.sketches[name] = \
+					quantileSketch(len(times), self.compression)
+		elif len(times) != len(self.timeHistory) or \
+			(times != self.timeHistory).any():
+			raise ValueError('fanChart runs must have the same steps')
+
+	def add(self, name, start, values):
+		#values of series name at kept steps start, start + 1, ... as a
+		#(steps x paths) array
+		self.sketches[name].add(start, values)
+
+	def addPaths(self, nPaths):
+		self.nPaths += nPaths
+
+	def addScenario(self, scen):
+		'''!
+		Fold in a scenario run with propagate() as one path. Its
+		histories must have been kept, e.g. by the default memorySink.
+		'''
+		stride = self.historyStride
+		self.start(asarray(scen.timeHistory)[::stride])
+		netWorth = asarray(scen.cashHistory, dtype=float).copy()
+		for investment in scen.investmentList:
+			netWorth += investment.principalHistory
+		for loan in scen.loanList:
+			netWorth -= loan.principalHistory
+		self.add('cash', 0, asarray(scen.cashHistory)[::stride, None])
+		self.add('netWorth', 0, netWorth[::stride, None])
+		self.addPaths(1)
+
+	def merge(self, other):
+		#fold in another chart's paths
+		if other.nPaths == 0: return
+		self.start(other.timeHistory)
+		for name in self.seriesNames:
+			self.sketches[name].merge(other.sketches[name])
+		self.addPaths(other.nPaths)
+
+	def bands(self, name):
+		#(percentiles x steps) array of series name's percentiles
+		return self.sketches[name].percentile(self.percentiles)
+
+	def mean(self, name):
+		return self.sketches[name].mean
+
+	def std(self, name):
+		return self.sketches[name].std()
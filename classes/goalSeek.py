@@ -0,0 +1,203 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : goalSeek.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Finds the value of a scenario parameter at which a goal is
+#		just met, e.g. the smallest salary at which net worth reaches a
+#		target by a date, by bisecting over runs that stop as soon as
+#		their outcome is known
+#
+###############################################################################
+from numpy import searchsorted
+from numpy.random import SeedSequence
+from historySink import nullSink
+import eventEngine
+import simScenario
+import sweep
+
+###############################################################################
+#
+#	Metrics. Each one is read from a scenario part way through a run
+#
+###############################################################################
+
+def cashMetric(scen):
+	return scen.currentCash
+
+def investmentMetric(scen):
+	return scen.book.investmentPrincipal.sum()
+
+def loanMetric(scen):
+	return scen.book.loanPrincipal.sum()
+
+def netWorthMetric(scen):
+	return scen.currentCash + investmentMetric(scen) - loanMetric(scen)
+
+metrics = {
+	'cash': cashMetric,
+	'investmentPrincipal': investmentMetric,
+	'loanPrincipal': loanMetric,
+	'netWorth': netWorthMetric
+}
+
+class goalSeekResult:
+	def __init__(self):
+		self.parameter = -1
+		#value at which the goal is just met, to within tolerance
+		self.value = -1
+		#final bracket. The goal is met at metValue and not at
+		#unmetValue
+		self.metValue = -1
+		self.unmetValue = -1
+		self.converged = 0
+
+		#(value, met, steps taken) of every trial run
+		self.trials = []
+		#steps taken by every trial together, and the steps they would
+		#have taken run to the end
+		self.stepsTaken = 0
+		self.stepsPossible = 0
+
+###############################################################################
+#
+#	Trials
+#
+###############################################################################
+
+def trialSteps(scen, byTime):
+	#calendar steps a trial takes: the event engine's (see
+	#eventEngine.eventSteps()), which is every step that moves cash,
+	#up to byTime, plus the last step up to byTime
+	calendar = scen.buildCalendar()
+	steps = [ind for ind in eventEngine.eventSteps(calendar, scen)
+		if calendar.timeList[ind] <= byTime]
+	last = int(searchsorted(calendar.times, byTime, side='right')) - 1
+	if last >= 0 and (len(steps) == 0 or steps[-1] != last):
+		steps.append(last)
+	return steps
+
+def runTrial(config, parameter, value, metric, target, goal, below, byTime):
+	#run the scenario in config with parameter set to value. Returns
+	#whether the goal is met and the number of steps taken, stopping as
+	#soon as a 'reach' goal is reached or a 'stay' goal is broken
+	scen = simScenario.fromConfig(config)
+	if parameter is not None:
+		sweep.setParameter(scen, parameter, value)
+	scen.historySink = nullSink()
+	steps = trialSteps(scen, byTime)
+	scen.initializeRun(len(steps))
+
+	met = goal == 'stay'
+	taken = 0
+	for ind in steps:
+		scen.step(ind)
+		taken += 1
+		current = metric(scen)
+		onTarget = current <= target if below else current >= target
+		if onTarget != met:
+			met = not met
+			break
+	scen.finalizeRun()
+	return met, taken, len(steps)
+
+###############################################################################
+#
+#	Goal Seek
+#
+###############################################################################
+
+def fixedConfig(scen):
+	#scen's config with a seed, so that every trial draws the same
+	#expenses and returns and only the parameter differs between them
+	config = scen.getConfig()
+	if config['seed'] is None: config['seed'] = SeedSequence().entropy
+	return config
+
+def timeOf(scen, byDate):
+	#simulation time of byDate, or endTime if it is None
+	if byDate is None: return scen.endTime
+	return (byDate - scen.startDate).days
+
+def goalSeek(
+	scen, parameter, lower, upper, metric='netWorth', target=0.,
+	goal='reach', below=0, byDate=None, tolerance=1e-2, maxTrials=100):
+	'''!
+	Find the value of parameter, named as for sweep.setParameter()
+	(e.g. 'initialCash' or 'jobList[0].initialSalary'), between lower
+	and upper at which a goal is just met. metric is a name in metrics
+	or a function of a running scenario. The goal is that metric
+	reaches target at some step through byDate (goal='reach') or stays
+	at or above it at every step through byDate (goal='stay'). With
+	below set, metric must be at or below target instead, e.g. for
+	'loanPrincipal'. byDate defaults to the end of the scenario.
+
+	The goal must be met at exactly one of lower and upper, and the
+	outcome must change only once in between. Each trial is run with
+	the event engine and no history, and stops as soon as its outcome
+	is known. Bisection stops once the bracket is narrower than
+	tolerance. scen is not modified. Returns a goalSeekResult.
+	'''
+	if goal not in ['reach', 'stay']:
+		raise ValueError('Unknown goal: ' + str(goal))
+	if not callable(metric): metric = metrics[metric]
+	config = fixedConfig(scen)
+	byTime = timeOf(scen, byDate)
+	result = goalSeekResult()
+	result.parameter = parameter
+
+	def trial(value):
+		met, taken, possible = runTrial(
+			config, parameter, value, metric, target, goal, below, byTime)
+		result.trials.append((value, met, taken))
+		result.stepsTaken += taken
+		result.stepsPossible += possible
+		return met
+
+	#bracket
+	lowerMet = trial(lower)
+	if trial(upper) == lowerMet:
+		raise ValueError('The goal is %s at both %s and %s' % (
+			'met' if lowerMet else 'not met', lower, upper))
+	if lowerMet: metValue, unmetValue = lower, upper
+	else: metValue, unmetValue = upper, lower
+
+	#and bisect
+	while abs(metValue - unmetValue) > tolerance and \
+		len(result.trials) < maxTrials:
+		middle = (metValue + unmetValue)/2.
+		if trial(middle): metValue = middle
+		else: unmetValue = middle
+
+	result.value = metValue
+	result.metValue = metValue
+	result.unmetValue = unmetValue
+	result.converged = int(abs(metValue - unmetValue) <= tolerance)
+	return result
+
+def seekDate(scen, metric='cash', target=0., below=0):
+	'''!
+	Earliest date from which metric (as for goalSeek()) stays at or
+	above target, or at or below it if below is set, through the end of
+	scen, e.g. the date cash stays positive from. Returns None if the
+	metric is off target at the end. scen is not modified.
+	'''
+	if not callable(metric): metric = metrics[metric]
+	trialScen = simScenario.fromConfig(fixedConfig(scen))
+	trialScen.historySink = nullSink()
+	steps = trialSteps(trialScen, trialScen.endTime)
+	trialScen.initializeRun(len(steps))
+
+	#the first step of the last run of steps on target
+	first = None
+	for ind in steps:
+		trialScen.step(ind)
+		current = metric(trialScen)
+		onTarget = current <= target if below else current >= target
+		if not onTarget: first = None
+		elif first is None: first = ind
+	trialScen.finalizeRun()
+
+	if first is None: return None
+	return trialScen.calendar.date(first)
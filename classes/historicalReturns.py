@@ -0,0 +1,151 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : historicalReturns.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Historical returns converted once from text into a binary
+#		file that is memory mapped at run time, and a return model that
+#		block bootstraps paths from it
+#
+###############################################################################
+from numpy import arange, array, ceil, concatenate, cumsum, floor, hstack
+from numpy import log, memmap, zeros
+import json
+import os
+
+###############################################################################
+#
+#	Datasets
+#
+###############################################################################
+
+def convertReturns(textFile, dataFile, periodDays=1., percent=False):
+	'''!
+	Convert a text file of historical returns to dataFile, a file of raw
+	float64 log returns, plus dataFile + '.json' describing it. Each line
+	of textFile is date,return with return the simple return over one
+	period of periodDays days, as a fraction or, if percent is set, in
+	percent. Lines that don't parse, e.g. a header, are skipped. Returns
+	the number of returns written.
+	'''
+	dates = []
+	returns = []
+	with open(textFile) as f:
+		for line in f:
+			fields = line.strip().split(',')
+			if len(fields) < 2: continue
+			try:
+				value = float(fields[1])
+			except ValueError:
+				continue
+			dates.append(fields[0].strip())
+			returns.append(value)
+	returns = array(returns)
+	if percent: returns = returns/100.
+	log(1 + returns).astype('<f8').tofile(dataFile)
+
+	info = {
+		'periodDays': periodDays,
+		'length': len(returns),
+		'startDate': dates[0] if len(dates) > 0 else -1,
+		'endDate': dates[-1] if len(dates) > 0 else -1,
+		'source': os.path.basename(textFile)
+	}
+	with open(dataFile + '.json', 'w') as f:
+		json.dump(info, f, indent=1, sort_keys=True)
+	return len(returns)
+
+class returnsDataset:
+	#a file written by convertReturns(). logReturns is a read only
+	#memmap, so processes mapping the same file share its pages
+	def __init__(self, dataFile):
+		self.dataFile = dataFile
+		with open(dataFile + '.json') as f:
+			self.info = json.load(f)
+		self.periodDays = float(self.info['periodDays'])
+		self.logReturns = memmap(dataFile, dtype='<f8', mode='r',
+			shape=(self.info['length'],))
+
+	def __len__(self):
+		return len(self.logReturns)
+
+#datasets already mapped by this process, by absolute path
+datasets = {}
+
+def loadDataset(dataFile):
+	dataFile = os.path.abspath(dataFile)
+	if dataFile not in datasets:
+		datasets[dataFile] = returnsDataset(dataFile)
+	return datasets[dataFile]
+
+###############################################################################
+#
+#	Block Bootstrap
+#
+###############################################################################
+
+class bootstrapReturn:
+	'''!
+	Return model that strings together blocks of blockLength contiguous
+	periods of a returnsDataset, each starting at a random period, so
+	that paths keep the short term structure of the history. The dataset
+	is named by dataFile and only mapped when first sampled, so the model
+	is cheap to copy to worker processes.
+	'''
+	def __init__(self, dataFile, blockLength=21):
+		self.dataFile = dataFile
+		self.blockLength = blockLength
+
+	def dataset(self):
+		return loadDataset(self.dataFile)
+
+	def drawPeriods(self, nPaths, nPeriods, rng):
+		#log returns for at least nPeriods periods of nPaths paths, in
+		#whole random blocks so that a block isn't cut short when a
+		#path is continued by a later call
+		data = self.dataset().logReturns
+		blockLength = min(self.blockLength, len(data))
+		nBlocks = int(ceil(nPeriods/blockLength))
+		starts = rng.integers(
+			0, len(data) - blockLength + 1, (nPaths, nBlocks))
+		ind = starts[:, :, None] + arange(blockLength)
+		return data[ind.reshape(nPaths, -1)]
+
+	def sample(self, stepLengths, nPaths, rng, state=None):
+		#as returnModels.lognormalReturn.sample(). Growth within a period
+		#is spread evenly over its days. state is the part of each
+		#path's periods not used yet and how many days into the first
+		#of them the last step ended
+		periodDays = self.dataset().periodDays
+		if state is None:
+			periods = zeros((nPaths, 0))
+			offset = 0.
+		else:
+			periods, offset = state
+
+		#step boundaries in periods from the start of periods
+		position = (offset + \
+			concatenate([[0.], cumsum(stepLengths)]))/periodDays
+		needed = int(floor(position[-1])) + 1
+		if periods.shape[1] < needed:
+			periods = hstack([periods,
+				self.drawPeriods(nPaths, needed - periods.shape[1], rng)])
+
+		#cumulative log growth at each boundary, interpolated within
+		#periods
+		cumulative = hstack([zeros((nPaths, 1)), cumsum(periods, axis=1)])
+		whole = floor(position).astype(int)
+		fraction = position - whole
+		atBoundary = cumulative[:, whole] + fraction*periods[:, whole]
+		logGrowth = atBoundary[:, 1:] - atBoundary[:, :-1]
+
+		used = whole[-1]
+		return logGrowth, \
+			(periods[:, used:], (position[-1] - used)*periodDays)
+
+	def getConfig(self):
+		return {
+			'model': 'bootstrap',
+			'dataFile': self.dataFile,
+			'blockLength': self.blockLength}
@@ -0,0 +1,77 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : history.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Preallocated storage for the *History arrays recorded at each
+#		time step of a simulation
+#
+###############################################################################
+from numpy import empty
+
+class historyTable:
+	def __init__(self, fields, capacity=16):
+		#fields are the names of the history arrays this table backs,
+		#e.g. ['principalHistory', 'interestHistory']. Values are stored
+		#one row per field so that each history is a contiguous slice
+		self.fields = list(fields)
+		self.fieldIndex = {}
+		for ind, field in enumerate(self.fields):
+			self.fieldIndex[field] = ind
+		self.data = empty((len(self.fields), max(capacity, 1)))
+		self.length = 0
+
+	def reserve(self, capacity):
+		#grow storage so that at least capacity steps fit without
+		#reallocating. Existing values are kept
+		if capacity <= self.data.shape[1]: return
+		data = empty((len(self.fields), capacity))
+		data[:, :self.length] = self.data[:, :self.length]
+		self.data = data
+
+	def clear(self):
+		self.length = 0
+
+	def record(self, values):
+		#values must be ordered the same way as self.fields. If the
+		#table is full, capacity is doubled so that an unsized run is
+		#still amortized O(1) per step
+		if self.length == self.data.shape[1]:
+			self.reserve(2*self.data.shape[1])
+		self.data[:, self.length] = values
+		self.length += 1
+
+	def column(self, field):
+		return self.data[self.fieldIndex[field], :self.length]
+
+	def last(self, field):
+		#most recently recorded value of field
+		if self.length == 0:
+			raise IndexError('No values of %s have been recorded' % field)
+		return self.data[self.fieldIndex[field], self.length - 1]
+
+	def publish(self, owner):
+		#expose every recorded history as an attribute of owner, e.g.
+		#owner.principalHistory. These are views into the table, so
+		#no copy is made
+		for field in self.fields:
+			setattr(owner, field, self.column(field))
+
+class historyView:
+	#the rows of a shared historyTable that belong to one owner, e.g. one
+	#loan's rows of an accountBook's history. fieldRows maps the owner's
+	#history names to field names in table
+	def __init__(self, table, fieldRows):
+		self.table = table
+		self.fieldRows = fieldRows
+
+	def column(self, field):
+		return self.table.column(self.fieldRows[field])
+
+	def last(self, field):
+		return self.table.last(self.fieldRows[field])
+
+	def publish(self, owner):
+		for field in self.fieldRows:
+			setattr(owner, field, self.column(field))
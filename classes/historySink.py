@@ -0,0 +1,189 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : historySink.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Where a run's *History values go. A scenario hands each of
+#		its objects a table from its historySink, so a run can keep every
+#		step in memory, stream steps to a callback or to disk, or keep
+#		final values only
+#
+###############################################################################
+from numpy import empty, memmap, zeros
+from history import historyTable
+import json
+import os
+
+def seriesName(listName, ind, field):
+	#name of one object's history series in a sink, e.g.
+	#'loanList[0].principalHistory'. The scenario's own series are
+	#named by field alone
+	return '%s[%d].%s' % (listName, ind, field)
+
+def writeManifest(directory, config, columns):
+	#manifest.json for a directory of history series. config is the
+	#scenario's getConfig(), columns maps each series name to its file
+	#and length. See columnStore.py for reading it back
+	manifest = {
+		'version': 1,
+		'dtype': '<f8',
+		'config': config,
+		'columns': columns
+	}
+	with open(os.path.join(directory, 'manifest.json'), 'w') as f:
+		json.dump(manifest, f, indent=1, sort_keys=True)
+
+###############################################################################
+#
+#	Tables
+#
+###############################################################################
+
+class lastValueTable:
+	#a historyTable that only keeps the most recent step. Histories
+	#published from it are empty
+	def __init__(self, fields, names):
+		self.fields = list(fields)
+		self.names = list(names)
+		self.fieldIndex = {}
+		for ind, field in enumerate(self.fields):
+			self.fieldIndex[field] = ind
+		self.values = zeros(len(self.fields))
+		self.length = 0
+
+	def reserve(self, capacity):
+		pass
+
+	def clear(self):
+		self.length = 0
+
+	def record(self, values):
+		self.values[:] = values
+		self.length += 1
+
+	def column(self, field):
+		return self.values[:0]
+
+	def last(self, field):
+		if self.length == 0:
+			raise IndexError('No values of %s have been recorded' % field)
+		return self.values[self.fieldIndex[field]]
+
+	def publish(self, owner):
+		for field in self.fields:
+			setattr(owner, field, self.column(field))
+
+class diskTable(lastValueTable):
+	#a table that appends each field to its own file of raw float64
+	#values. Steps are buffered blockSize at a time, so memory use
+	#doesn't grow with the length of the run
+	def __init__(self, fields, names, directory, blockSize=4096):
+		lastValueTable.__init__(self, fields, names)
+		self.paths = [
+			os.path.join(directory, name + '.f8') for name in self.names]
+		for path in self.paths:
+			open(path, 'wb').close()
+		self.buffer = historyTable(self.fields, blockSize)
+		self.blockSize = blockSize
+
+	def record(self, values):
+		lastValueTable.record(self, values)
+		self.buffer.record(values)
+		if self.buffer.length == self.blockSize: self.flush()
+
+	def flush(self):
+		for ind, path in enumerate(self.paths):
+			with open(path, 'ab') as f:
+				f.write(self.buffer.data[ind, :self.buffer.length]
+					.astype('<f8').tobytes())
+		self.buffer.clear()
+
+	def column(self, field):
+		#read only memmap of everything recorded so far
+		self.flush()
+		if self.length == 0: return empty(0)
+		return memmap(self.paths[self.fieldIndex[field]],
+			dtype='<f8', mode='r', shape=(self.length,))
+
+###############################################################################
+#
+#	Sinks
+#
+###############################################################################
+
+class memorySink:
+	#every step kept in memory and published as arrays on each object.
+	#This is the default
+	def open(self, scen):
+		self.tables = []
+
+	def table(self, fields, names):
+		table = historyTable(fields)
+		self.tables.append(table)
+		return table
+
+	def endStep(self):
+		pass
+
+	def close(self):
+		pass
+
+	def shared(self):
+		#objects a scenarioCheckpoint shares between copies of a run
+		#rather than copying
+		return []
+
+class nullSink(memorySink):
+	#nothing but final values. Histories are published empty
+	def table(self, fields, names):
+		table = lastValueTable(fields, names)
+		self.tables.append(table)
+		return table
+
+class callbackSink(nullSink):
+	#callback(record) is called at the end of every step with a dict of
+	#series name to that step's value. Nothing else is kept
+	def __init__(self, callback):
+		self.callback = callback
+
+	def endStep(self):
+		record = {}
+		for table in self.tables:
+			record.update(zip(table.names, table.values.tolist()))
+		self.callback(record)
+
+	def shared(self):
+		return [self.callback]
+
+class diskSink(memorySink):
+	#every series is appended to directory/<name>.f8 as the run goes,
+	#with a manifest.json describing them written when the run ends.
+	#Published histories are read only memmaps of those files
+	def __init__(self, directory, blockSize=4096):
+		self.directory = directory
+		self.blockSize = blockSize
+
+	def open(self, scen):
+		memorySink.open(self, scen)
+		os.makedirs(self.directory, exist_ok=True)
+		self.config = scen.getConfig()
+
+	def table(self, fields, names):
+		table = diskTable(fields, names, self.directory, self.blockSize)
+		self.tables.append(table)
+		return table
+
+	def close(self):
+		columns = {}
+		for table in self.tables:
+			table.flush()
+			for name, path in zip(table.names, table.paths):
+				columns[name] = {
+					'file': os.path.basename(path),
+					'length': table.length}
+		writeManifest(self.directory, self.config, columns)
+
+	def shared(self):
+		#copies of a run would append to the same files
+		raise ValueError('Runs recorded by a diskSink cannot be copied')
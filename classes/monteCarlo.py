@@ -0,0 +1,334 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : monteCarlo.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Runs Monte Carlo paths of a simScenario across a pool of
+#		worker processes
+#
+###############################################################################
+from numpy import concatenate, column_stack, inf, sqrt
+from numpy.linalg import pinv
+from numpy.random import SeedSequence, default_rng
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+import os
+import simScenario
+
+class monteCarloResult:
+	def __init__(self):
+		self.nPaths = 0
+		self.entropy = -1
+		self.loanNames = []
+		self.investmentNames = []
+		self.expenseNames = []
+
+		#final values, one row per path
+		self.finalCash = []
+		self.minCash = []
+		self.finalLoanPrincipal = []
+		self.finalInvestmentPrincipal = []
+		self.totalTaxesPaid = []
+		self.totalSpend = []
+		#control variates, see ensemble.controlVariates()
+		self.controlNames = []
+		self.controls = []
+
+		#decimated histories, only filled in if historyStride is set
+		self.timeHistory = []
+		self.cashHistory = []
+		self.loanPrincipalHistory = []
+		self.investmentPrincipalHistory = []
+
+		#fanChart.fanChart of every path, only if one was given
+		self.fanChart = None
+
+		#set by runAdaptive() only. The estimate of each metric and the
+		#width of its confidence interval, keyed by metric name
+		self.converged = -1
+		self.confidence = -1
+		self.estimates = {}
+		self.intervalWidths = {}
+
+###############################################################################
+#
+#	Convergence metrics. Each gives one value per path of a chunk, and
+#	its estimate is their mean over paths
+#
+###############################################################################
+
+def finalCashMetric(chunk):
+	return chunk.finalCash
+
+def negativeCashMetric(chunk):
+	#1 for paths whose cash goes below zero at any step, so the estimate
+	#is the probability of running out of cash
+	return (chunk.minCash < 0).astype(float)
+
+def finalInvestmentMetric(chunk):
+	return chunk.finalInvestmentPrincipal.sum(axis=1)
+
+def finalNetWorthMetric(chunk):
+	return chunk.finalCash + chunk.finalInvestmentPrincipal.sum(axis=1) - \
+		chunk.finalLoanPrincipal.sum(axis=1)
+
+convergenceMetrics = {
+	'finalCash': finalCashMetric,
+	'negativeCash': negativeCashMetric,
+	'finalInvestmentPrincipal': finalInvestmentMetric,
+	'finalNetWorth': finalNetWorthMetric
+}
+
+#metrics that are probabilities, whose intervals are Wilson score
+#intervals so that they don't collapse to zero width while no path has
+#hit the event yet
+proportionMetrics = ['negativeCash']
+
+class runningMoments:
+	#count, mean and matrix of summed products of deviations of the
+	#columns of values added a batch at a time, merged as in
+	#fanChart.quantileSketch.mergeMoments()
+	def __init__(self):
+		self.count = 0
+		self.mean = 0.
+		self.m2 = 0.
+
+	def add(self, values):
+		values = values.reshape(len(values), -1)
+		count = len(values)
+		if count == 0: return
+		mean = values.mean(axis=0)
+		deviation = values - mean
+		total = self.count + count
+		delta = mean - self.mean
+		self.m2 = self.m2 + deviation.T.dot(deviation) + \
+			delta[:, None]*delta[None, :]*self.count*count/total
+		self.mean = self.mean + delta*count/total
+		self.count = total
+
+	def estimate(self):
+		#mean of the first column, with the other columns as control
+		#variates whose expected value is 0, and the variance of a single
+		#path's residual about it. The control estimate subtracts the
+		#part of the first column explained by a least squares fit on
+		#the controls
+		n = self.count
+		nControls = len(self.mean) - 1
+		if n - 1 - nControls <= 0: return self.mean[0], inf
+		covariance = self.m2[1:, 0]
+		beta = pinv(self.m2[1:, 1:]).dot(covariance)
+		residual = self.m2[0, 0] - covariance.dot(beta)
+		return self.mean[0] - beta.dot(self.mean[1:]), \
+			max(residual, 0.)/(n - 1 - nControls)
+
+def controlledMean(values, controls):
+	'''!
+	Mean over paths of values, adjusted by controls, a (paths x
+	controls) array of control variates with expected value 0 such as
+	ensembleResult.controls, and its standard error. Returns
+	(mean, standard error).
+	'''
+	moments = runningMoments()
+	moments.add(column_stack([values, controls]))
+	mean, variance = moments.estimate()
+	return mean, sqrt(variance/moments.count)
+
+def intervalWidth(moments, z, proportion):
+	#full width of the two sided confidence interval for the mean, with
+	#z the normal quantile of the confidence wanted
+	n = moments.count
+	if proportion:
+		p = moments.mean[0]
+		return 2*z*sqrt(p*(1 - p)/n + z**2/(4*n**2))/(1 + z**2/n)
+	mean, variance = moments.estimate()
+	return 2*z*sqrt(variance/n)
+
+###############################################################################
+#
+#	Runs
+#
+###############################################################################
+
+def runChunk(
+	config, nPaths, seedSequence, historyStride, fanChart=None,
+	sampling='random'):
+	#run one chunk of paths. This is what each worker executes, so it
+	#only takes picklable arguments: the scenario is rebuilt from its
+	#config rather than shipped with its back references and histories
+	scen = simScenario.fromConfig(config)
+	result = scen.propagateEnsemble(
+		nPaths,
+		rng=default_rng(seedSequence),
+		recordHistory=historyStride is not None,
+		historyStride=historyStride or 1,
+		fanChart=fanChart,
+		sampling=sampling)
+
+	#drop everything the caller didn't ask for before pickling back
+	if historyStride is None:
+		result.cashHistory = []
+		result.loanPrincipalHistory = []
+		result.investmentPrincipalHistory = []
+	result.spendHistory = []
+	return result
+
+def checkRunSizes(nPaths, chunkSize, nWorkers):
+	#a run needs at least one path, chunk and worker
+	for name, value in [
+		('nPaths', nPaths), ('chunkSize', chunkSize), ('nWorkers', nWorkers)]:
+		if value is not None and value < 1:
+			raise ValueError('%s must be at least 1, not %s' % (name, value))
+
+def runMonteCarlo(
+	scen, nPaths, nWorkers=None, seed=None,
+	chunkSize=1000, historyStride=None, fanChart=None,
+	sampling='random'):
+	'''!
+	Run nPaths paths of scen split across nWorkers processes. Paths are
+	cut into chunks of chunkSize and chunk i always draws from child i of
+	SeedSequence(seed), so the merged result depends on seed and
+	chunkSize but not on nWorkers. nWorkers=1 runs in this process.
+	historyStride keeps every historyStride'th step of each path's
+	history; by default only final values are returned. If fanChart, a
+	fanChart.fanChart, is given, each chunk fills its own and they are
+	merged into fanChart in chunk order. sampling is passed on to
+	ensemble.propagateEnsemble(); each chunk is its own randomized set
+	of points.
+	'''
+	checkRunSizes(nPaths, chunkSize, nWorkers)
+	seedSequence = SeedSequence(seed)
+	nChunks = -(-nPaths//chunkSize)
+	chunkSizes = [chunkSize]*(nChunks - 1) + \
+		[nPaths - chunkSize*(nChunks - 1)]
+	children = seedSequence.spawn(nChunks)
+	config = scen.getConfig()
+	if fanChart is None: charts = [None]*nChunks
+	else: charts = [fanChart.emptyCopy() for chunk in range(nChunks)]
+	args = (
+		[config]*nChunks, chunkSizes, children, [historyStride]*nChunks,
+		charts, [sampling]*nChunks)
+
+	if nWorkers == 1:
+		chunks = list(map(runChunk, *args))
+	else:
+		with ProcessPoolExecutor(nWorkers) as pool:
+			#map returns results in submission order, which keeps
+			#the merge independent of which worker finished first
+			chunks = list(pool.map(runChunk, *args))
+
+	return mergeChunks(chunks, seedSequence, historyStride, fanChart)
+
+def mergeChunks(chunks, seedSequence, historyStride, fanChart):
+	#one monteCarloResult of chunks' paths, in order
+	result = monteCarloResult()
+	result.nPaths = sum(chunk.nPaths for chunk in chunks)
+	result.entropy = seedSequence.entropy
+	result.loanNames = chunks[0].loanNames
+	result.investmentNames = chunks[0].investmentNames
+	result.expenseNames = chunks[0].expenseNames
+	result.controlNames = chunks[0].controlNames
+	for field in [
+		'finalCash', 'minCash', 'finalLoanPrincipal',
+		'finalInvestmentPrincipal', 'totalTaxesPaid', 'totalSpend',
+		'controls']:
+		setattr(result, field,
+			concatenate([getattr(chunk, field) for chunk in chunks]))
+	if fanChart is not None:
+		for chunk in chunks:
+			fanChart.merge(chunk.fanChart)
+		result.fanChart = fanChart
+	if historyStride is not None:
+		result.timeHistory = chunks[0].timeHistory
+		for field in [
+			'cashHistory', 'loanPrincipalHistory',
+			'investmentPrincipalHistory']:
+			setattr(result, field,
+				concatenate([getattr(chunk, field) for chunk in chunks]))
+	return result
+
+def runAdaptive(
+	scen, tolerances, confidence=0.95, batchSize=1000, maxPaths=100000,
+	nWorkers=None, seed=None, historyStride=None, fanChart=None,
+	sampling='random', controlVariates=0):
+	'''!
+	Run batches of batchSize paths of scen until the confidence interval
+	of every metric in tolerances is narrow enough, or maxPaths paths
+	have been run. tolerances is a dict from names in
+	convergenceMetrics, e.g. 'finalCash' or 'negativeCash' (the
+	probability that cash goes below zero), to the widest full width
+	allowed of that metric's confidence level confidence interval.
+
+	Batches are chunks as in runMonteCarlo() and convergence is checked
+	after each one in order, so the paths used are exactly those of
+	runMonteCarlo(scen, nPaths, seed=seed, chunkSize=batchSize) and
+	don't depend on nWorkers. Batches run nWorkers at a time, and any
+	run past the one that converged are dropped. historyStride,
+	fanChart and sampling are as for runMonteCarlo(). Intervals are
+	over paths, which overstates them wherever sampling other than
+	'random' does better than independent paths, so such runs may use
+	more paths than they need. If controlVariates is set, estimates
+	other than probabilities are adjusted by each path's controls (see
+	controlledMean()). Returns a monteCarloResult with
+	nPaths the number of paths used, converged set if every tolerance
+	was met, and the estimates and intervalWidths of every metric.
+	'''
+	checkRunSizes(maxPaths, batchSize, nWorkers)
+	metrics = dict((name, convergenceMetrics[name]) for name in tolerances)
+	moments = dict((name, runningMoments()) for name in tolerances)
+	z = NormalDist().inv_cdf(0.5 + confidence/2.)
+
+	seedSequence = SeedSequence(seed)
+	nBatches = -(-maxPaths//batchSize)
+	batchSizes = [batchSize]*(nBatches - 1) + \
+		[maxPaths - batchSize*(nBatches - 1)]
+	children = seedSequence.spawn(nBatches)
+	config = scen.getConfig()
+
+	if nWorkers == 1:
+		pool = None
+		roundSize = 1
+	else:
+		pool = ProcessPoolExecutor(nWorkers)
+		roundSize = nWorkers or os.cpu_count() or 1
+
+	chunks = []
+	widths = {}
+	converged = 0
+	try:
+		while not converged and len(chunks) < nBatches:
+			first = len(chunks)
+			batches = range(first, min(first + roundSize, nBatches))
+			if fanChart is None: charts = [None]*len(batches)
+			else: charts = [fanChart.emptyCopy() for batch in batches]
+			args = (
+				[config]*len(batches), [batchSizes[ind] for ind in batches],
+				[children[ind] for ind in batches],
+				[historyStride]*len(batches), charts,
+				[sampling]*len(batches))
+			if pool is None: results = map(runChunk, *args)
+			else: results = pool.map(runChunk, *args)
+
+			for chunk in results:
+				chunks.append(chunk)
+				for name in tolerances:
+					values = metrics[name](chunk)
+					if controlVariates and name not in proportionMetrics:
+						values = column_stack([values, chunk.controls])
+					moments[name].add(values)
+					widths[name] = intervalWidth(moments[name], z,
+						name in proportionMetrics)
+				converged = int(all(widths[name] <= tolerances[name]
+					for name in tolerances))
+				if converged: break
+	finally:
+		if pool is not None: pool.shutdown(cancel_futures=True)
+
+	result = mergeChunks(chunks, seedSequence, historyStride, fanChart)
+	result.converged = converged
+	result.confidence = confidence
+	result.estimates = dict(
+		(name, float(moments[name].estimate()[0])) for name in tolerances)
+	result.intervalWidths = dict(
+		(name, float(widths[name])) for name in tolerances)
+	return result
@@ -0,0 +1,91 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : payoffOptimizer.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Compares strategies for spending a monthly surplus on a
+#		scenario's loans: avalanche, snowball and the best priority order
+#		found by searching many orders at once
+#
+###############################################################################
+from numpy import argmin, array, lexsort, vstack
+from numpy.random import default_rng
+from itertools import permutations
+from math import factorial
+import amortization
+import datetime
+
+class payoffPlan:
+	def __init__(self):
+		self.strategy = -1
+		#loan indices into the scenario's loanList, highest priority first
+		self.order = []
+		self.loanNames = []
+		self.totalInterest = -1
+		self.totalPayment = -1
+		#date the last loan is paid off, NaT if it isn't within maxMonths
+		self.payoffDate = -1
+		self.loanPayoffDates = []
+
+def optimizePayoff(
+	scen, monthlySurplus, maxMonths=1200, maxPolicies=5000, seed=None):
+	'''!
+	Plans for paying off scen.loanList with monthlySurplus on top of the
+	minimum payments. Freed up minimums roll into the surplus as loans are
+	paid off. Returns a dict of payoffPlans keyed 'avalanche' (highest
+	rate first), 'snowball' (smallest balance first) and 'optimal'. The
+	optimal plan is the lowest interest priority order among every order
+	of the loans, or among maxPolicies random orders when there are too
+	many loans to try them all.
+	'''
+	loanList = scen.loanList
+	if len(loanList) == 0:
+		raise ValueError('The scenario has no loans to pay off')
+	startDate = scen.startDate + datetime.timedelta(scen.startTime)
+	principal = array(
+		[loan.initialPrincipal for loan in loanList], dtype=float)
+	rate = array([loan.interestRate for loan in loanList], dtype=float)
+	minimumPayment = array(
+		[loan.minimumPayment for loan in loanList], dtype=float)
+	paymentDOM = [loan.paymentDOM for loan in loanList]
+	nLoans = len(loanList)
+
+	#lexsort sorts by its last key first
+	avalanche = lexsort((principal, -rate))
+	snowball = lexsort((-rate, principal))
+	if factorial(nLoans) <= maxPolicies:
+		candidates = array(list(permutations(range(nLoans))))
+	else:
+		rng = default_rng(seed)
+		candidates = array([
+			rng.permutation(nLoans) for ind in range(maxPolicies)])
+	orders = vstack([avalanche, snowball, candidates.reshape(-1, nLoans)])
+
+	schedule = amortization.amortizeLoans(
+		principal, rate, minimumPayment, monthlySurplus, orders,
+		startDate, maxMonths, paymentDOM)
+	totalInterest = schedule.totalInterest.sum(axis=1)
+	totalPayment = schedule.totalPayment.sum(axis=1)
+
+	#orders that leave a loan unpaid by maxMonths can look cheap only
+	#because interest stopped being counted, so they rank last
+	unpaid = (schedule.monthsToPayoff == -1).any(axis=1)
+	rank = totalInterest.copy()
+	rank[unpaid] = float('inf')
+	best = argmin(rank)
+
+	plans = {}
+	for strategy, ind in [
+		('avalanche', 0), ('snowball', 1), ('optimal', best)]:
+		plan = payoffPlan()
+		plan.strategy = strategy
+		plan.order = orders[ind]
+		plan.loanNames = [loanList[x].name for x in orders[ind]]
+		plan.totalInterest = totalInterest[ind]
+		plan.totalPayment = totalPayment[ind]
+		plan.loanPayoffDates = schedule.payoffDate[ind]
+		if unpaid[ind]: plan.payoffDate = array('NaT', dtype='datetime64[D]')
+		else: plan.payoffDate = schedule.payoffDate[ind].max()
+		plans[strategy] = plan
+	return plans
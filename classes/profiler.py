@@ -0,0 +1,76 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : profiler.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Wall time and call counts for each phase of a simulation
+#		step, e.g. loan accrual or paying taxes, for finding where a slow
+#		run spends its time
+#
+###############################################################################
+from time import perf_counter
+
+class phaseProfiler:
+	'''!
+	Set scen.profiler to one of these before a run to time it. Each phase
+	of simScenario.step() is timed on its own and the times are totaled
+	by (phase, account type). If callback is given it is called as
+	callback(phase, accountType, seconds) every time a phase ends.
+	'''
+	def __init__(self, callback=None):
+		self.callback = callback
+		self.reset()
+
+	def reset(self):
+		self.times = {}
+		self.calls = {}
+		self.last = perf_counter()
+
+	def start(self):
+		#called as a step begins
+		self.last = perf_counter()
+
+	def mark(self, phase, accountType):
+		#called as each phase ends. The time since the last mark is
+		#charged to this phase
+		now = perf_counter()
+		seconds = now - self.last
+		self.last = now
+		key = (phase, accountType)
+		if key in self.times:
+			self.times[key] += seconds
+			self.calls[key] += 1
+		else:
+			self.times[key] = seconds
+			self.calls[key] = 1
+		if self.callback is not None:
+			self.callback(phase, accountType, seconds)
+
+	def report(self):
+		'''!
+		A list of dicts, one per (phase, account type), with keys phase,
+		accountType, time (total seconds), calls and fraction (of all
+		time profiled). Slowest first.
+		'''
+		total = sum(self.times.values())
+		report = []
+		for key in self.times:
+			report.append({
+				'phase': key[0],
+				'accountType': key[1],
+				'time': self.times[key],
+				'calls': self.calls[key],
+				'fraction': self.times[key]/total if total > 0 else 0.
+			})
+		return sorted(report, key=lambda x: -x['time'])
+
+	def summary(self):
+		#report() as a printable table
+		lines = ['%-12s %-12s %10s %10s %7s' % (
+			'phase', 'type', 'time (s)', 'calls', '%')]
+		for row in self.report():
+			lines.append('%-12s %-12s %10.4f %10d %6.1f%%' % (
+				row['phase'], row['accountType'], row['time'],
+				row['calls'], 100*row['fraction']))
+		return '\n'.join(lines)
@@ -0,0 +1,289 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : quasiRandom.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Variance reduced draws for the ensemble engine: antithetic
+#		pairs, Latin hypercube samples and scrambled Sobol points, all
+#		given through the parts of numpy's Generator the engine and the
+#		return models use
+#
+###############################################################################
+from numpy import arange, array, concatenate, empty, log, prod
+from numpy import eye, matmul, repeat, sqrt, tril, uint64, where, zeros
+from numpy.random import default_rng
+
+samplingMethods = ['random', 'antithetic', 'latinHypercube', 'sobol']
+
+#fewest values drawn at a time by Latin hypercube and Sobol samplers
+sampleBlockValues = 1 << 16
+
+###############################################################################
+#
+#	Inverse normal CDF
+#
+###############################################################################
+
+#Acklam's rational approximation, good to a relative error of about
+#1e-9, which is far below anything sampling can resolve
+acklamA = [-3.969683028665376e+01, 2.209460984245205e+02,
+	-2.759285104469687e+02, 1.383577518672690e+02,
+	-3.066479806614716e+01, 2.506628277459239e+00]
+acklamB = [-5.447609879822406e+01, 1.615858368580409e+02,
+	-1.556989798598866e+02, 6.680131188771972e+01,
+	-1.328068155288572e+01]
+acklamC = [-7.784894002430293e-03, -3.223964580411365e-01,
+	-2.400758277161838e+00, -2.549732539343734e+00,
+	4.374664141464968e+00, 2.938163982698783e+00]
+acklamD = [7.784695709041462e-03, 3.224671290700398e-01,
+	2.445134137142996e+00, 3.754408661907416e+00]
+acklamTail = 0.02425
+
+def polynomial(coefficients, x):
+	#coefficients[0]*x**(n - 1) + ... + coefficients[-1]
+	result = zeros(x.shape) + coefficients[0]
+	for coefficient in coefficients[1:]:
+		result = result*x + coefficient
+	return result
+
+def inverseNormal(u):
+	'''!
+	Standard normal quantiles of u, an array of values strictly between
+	0 and 1.
+	'''
+	u = array(u, dtype=float)
+	tail = where(u < 0.5, u, 1 - u)
+	inTail = tail < acklamTail
+
+	q = u - 0.5
+	r = q*q
+	central = polynomial(acklamA, r)*q/(polynomial(acklamB, r)*r + 1)
+
+	t = sqrt(-2*log(where(inTail, tail, acklamTail)))
+	lower = polynomial(acklamC, t)/(polynomial(acklamD, t)*t + 1)
+	return where(inTail, where(u < 0.5, lower, -lower), central)
+
+###############################################################################
+#
+#	Sobol points. Direction numbers come from the primitive polynomials
+#	over GF(2) of degree up to sobolDegree, found when first needed, with
+#	odd initial numbers drawn once from a fixed seed. Every set of points
+#	is scrambled with a random lower triangular matrix and digital
+#	shift, so that each set is an independent unbiased sample
+#
+###############################################################################
+
+sobolBits = 32
+sobolDegree = 13
+sobolSeed = 20260101
+#direction numbers, (dimensions x sobolBits), filled in by directions()
+sobolDirections = None
+
+def polyMulMod(a, b, p, degree):
+	#a*b mod p over GF(2), with polynomials as the bits of ints
+	result = 0
+	while b:
+		if b & 1: result ^= a
+		b >>= 1
+		a <<= 1
+		if a >> degree & 1: a ^= p
+	return result
+
+def polyPowMod(a, power, p, degree):
+	result = 1
+	while power:
+		if power & 1: result = polyMulMod(result, a, p, degree)
+		a = polyMulMod(a, a, p, degree)
+		power >>= 1
+	return result
+
+def primeFactors(n):
+	factors = []
+	factor = 2
+	while factor*factor <= n:
+		if n%factor == 0:
+			factors.append(factor)
+			while n%factor == 0: n //= factor
+		factor += 1
+	if n > 1: factors.append(n)
+	return factors
+
+def primitivePolynomials(degree):
+	#every primitive polynomial of degree over GF(2), i.e. those for
+	#which x has order 2**degree - 1, in increasing order
+	order = 2**degree - 1
+	factors = primeFactors(order)
+	found = []
+	for middle in range(2**(degree - 1)):
+		p = 1 << degree | middle << 1 | 1
+		x = 2 % p
+		if polyPowMod(x, order, p, degree) != 1: continue
+		if all(polyPowMod(x, order//factor, p, degree) != 1
+			for factor in factors):
+			found.append(p)
+	return found
+
+def directions():
+	#direction numbers of every Sobol dimension, as ints whose top bit
+	#is the first binary digit
+	global sobolDirections
+	if sobolDirections is not None: return sobolDirections
+	rng = default_rng(sobolSeed)
+	#the first dimension is the van der Corput sequence
+	table = [[1 << (sobolBits - k) for k in range(1, sobolBits + 1)]]
+	for degree in range(1, sobolDegree + 1):
+		for p in primitivePolynomials(degree):
+			m = [int(rng.integers(0, 2**(k - 1)))*2 + 1
+				for k in range(1, degree + 1)]
+			for k in range(degree, sobolBits):
+				new = m[k - degree] ^ m[k - degree] << degree
+				for j in range(1, degree):
+					if p >> (degree - j) & 1: new ^= m[k - j] << j
+				m.append(new)
+			table.append([m[k] << (sobolBits - 1 - k)
+				for k in range(sobolBits)])
+	sobolDirections = array(table, dtype=uint64)
+	return sobolDirections
+
+def sobolPoints(first, nDims, nPoints, rng):
+	'''!
+	Points 0 to nPoints - 1 of Sobol dimensions first to
+	first + nDims - 1 as an (nPoints x nDims) array of uniforms, each
+	dimension scrambled with its own random matrix and shift from rng.
+	'''
+	bits = sobolBits
+	v = directions()[first:first + nDims]
+	if v.shape[0] < nDims:
+		raise ValueError('Only %d Sobol dimensions are available' % \
+			len(directions()))
+
+	#each dimension's generator matrix, whose column k is the bits of
+	#direction k from the top, is multiplied over GF(2) by a random
+	#lower triangular matrix with a unit diagonal
+	digits = arange(bits - 1, -1, -1, dtype=uint64)
+	matrix = (v[:, None, :] >> digits[None, :, None]) & uint64(1)
+	scramble = tril(rng.integers(0, 2, (nDims, bits, bits)), -1) + \
+		eye(bits, dtype=int)
+	matrix = matmul(scramble, matrix.astype(int))%2
+	scrambled = (matrix.astype(uint64) << digits[None, :, None]).sum(axis=1)
+	shift = rng.integers(0, 2**bits, nDims, dtype=uint64)
+
+	#point i is the xor of the directions picked by the bits of its
+	#Gray code
+	index = arange(nPoints, dtype=uint64)
+	gray = index ^ (index >> uint64(1))
+	points = zeros((nPoints, nDims), dtype=uint64) + shift
+	for k in range(max(1, int(nPoints - 1).bit_length())):
+		pick = (gray >> uint64(k) & uint64(1)).astype(bool)
+		points[pick] ^= scrambled[:, k]
+	return (points + 0.5)/2.**bits
+
+###############################################################################
+#
+#	Samplers
+#
+###############################################################################
+
+class variateSampler:
+	'''!
+	Stands in for a numpy.random.Generator in the ensemble engine. Every
+	call to random(), standard_normal() or normal() must ask for an
+	array whose first axis is nPaths; each of its other elements is a
+	new dimension, sampled across paths by method:
+
+	'antithetic': the second half of the paths mirror the first, u and
+		1 - u for uniforms and z and -z for normals
+	'latinHypercube': each dimension has one uniform in each of nPaths
+		equal strata, in random order
+	'sobol': scrambled Sobol points, one dimension after another. Paths
+		are best a power of 2. Dimensions past those available are
+		Latin hypercube samples
+
+	Every dimension keeps its exact distribution, so means are unbiased.
+	Other Generator methods, e.g. integers(), are rng's own.
+	'''
+	def __init__(self, rng, method, nPaths):
+		if method not in samplingMethods:
+			raise ValueError('Unknown sampling method: ' + str(method))
+		self.rng = rng
+		self.method = method
+		self.nPaths = nPaths
+		#next Sobol dimension to use
+		self.dimension = 0
+		#dimensions drawn ahead, see fill(), and the next one to use
+		self.buffer = empty((0, nPaths))
+		self.next = 0
+
+	def __getattr__(self, name):
+		return getattr(self.rng, name)
+
+	def shape(self, size):
+		if size is None: size = ()
+		elif not hasattr(size, '__len__'): size = (size,)
+		if len(size) == 0 or size[0] != self.nPaths:
+			raise ValueError('Draws must be of every path at once')
+		return tuple(size)
+
+	def uniforms(self, size):
+		#(paths x dimensions) uniforms for an array of size
+		nDims = int(prod(size[1:]))
+		if self.method not in ['latinHypercube', 'sobol']:
+			return self.rng.random((self.nPaths, nDims))
+		columns = []
+		while nDims > 0:
+			if self.next == len(self.buffer): self.fill(nDims)
+			take = min(nDims, len(self.buffer) - self.next)
+			columns.append(self.buffer[self.next:self.next + take])
+			self.next += take
+			nDims -= take
+		return concatenate(columns).T
+
+	def fill(self, nDims):
+		#draw the next dimensions into the buffer as (dimensions x
+		#paths). At least sampleBlockValues values are drawn at a time,
+		#since most draws are of a single dimension and each call to
+		#sobolPoints() costs far more than one dimension of it
+		nDims = max(nDims, sampleBlockValues//self.nPaths)
+		nSobol = 0
+		if self.method == 'sobol':
+			nSobol = max(0, min(nDims, len(directions()) - self.dimension))
+		blocks = []
+		if nSobol > 0:
+			blocks.append(
+				sobolPoints(self.dimension, nSobol, self.nPaths, self.rng).T)
+			self.dimension += nSobol
+		if nSobol < nDims:
+			blocks.append(self.latinHypercube(nDims - nSobol))
+		self.buffer = concatenate(blocks)
+		self.next = 0
+
+	def latinHypercube(self, nDims):
+		#(dimensions x paths) uniforms, one in each of nPaths strata
+		nPaths = self.nPaths
+		strata = self.rng.permuted(
+			repeat(arange(nPaths)[None, :], nDims, axis=0), axis=1)
+		return (strata + self.rng.random((nDims, nPaths)))/nPaths
+
+	def mirrored(self, draw, size, mirror):
+		#the first half of the paths drawn, the second half mirrored
+		half = draw((-(-self.nPaths//2),) + size[1:])
+		return concatenate([half, mirror(half)])[:self.nPaths]
+
+	def random(self, size=None):
+		size = self.shape(size)
+		if self.method == 'random': return self.rng.random(size)
+		if self.method == 'antithetic':
+			return self.mirrored(self.rng.random, size, lambda u: 1 - u)
+		return self.uniforms(size).reshape(size)
+
+	def standard_normal(self, size=None):
+		size = self.shape(size)
+		if self.method == 'random': return self.rng.standard_normal(size)
+		if self.method == 'antithetic':
+			return self.mirrored(
+				self.rng.standard_normal, size, lambda z: -z)
+		return inverseNormal(self.uniforms(size)).reshape(size)
+
+	def normal(self, loc=0., scale=1., size=None):
+		return loc + scale*self.standard_normal(size)
@@ -0,0 +1,109 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : returnModels.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Random investment return models. Each one draws the log
+#		growth of an investment for every step of a run, for many paths,
+#		in one call before the run starts
+#
+###############################################################################
+from numpy import array, asarray, concatenate, cumsum, empty, full, sqrt
+from numpy.linalg import matrix_power
+from historicalReturns import bootstrapReturn
+
+class lognormalReturn:
+	'''!
+	Geometric Brownian motion. drift and volatility are annual and in
+	percent, like interestRate, so that with no volatility an investment
+	grows exactly as it would at interestRate = drift.
+	'''
+	def __init__(self, drift=7., volatility=15.):
+		self.drift = drift
+		self.volatility = volatility
+
+	def sample(self, stepLengths, nPaths, rng, state=None):
+		#log growth over each of stepLengths (days) for nPaths paths, as
+		#a (paths x steps) array. state carries a path on from one call
+		#to the next; this model has none
+		t = asarray(stepLengths, dtype=float)/365.
+		mu = self.drift/100.
+		sigma = self.volatility/100.
+		z = rng.standard_normal((nPaths, len(t)))
+		return (mu - sigma**2/2)*t + sigma*sqrt(t)*z, None
+
+	def getConfig(self):
+		return {
+			'model': 'lognormal',
+			'drift': self.drift,
+			'volatility': self.volatility}
+
+class regimeSwitchingReturn:
+	'''!
+	Geometric Brownian motion whose drift and volatility (annual,
+	percent) switch between regimes, e.g. bull and bear markets, as a
+	Markov chain. transition[i][j] is the chance of moving from regime i
+	to regime j over one day. Every path starts in initialRegime.
+	'''
+	def __init__(self, drifts, volatilities, transition, initialRegime=0):
+		self.drifts = list(drifts)
+		self.volatilities = list(volatilities)
+		self.transition = [list(x) for x in transition]
+		self.initialRegime = initialRegime
+
+	def sample(self, stepLengths, nPaths, rng, state=None):
+		#as lognormalReturn.sample(). state is each path's regime after
+		#the last step
+		stepLengths = asarray(stepLengths, dtype=float)
+		t = stepLengths/365.
+		mu = array(self.drifts)/100.
+		sigma = array(self.volatilities)/100.
+		transition = array(self.transition, dtype=float)
+		nRegimes = len(mu)
+
+		if state is None: regime = full(nPaths, self.initialRegime)
+		else: regime = state.copy()
+		z = rng.standard_normal((nPaths, len(t)))
+		u = rng.random((nPaths, len(t)))
+
+		#cumulative transition probabilities over each step length
+		#seen, for picking the next regime from a uniform draw
+		cumulative = {}
+		logGrowth = empty((nPaths, len(t)))
+		for step in range(len(t)):
+			logGrowth[:, step] = (mu[regime] - sigma[regime]**2/2)*t[step] + \
+				sigma[regime]*sqrt(t[step])*z[:, step]
+			days = int(round(stepLengths[step]))
+			if days not in cumulative:
+				cumulative[days] = \
+					cumsum(matrix_power(transition, days), axis=1)
+			regime = (u[:, step, None] > cumulative[days][regime]).sum(axis=1)
+			regime[regime == nRegimes] = nRegimes - 1
+		return logGrowth, regime
+
+	def getConfig(self):
+		return {
+			'model': 'regimeSwitching',
+			'drifts': self.drifts,
+			'volatilities': self.volatilities,
+			'transition': self.transition,
+			'initialRegime': self.initialRegime}
+
+models = {
+	'lognormal': lognormalReturn,
+	'regimeSwitching': regimeSwitchingReturn,
+	'bootstrap': bootstrapReturn
+}
+
+def fromConfig(config):
+	#build a model from a dict made by its getConfig()
+	kwargs = dict(config)
+	model = models[kwargs.pop('model')]
+	return model(**kwargs)
+
+def cumulativeLogGrowth(model, stepLengths, rng):
+	#log growth from the start of a run through the end of each step
+	#for a single path, with a leading 0 for the start itself
+	logGrowth, state = model.sample(stepLengths, 1, rng)
+	return concatenate([[0.], cumsum(logGrowth[0])])
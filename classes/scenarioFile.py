@@ -0,0 +1,295 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : scenarioFile.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Loads scenarios from JSON or TOML files and runs them with
+#		no display, many at a time across worker processes, writing each
+#		one's results to its own directory
+#
+###############################################################################
+from numpy import asarray, percentile
+from concurrent.futures import ProcessPoolExecutor
+from historySink import nullSink, diskSink
+from fanChart import fanChart
+import simScenario
+import datetime
+import json
+import os
+
+#values a scenario file may leave out, in the layout of
+#simScenario.getConfig(). Accounts get their class defaults for any
+#field they leave out
+scenarioDefaults = {
+	'startTime': 0,
+	'endTime': 365,
+	'timeStep': 1,
+	'initialCash': 0,
+	'taxMonth': 4,
+	'taxDay': 15,
+	'seed': None,
+	'loans': [],
+	'investments': [],
+	'jobs': [],
+	'expenses': []
+}
+
+#percentiles of each ensemble result given in summaries
+summaryPercentiles = [5, 25, 50, 75, 95]
+
+###############################################################################
+#
+#	Loading
+#
+###############################################################################
+
+def readScenarioFile(path):
+	'''!
+	Config dict of the scenario in path, a .json or .toml file laid out
+	as simScenario.getConfig() writes it. Only startDate is required.
+	TOML has no null, so a scenario with no seed leaves seed out.
+	'''
+	if path.endswith('.toml'):
+		#tomllib is only in python 3.11 on, tomli is the same parser
+		try:
+			import tomllib
+		except ImportError:
+			import tomli as tomllib
+		with open(path, 'rb') as f:
+			fileConfig = tomllib.load(f)
+	else:
+		with open(path) as f:
+			fileConfig = json.load(f)
+
+	if 'startDate' not in fileConfig:
+		raise ValueError(path + ' has no startDate')
+	config = dict(scenarioDefaults)
+	config.update(fileConfig)
+	#TOML reads bare dates as dates
+	if isinstance(config['startDate'], datetime.date):
+		config['startDate'] = config['startDate'].isoformat()
+	return config
+
+def loadScenario(path):
+	return simScenario.fromConfig(readScenarioFile(path))
+
+###############################################################################
+#
+#	Running
+#
+###############################################################################
+
+def runScenarioFile(
+	path, directory, engine='propagate', nPaths=None, seed=None,
+	history=0, plot=0, sampling='random'):
+	'''!
+	Run the scenario in path and write its results to directory. A
+	summary.json of final values is always written. If history is set
+	every history series is recorded straight to directory/history as a
+	historySink.diskSink writes it, otherwise only final values are
+	kept. engine is 'propagate' or 'events' (see
+	simScenario.propagateEvents()). If nPaths is given an ensemble of
+	nPaths paths is run instead, and the summary gives the mean, std and
+	summaryPercentiles of each result, with its draws spread over paths
+	by sampling (see ensemble.propagateEnsemble()). seed replaces the
+	scenario's own.
+	If plot is set PNG plots are saved too. Returns the summary.
+	'''
+	if engine not in ['propagate', 'events']:
+		raise ValueError('Unknown engine: ' + str(engine))
+	scen = loadScenario(path)
+	if seed is not None: scen.seed = seed
+	os.makedirs(directory, exist_ok=True)
+
+	if nPaths is not None:
+		#plots are of bands over paths, which a fanChart keeps without
+		#holding every path's history
+		chart = None
+		if plot:
+			chart = fanChart(summaryPercentiles,
+				historyStride=max(1, scen.numberOfSteps()//500))
+		result = scen.propagateEnsemble(
+			nPaths, fanChart=chart, sampling=sampling)
+		summary = ensembleSummary(result)
+		if plot: plotEnsemble(chart, directory)
+	else:
+		if history:
+			scen.historySink = diskSink(os.path.join(directory, 'history'))
+		elif not plot:
+			scen.historySink = nullSink()
+		if engine == 'events': scen.propagateEvents()
+		else: scen.propagate()
+		summary = runSummary(scen)
+		summary['engine'] = engine
+		if plot: plotScenario(scen, directory)
+
+	summary['scenarioFile'] = os.path.abspath(path)
+	with open(os.path.join(directory, 'summary.json'), 'w') as f:
+		json.dump(summary, f, indent=1, sort_keys=True)
+	return summary
+
+def tryScenarioFile(path, directory, options):
+	#runScenarioFile() for a worker. A scenario that fails gives a
+	#summary holding its error so that the rest of a batch still runs
+	try:
+		return runScenarioFile(path, directory, **options)
+	except Exception as error:
+		return {
+			'scenarioFile': os.path.abspath(path),
+			'error': '%s: %s' % (type(error).__name__, error)}
+
+def outputDirectories(paths, directory):
+	#a directory under directory for each scenario file, named after
+	#the file, with a number added where names repeat
+	directories = []
+	used = set()
+	for path in paths:
+		name = os.path.splitext(os.path.basename(path))[0]
+		candidate = name
+		count = 1
+		while candidate in used:
+			count += 1
+			candidate = '%s_%d' % (name, count)
+		used.add(candidate)
+		directories.append(os.path.join(directory, candidate))
+	return directories
+
+def runScenarioFiles(paths, directory, nWorkers=None, **kwargs):
+	'''!
+	runScenarioFile() for every file in paths, across nWorkers processes
+	(nWorkers=1 runs them in this process). Results for each file go in
+	their own directory under directory, see outputDirectories(). Other
+	keyword arguments are passed on to runScenarioFile(). Returns the
+	summaries in the order of paths; a file that failed to run has an
+	'error' in its summary instead of results.
+	'''
+	directories = outputDirectories(paths, directory)
+	args = (paths, directories, [kwargs]*len(paths))
+	if nWorkers == 1 or len(paths) == 1:
+		return list(map(tryScenarioFile, *args))
+	with ProcessPoolExecutor(nWorkers) as pool:
+		return list(pool.map(tryScenarioFile, *args))
+
+###############################################################################
+#
+#	Summaries
+#
+###############################################################################
+
+def runSummary(scen):
+	#final values of a propagated scenario
+	loanPrincipal = sum([loan.finalPrincipal for loan in scen.loanList])
+	investmentPrincipal = sum([investment.finalPrincipal
+		for investment in scen.investmentList])
+	return {
+		'nPaths': 1,
+		'finalTime': float(scen.finalTime),
+		'finalDate': (scen.startDate + \
+			datetime.timedelta(int(scen.finalTime))).isoformat(),
+		'finalCash': float(scen.finalCash),
+		'finalNetWorth': float(
+			scen.finalCash + investmentPrincipal - loanPrincipal),
+		'loans': [
+			{'name': loan.name, 'finalPrincipal': float(loan.finalPrincipal)}
+			for loan in scen.loanList],
+		'investments': [
+			{'name': investment.name,
+				'finalPrincipal': float(investment.finalPrincipal)}
+			for investment in scen.investmentList]
+	}
+
+def statistics(values):
+	#mean, std and summaryPercentiles of values over paths
+	values = asarray(values, dtype=float)
+	summary = {'mean': float(values.mean()), 'std': float(values.std())}
+	for p, value in zip(summaryPercentiles,
+		percentile(values, summaryPercentiles)):
+		summary['p%d' % p] = float(value)
+	return summary
+
+def ensembleSummary(result):
+	#statistics of each result of an ensembleResult
+	netWorth = result.finalCash + \
+		result.finalInvestmentPrincipal.sum(axis=1) - \
+		result.finalLoanPrincipal.sum(axis=1)
+	return {
+		'engine': 'ensemble',
+		'nPaths': result.nPaths,
+		'finalTime': float(result.finalTime),
+		'finalCash': statistics(result.finalCash),
+		'finalNetWorth': statistics(netWorth),
+		'totalTaxesPaid': statistics(result.totalTaxesPaid),
+		'loans': [
+			{'name': name,
+				'finalPrincipal': statistics(result.finalLoanPrincipal[:, ind]),
+				'totalInterest': statistics(result.totalLoanInterest[:, ind]),
+				'totalPayment': statistics(result.totalLoanPayment[:, ind])}
+			for ind, name in enumerate(result.loanNames)],
+		'investments': [
+			{'name': name,
+				'finalPrincipal':
+					statistics(result.finalInvestmentPrincipal[:, ind])}
+			for ind, name in enumerate(result.investmentNames)],
+		'expenses': [
+			{'name': name,
+				'totalSpend': statistics(result.totalSpend[:, ind])}
+			for ind, name in enumerate(result.expenseNames)]
+	}
+
+###############################################################################
+#
+#	Plots. matplotlib is only imported here, so that runs which don't
+#	plot never load it
+#
+###############################################################################
+
+def pyplot():
+	import matplotlib
+	matplotlib.use('Agg')
+	import matplotlib.pyplot as plt
+	return plt
+
+def plotScenario(scen, directory):
+	#principal of every loan and investment, and cash, over the run
+	plt = pyplot()
+	for accountList, fileName in [
+		(scen.loanList, 'loans.png'), (scen.investmentList, 'investments.png')]:
+		fig = plt.figure()
+		if len(accountList) > 0:
+			total = 0
+			for account in accountList:
+				plt.plot(scen.timeHistory, account.principalHistory,
+					label=str(account.name))
+				total = total + asarray(account.principalHistory)
+			plt.plot(scen.timeHistory, total, 'k', label='Total')
+			plt.legend()
+		plt.xlabel('Days')
+		plt.ylabel('Principal')
+		fig.savefig(os.path.join(directory, fileName))
+		plt.close(fig)
+
+	fig = plt.figure()
+	plt.plot(scen.timeHistory, scen.cashHistory)
+	plt.xlabel('Days')
+	plt.ylabel('Cash')
+	fig.savefig(os.path.join(directory, 'cash.png'))
+	plt.close(fig)
+
+def plotEnsemble(chart, directory):
+	#percentile bands of cash and net worth from a fanChart of
+	#summaryPercentiles
+	plt = pyplot()
+	for name, label in [('cash', 'Cash'), ('netWorth', 'Net Worth')]:
+		low, lower, median, upper, high = chart.bands(name)
+		fig = plt.figure()
+		plt.fill_between(chart.timeHistory, low, high, alpha=0.2,
+			label='%d-%d%%' % (summaryPercentiles[0], summaryPercentiles[-1]))
+		plt.fill_between(chart.timeHistory, lower, upper, alpha=0.4,
+			label='%d-%d%%' % (summaryPercentiles[1], summaryPercentiles[-2]))
+		plt.plot(chart.timeHistory, median, 'k', label='Median')
+		plt.legend()
+		plt.xlabel('Days')
+		plt.ylabel(label)
+		fig.savefig(os.path.join(directory, name + '.png'))
+		plt.close(fig)
@@ -0,0 +1,96 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : simCalendar.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Calendar of every step in a simulation run, built once so
+#		the main loop never does date arithmetic
+#
+###############################################################################
+from numpy import arange, asarray, concatenate, cumsum, datetime64, diff
+import datetime
+
+class simCalendar:
+	def __init__(
+		self, startDate, times, taxMonth=4, taxDay=15, startTime=None):
+		#times are the simulation times (days since startDate) of each
+		#step in the run. Step ind covers the days after the previous
+		#step's time through times[ind]; the first step starts after
+		#startTime, which defaults to one day before the first time
+		self.startDate = startDate
+		self.times = asarray(times)
+		if startTime is None:
+			startTime = self.times[0] - 1 if len(self.times) > 0 else 0
+		self.startTime = startTime
+		self.dates = datetime64(startDate, 'D') + self.times.astype(int)
+		self.stepLength = diff(self.times, prepend=startTime)
+
+		years = self.dates.astype('datetime64[Y]')
+		months = self.dates.astype('datetime64[M]')
+		self.year = years.astype(int) + 1970
+		self.month = (months - years).astype(int) + 1
+		self.day = (self.dates - months).astype(int) + 1
+		self.dayOfYear = (self.dates - years).astype(int) + 1
+
+		#every day the run covers, so that events can be counted for
+		#steps longer than a day. A step ends on day stepEnd[ind] and
+		#starts after day stepEnd[ind - 1]
+		first = int(startTime) + 1
+		last = int(self.times[-1]) if len(self.times) > 0 else first - 1
+		allDates = datetime64(startDate, 'D') + arange(first, last + 1)
+		allMonths = allDates.astype('datetime64[M]')
+		self.allDay = (allDates - allMonths).astype(int) + 1
+		self.allMonth = (allMonths - allDates.astype('datetime64[Y]')) \
+			.astype(int) + 1
+		self.stepEnd = self.times.astype(int) - first + 1
+
+		#taxes are due on taxMonth/taxDay of every year, so leap
+		#years don't move the due date
+		self.isTaxDay = self.countDays(
+			(self.allMonth == taxMonth) & (self.allDay == taxDay)) > 0
+
+		#plain python copies for the per step lookups in the main loop,
+		#where indexing a list is much cheaper than indexing an array
+		self.timeList = self.times.tolist()
+		self.dayList = self.day.tolist()
+		self.taxDayList = self.isTaxDay.tolist()
+		self.stepLengthList = self.stepLength.tolist()
+
+		self.domCounts = {}
+		self.domCountLists = {}
+
+	def __len__(self):
+		return len(self.times)
+
+	def isDaily(self):
+		return bool((self.stepLength == 1).all())
+
+	def countDays(self, isDay):
+		#number of days in each step for which isDay, a mask over every
+		#day of the run, is set
+		total = concatenate([[0], cumsum(isDay)])
+		return total[self.stepEnd] - total[self.stepEnd - self.stepLength]
+
+	def count(self, dom):
+		#number of times day of month dom falls in each step. A dom of
+		#-1 (used by daily expenses) counts every day. With daily steps
+		#this is 1 on the steps that fall on dom and 0 elsewhere
+		if dom not in self.domCounts:
+			if dom == -1:
+				self.domCounts[dom] = self.stepLength.astype(int)
+			else:
+				self.domCounts[dom] = self.countDays(self.allDay == dom)
+		return self.domCounts[dom]
+
+	def countList(self, dom):
+		if dom not in self.domCountLists:
+			self.domCountLists[dom] = self.count(dom).tolist()
+		return self.domCountLists[dom]
+
+	def isDOM(self, dom):
+		#boolean mask of the steps in which day of month dom falls
+		return self.count(dom) > 0
+
+	def date(self, ind):
+		return self.startDate + datetime.timedelta(self.timeList[ind])
@@ -7,25 +7,62 @@
 #	Synopsis: Vehicle portion of the explorer object model
 # 
 ###############################################################################
-from numpy import empty, hstack, array
+from numpy import arange, datetime64, minimum
+from history import historyTable
+from accountBook import accountBook
+from historySink import memorySink, callbackSink, seriesName
+from simCalendar import simCalendar
+import accounts
+import ensemble
+import eventEngine
+import goalSeek
+import taxSchedule
+import returnModels
 import datetime
-from sys import exit
-import pdb
+import copy
+from numpy.random import SeedSequence, default_rng
 
 class simScenario:
+	historyFields = [
+		'timeHistory', 'cashHistory', 'savingsHistory',
+		'taxesPaidHistory', 'taxBillHistory', 'FICABillHistory']
+
 	def __init__(self):
 		self.startDate = -1
 		self.startTime = 0
 		self.endTime = self.startTime + 365
+		#days per step, or 'monthly' for steps of one calendar month
 		self.timeStep = 1
+		self.currentStepLength = self.timeStep
 		self.initialCash = 0
 
+		#taxes are paid on this month and day of every year
+		self.taxMonth = 4
+		self.taxDay = 15
+
 		#lists of objects belonging to scenario
 		self.loanList = []
 		self.investmentList = []
 		self.jobList = []
 		self.expenseList = []
 
+		#accountBook holding loans and investments during a run
+		self.book = None
+
+		#where *History values go during a run. See historySink.py
+		self.historySink = memorySink()
+
+		#seed for every random stream of a run. Runs with the same
+		#seed are identical. None seeds from fresh entropy each run
+		self.seed = None
+
+		#index of the next calendar step advance() will take
+		self.nextStep = 0
+
+		#phaseProfiler timing each phase of step(), or None for no
+		#profiling. See profiler.py
+		self.profiler = None
+
 		#use reset method to initialize current values
 		#and history arrays
 		self.resetCurrent()
@@ -62,6 +99,7 @@ class simScenario:
 		self.taxesPaidHistory = []
 		self.taxBillHistory = []
 		self.FICABillHistory = []
+		self.history = historyTable(self.historyFields)
 
 	def resetChildren(self):
 		#clear investments
@@ -92,28 +130,89 @@ class simScenario:
 			expense.resetChildren()
 		self.expenseList = []
 
-	def recordValues(self):
+	def numberOfSteps(self):
+		#number of passes through the main loop of propagate(). Used
+		#to size history storage once before a run
+		if self.endTime < self.startTime: return 0
+		if self.timeStep == 'monthly': return len(self.stepTimes())
+		return int((self.endTime - self.startTime)//self.timeStep) + 1
+
+	def stepTimes(self):
+		#time at the end of every step propagate() takes. As with
+		#daily steps, the last step is the first to end after endTime
+		if self.timeStep != 'monthly':
+			return self.startTime + \
+				self.timeStep*arange(1, self.numberOfSteps() + 1)
+		if self.endTime < self.startTime: return arange(0)
+
+		#monthly steps end on the day of month the run starts on, or
+		#on the last day of months too short to have it
+		startDate = datetime64(self.startDate, 'D')
+		start = startDate + int(self.startTime)
+		startMonth = start.astype('datetime64[M]')
+		months = startMonth + \
+			arange(1, int(self.endTime - self.startTime)//28 + 3)
+		ends = minimum(
+			months.astype('datetime64[D]') + (start - startMonth),
+			(months + 1).astype('datetime64[D]') - 1)
+		times = (ends - startDate).astype(int)
+		return times[:(times <= self.endTime).sum() + 1]
+
+	def buildCalendar(self):
+		#calendar of every step propagate() takes
+		return simCalendar(self.startDate, self.stepTimes(),
+			self.taxMonth, self.taxDay, self.startTime)
+
+	@property
+	def currentDate(self):
+		#only built when asked for. The main loop itself uses
+		#currentDay, which comes from the calendar
+		return self.startDate + datetime.timedelta(self.currentTime)
 
-		self.timeHistory = hstack([
-			self.timeHistory, self.currentTime])
-		self.cashHistory = hstack([
-			self.cashHistory, self.currentCash])
-		self.savingsHistory = hstack([
-			self.savingsHistory, self.currentSavings])
-		self.taxesPaidHistory = hstack([
-			self.taxesPaidHistory, self.currentTaxesPaid])
-		self.taxBillHistory = hstack([
-			self.taxBillHistory, self.currentTaxBill])
-		self.FICABillHistory = hstack([
-			self.FICABillHistory, self.currentFICABill])
+	def recordValues(self):
+		self.history.record([
+			self.currentTime,
+			self.currentCash,
+			self.currentSavings,
+			self.currentTaxesPaid,
+			self.currentTaxBill,
+			self.currentFICABill])
 
 	def recordFinalValues(self):
-		self.finalTime = self.timeHistory[-1]
-		self.finalCash = self.cashHistory[-1]
-		self.finalSavings = self.savingsHistory[-1]
-		self.finalTaxesPaid = self.taxesPaidHistory[-1]
-		self.finalTaxBill = self.taxBillHistory[-1]
-		self.finalFICABill = self.FICABillHistory[-1]
+		#a run with no steps, e.g. one whose endTime is before its
+		#first step, has no final values
+		if self.history.length == 0:
+			raise ValueError('No steps were run: endTime %s is before '
+				'the first step' % self.endTime)
+		self.history.publish(self)
+		self.finalTime = self.history.last('timeHistory')
+		self.finalCash = self.history.last('cashHistory')
+		self.finalSavings = self.history.last('savingsHistory')
+		self.finalTaxesPaid = self.history.last('taxesPaidHistory')
+		self.finalTaxBill = self.history.last('taxBillHistory')
+		self.finalFICABill = self.history.last('FICABillHistory')
+
+	def getConfig(self):
+		#everything needed to rebuild this scenario with fromConfig().
+		#Current values, histories and back references are left out
+		config = {
+			'startDate': self.startDate.isoformat(),
+			'startTime': self.startTime,
+			'endTime': self.endTime,
+			'timeStep': self.timeStep,
+			'initialCash': self.initialCash,
+			'taxMonth': self.taxMonth,
+			'taxDay': self.taxDay,
+			'seed': self.seed,
+			'loans': [accounts.getConfig(x) for x in self.loanList],
+			'investments':
+				[accounts.getConfig(x) for x in self.investmentList],
+			'jobs': [accounts.getConfig(x) for x in self.jobList],
+			'expenses': [accounts.getConfig(x) for x in self.expenseList]
+		}
+		if hasattr(config['initialCash'], 'item'):
+			config['initialCash'] = config['initialCash'].item()
+		return config
 
 	def addLoans(self,loanList):
 		for loan in loanList:
@@ -141,71 +240,121 @@ class simScenario:
 		taxableIncome = 0
 		withholding = 0
 		for job in self.jobList: 
-			taxableIncome += job.currentYearToDatePay 
-			taxableIncome -= job.currentIRAContributions%18500
-			taxableIncome -= job.current401kContributions%5500
+			taxableIncome += taxSchedule.taxableIncome(
+				job.currentYearToDatePay,
+				job.currentIRAContributions,
+				job.current401kContributions)
 			withholding += job.currentWithheldTax
 			job.currentWithheldTax = 0
 			#also remove monthly pretax payments
 
-		if taxType == 'California':
-			standardDeduction = 8472
-			dollarAmt = array([
-				16030,38002,59978,83258,105224,
-				537500,644998,1074996,1e12
-			])
-
-			percent = array([
-				1, 2, 4, 6, 8, 9.3,
-				10.3, 11.3, 12.3
-				])
-			self.currentFICABill = 0
-			personalExemption = 222
-
-		elif taxType == 'Federal':
-			standardDeduction = 24000
-
-			dollarAmt = array([
-				19050, 77400, 165000, 315000,
-				400000, 600000, 1e12
-				])
-
-			percent = array([
-				10, 12, 22, 24, 32, 35, 37
-				])
-			personalExemption = 0
-
-			socialSecurityBill = min([taxableIncome,118500])*0.062
-			medicareBill = taxableIncome*0.0145
-
-			self.currentFICABill = (socialSecurityBill + medicareBill)
-
-
-		#this is ugly AF
-		taxableIncome -= standardDeduction
-		if taxableIncome < 0: taxableIncome = 0
-		ind = dollarAmt < taxableIncome
-		if sum(ind) > 0:
-			lowerBrackets = \
-			sum((dollarAmt[ind] -hstack([0,dollarAmt[ind][0:-1]]))*percent[ind]/100)
-			highestAmount = dollarAmt[ind][-1]
-			highestPercent = percent[sum(ind)]
-			highestBracket = (taxableIncome - highestAmount)*highestPercent/100
-		else:
-			highestBracket = taxableIncome*percent[0]/100
-			lowerBrackets = 0
-		self.currentTaxBill = highestBracket + lowerBrackets
+		self.currentTaxBill, self.currentFICABill = \
+			self.computeTax(taxType, taxableIncome)
 
 		self.currentTaxesPaid += (self.currentTaxBill + self.currentFICABill - withholding)
 		self.currentCash -= (self.currentTaxBill + self.currentFICABill - withholding)
 
+	def computeTax(self,taxType,taxableIncome,taxYear=None):
+		#returns (income tax, FICA) owed to taxType on taxableIncome,
+		#which may be an array. Kept separate from payTaxes() so that
+		#engines that don't step job objects can share it. Taxes paid
+		#in a year are for the year before, so taxYear defaults to the
+		#year before currentDate
+		if taxYear is None: taxYear = self.currentDate.year - 1
+		schedule = taxSchedule.loadSchedule(taxType, taxYear)
+		return schedule.tax(taxableIncome)
+
+	def propagateEnsemble(self,nPaths,**kwargs):
+		#run nPaths Monte Carlo paths of this scenario at once. See
+		#ensemble.propagateEnsemble() for keyword arguments
+		return ensemble.propagateEnsemble(self,nPaths,**kwargs)
+
+	def goalSeek(self,parameter,lower,upper,**kwargs):
+		#value of parameter between lower and upper at which a goal is
+		#just met. See goalSeek.goalSeek() for keyword arguments
+		return goalSeek.goalSeek(self,parameter,lower,upper,**kwargs)
+
+	def seekDate(self,**kwargs):
+		#earliest date from which a metric stays on target. See
+		#goalSeek.seekDate()
+		return goalSeek.seekDate(self,**kwargs)
+
 	def propagate(self):
-		#record initial states as state at t0
+		#run the scenario one timeStep at a time from startTime
+		#through endTime
+		self.initializeRun()
+		self.advance()
+		self.finalizeRun()
+
+	def advance(self,endTime=None):
+		#take the steps of a run started by initializeRun() up to and
+		#including endTime, or through the end of the run
+		timeList = self.calendar.timeList
+		while self.nextStep < len(timeList):
+			if endTime is not None and timeList[self.nextStep] > endTime:
+				break
+			self.step(self.nextStep)
+			self.nextStep += 1
+
+	def checkpoint(self):
+		#snapshot of a run stopped part way with advance(). See
+		#scenarioCheckpoint
+		return scenarioCheckpoint(self)
+
+	def resume(self,endTime=None):
+		#carry on a run stopped part way, e.g. a scenarioCheckpoint
+		#fork. Loan and investment parameters changed since the run
+		#stopped take effect from here. The run is finalized once it
+		#reaches the end
+		self.book.refresh()
+		self.advance(endTime)
+		if self.nextStep == len(self.calendar):
+			self.finalizeRun()
+
+	def propagateRecords(self):
+		#generator version of propagate(). Yields a dict of series
+		#name to value for each step as it is taken, and keeps only
+		#final values, e.g.
+		#	for record in scen.propagateRecords(): print(record['cashHistory'])
+		records = []
+		sink = self.historySink
+		self.historySink = callbackSink(records.append)
+		try:
+			self.initializeRun()
+			for ind in range(len(self.calendar)):
+				self.step(ind)
+				yield records.pop()
+			self.finalizeRun()
+		finally:
+			self.historySink = sink
+
+	def propagateEvents(self):
+		#run the scenario stepping only between days where cash moves.
+		#See eventEngine.py
+		eventEngine.propagateEvents(self)
+
+	def initializeRun(self,nSteps=None):
+		#record initial states as state at t0. nSteps is the number
+		#of calls to step() that will follow, used to size histories.
+		#It defaults to every step in the calendar
+		self.calendar = self.buildCalendar()
+		if nSteps is None: nSteps = len(self.calendar)
+		self.nextStep = 0
 		self.currentTime = self.startTime
-		self.timeHistory = []
+		self.currentStepLength = 0
+		self.currentDay = -1
 		self.currentCash = self.initialCash
-		self.cashHistory = []
-		
+		self.historySink.open(self)
+
+		#every random stream of the run is spawned from seed. Expenses
+		#are spawned first so their streams don't depend on how many
+		#investments there are
+		seeds = SeedSequence(self.seed)
+		expenseStreams = seeds.spawn(len(self.expenseList))
+		self.resetHistory()
+		self.history = self.historySink.table(
+			self.historyFields, self.historyFields)
+		self.history.reserve(nSteps)
 
 		###############################################################
 		#
@@ -215,163 +364,268 @@ class simScenario:
 
 		for loan in self.loanList:
 			loan.currentPrincipal = loan.initialPrincipal
-			loan.principalHistory = loan.currentPrincipal
-			loan.accruedInterestHistory = []
-			loan.paymentHistory = []
-			loan.principalHistory = []
+			loan.resetHistory()
 
 		for investment in self.investmentList:
 			investment.currentPrincipal = investment.initialPrincipal
-			investment.principalHistory = investment.currentPrincipal
-			investment.principalHistory = []
-			investment.interestHistory = []
-			investment.contributionHistory = []
+			investment.resetHistory()
 
-		for job in self.jobList:
+		#loans and investments are stepped together as arrays in an
+		#accountBook. Their current values and histories live in the
+		#book until finalizeRun()
+		self.book = accountBook(
+			self.loanList, self.investmentList, self.historySink)
+		self.book.setCalendar(self.calendar)
+		self.book.bind()
+		self.book.reserve(nSteps)
+
+		#return paths for investments with a return model are drawn
+		#for the whole calendar before the run, each from its own
+		#stream spawned from seed
+		streams = seeds.spawn(len(self.investmentList))
+		stepLengths = self.calendar.stepLength
+		indices = []
+		logGrowth = []
+		for ind, investment in enumerate(self.investmentList):
+			if investment.returnModel is None: continue
+			indices.append(ind)
+			logGrowth.append(returnModels.cumulativeLogGrowth(
+				investment.returnModel, stepLengths,
+				default_rng(streams[ind])))
+		if len(indices) > 0: self.book.setReturnPaths(indices, logGrowth)
+
+		for ind, job in enumerate(self.jobList):
 			job.currentSalary = job.initialSalary
-			job.monthlyPayHistory = []
-			job.withheldTaxHistory = []
 			job.retirementAccounts = []
-			job.salaryHistory = []
+			job.resetCurrent()
+			job.resetHistory()
+			job.history = self.historySink.table(job.historyFields,
+				[seriesName('jobList', ind, x) for x in job.historyFields])
+			job.history.reserve(nSteps)
+
+		#each expense draws from its own stream spawned from seed, with
+		#the draws for the whole run made up front where they fit in
+		#one block
+		for ind, expense in enumerate(self.expenseList):
+			expense.rng = default_rng(expenseStreams[ind])
+			if expense.spendDOM == -1:
+				nDraws = nSteps
+			else:
+				nDraws = int(self.calendar.isDOM(expense.spendDOM).sum())
+			expense.resetDraws(min(nDraws, expense.drawBlockSize))
+			expense.resetHistory()
+			expense.history = self.historySink.table(expense.historyFields,
+				[seriesName('expenseList', ind, x)
+					for x in expense.historyFields])
+			expense.history.reserve(nSteps)
+
+	def step(self,ind):
+		#advance the scenario to step ind of the calendar. Interest
+		#accrues over the whole interval since the previous step, and
+		#the payments, paydays and spending that fall in it are made
+		#together after it. With steps longer than a day this is an
+		#approximation: interest is earned as if cash moved at the end
+		#of the step, and every payday in a step counts towards taxes
+		#due in that step, even those that follow the tax date
+		#with no profiler each phase only costs a truth test
+		profiler = self.profiler
+		if profiler: profiler.start()
+		time = self.calendar.timeList[ind]
+		self.currentStepLength = time - self.currentTime
+		self.currentTime = time
+		self.currentDay = self.calendar.dayList[ind]
+
+		###########################################################
+		#
+		# Loans and investments accrue interest continually. It
+		# is calculated at each time step for every account at
+		# once by the accountBook. Loans are paid their minimum
+		# on the days that match their paymentDOM. Further
+		# payment may be made below
+		#
+		###########################################################
 
+		self.book.accrueLoans(self.currentStepLength)
+		if profiler: profiler.mark('accrue', 'loan')
+		self.book.accrueInvestments(self.currentStepLength, ind)
+		if profiler: profiler.mark('accrue', 'investment')
+		self.currentCash -= self.book.payLoans(ind)
+		if profiler: profiler.mark('payment', 'loan')
 
-		###############################################################
+		###########################################################
 		#
-		# Main Simulation Loop
+		# Jobs pay once a month. The amount paid is equal to the
+		# job's salary divided by 12 less any monthly withholding,
+		# social security, and medicare payments
 		#
-		###############################################################
+		###########################################################
 
-		while self.currentTime <= self.endTime:
-			self.currentTime += self.timeStep
-			self.currentDate = self.startDate + datetime.timedelta(
-				self.currentTime)
-
-			###########################################################
-			#
-			# Loans accrue interest continually. It is calculated
-			# at each time step. loan.makePayment() is called at
-			# each time step as well, but it will only do anything
-			# if the DOM is equal to the day that loan is paid
-			#
-			###########################################################
-
-			for loan in self.loanList:
-				loan.accrue()
-				#makePayment with no keyword argument will pay minimum
-				#further payment may be made below
-				loan.makePayment()
-
-			###########################################################
-			#
-			# Investments accrue interest continually. It is calculated
-			# at each time step. i
-			#
-			###########################################################
-
-			for investment in self.investmentList:
-				investment.accrue()
-
-			###########################################################
-			#
-			# Jobs pay once a month. The amount paid is equal to the
-			# job's salary divided by 12 less any monthly withholding,
-			# social security, and medicare payments
-			#
-			###########################################################
+		for job in self.jobList:
+			job.payday(self.calendar.countList(job.payDOM)[ind])
+		if profiler: profiler.mark('payday', 'job')
 
-			for job in self.jobList:
-				job.payday()
-
-			###########################################################
-			#
-			#	Taxes are paid once a year on 4/15 and a 2% cost of
-			#	living raise is applied each 1/1
-			#
-			###########################################################
-
-
-			if self.currentTime%365 == 105:
-				self.payTaxes('California')
-				self.payTaxes('Federal')
-				for job in self.jobList: job.currentYearToDatePay = 0
-
-
-			# if self.currentTime%365 == 1:
-			# 	for job in self.jobList:
-			# 		job.salary *= 1.02
-
-			###########################################################
-			#
-			#	Pay expenses and once a month make payments to 
-			#	loans/investments
-			#
-			###########################################################
-
-			for expense in self.expenseList:
-				expense.spend()
-
-			# if self.currentDate.day == 1:
-			# 	# #put 1000 in savings account
-			# 	# if self.currentSavings <= 9000:
-			# 	# 	self.currentCash -= 1000
-			# 	# 	self.currentSavings += 1000
-			# 	if self.currentCash > 0:
-			# 		self.investmentList[0].contribute(self.currentCash)
-			# 	# if self.currentCash > 0:
-			# 	# 	self.loanList[0].makePayment(amt=self.currentCash)
-
-
-			###########################################################
-			#
-			# 	Record Current values
-			#
-			#	I feel like I might want to move these into functions
-			#	of some sort. Not really sure how. There are a lot
-			#	of values I'd like to capture (like interest between
-			#	loan payments)
-			#
-			###########################################################
-			self.recordValues()
-			self.resetCurrent(resetTime=0,resetCash=0)
-
-			for loan in self.loanList:
-				loan.principalHistory = hstack([
-					loan.principalHistory,
-					loan.currentPrincipal])
-				loan.accruedInterestHistory = hstack([
-					loan.accruedInterestHistory,
-					loan.currentAccruedInterest])
-				loan.paymentHistory = hstack([
-					loan.paymentHistory,
-					loan.currentPayment])
-
-			for investment in self.investmentList:
-				investment.recordValues()
-				investment.resetCurrent()
+		###########################################################
+		#
+		#	Taxes are paid once a year on 4/15 and a 2% cost of
+		#	living raise is applied each 1/1
+		#
+		###########################################################
 
+
+		if self.calendar.taxDayList[ind]:
+			self.payTaxes('California')
+			self.payTaxes('Federal')
 			for job in self.jobList:
-				job.recordValues()
-				job.resetCurrent()
+				job.currentYearToDatePay = 0
+				job.currentIRAContributions = 0
+				job.current401kContributions = 0
+			if profiler: profiler.mark('payTaxes', 'simScenario')
+
 
-			for expense in self.expenseList:
-				expense.recordValues()
-				expense.resetCurrent()
+		# if self.currentTime%365 == 1:
+		# 	for job in self.jobList:
+		# 		job.salary *= 1.02
+
+		###########################################################
+		#
+		#	Pay expenses and once a month make payments to 
+		#	loans/investments
+		#
+		###########################################################
 
+		for expense in self.expenseList:
+			expense.spend(self.calendar.countList(expense.spendDOM)[ind])
+		if profiler: profiler.mark('spend', 'expense')
+
+		# if self.currentDate.day == 1:
+		# 	# #put 1000 in savings account
+		# 	# if self.currentSavings <= 9000:
+		# 	# 	self.currentCash -= 1000
+		# 	# 	self.currentSavings += 1000
+		# 	if self.currentCash > 0:
+		# 		self.investmentList[0].contribute(self.currentCash)
+		# 	# if self.currentCash > 0:
+		# 	# 	self.loanList[0].makePayment(amt=self.currentCash)
+
+
+		###########################################################
+		#
+		# 	Record Current values
+		#
+		#	I feel like I might want to move these into functions
+		#	of some sort. Not really sure how. There are a lot
+		#	of values I'd like to capture (like interest between
+		#	loan payments)
+		#
+		###########################################################
+		self.recordValues()
+		self.resetCurrent(resetTime=0,resetCash=0)
+		if profiler: profiler.mark('record', 'simScenario')
+
+		self.book.recordValues()
+		self.book.resetInvestments()
+		if profiler: profiler.mark('record', 'accountBook')
+
+		for job in self.jobList:
+			job.recordValues()
+			job.resetCurrent(resetYearToDate=0)
+		if profiler: profiler.mark('record', 'job')
+
+		for expense in self.expenseList:
+			expense.recordValues()
+			expense.resetCurrent()
+		if profiler: profiler.mark('record', 'expense')
+
+		self.historySink.endStep()
+		if profiler: profiler.mark('endStep', 'historySink')
+
+	def finalizeRun(self):
 		###############################################################
 		#
 		# 	Record Final values
 		#
 		###############################################################
+		#the scenario's own values first, so that a run with no steps
+		#fails on them rather than on whichever account is first
+		try:
+			self.recordFinalValues()
+		except ValueError:
+			#leave the accounts holding their own values rather than
+			#reading from this run's account book
+			self.book.unbind()
+			self.historySink.close()
+			raise
+
 		for loan in self.loanList:
 			loan.recordFinalValues()
 
 		for investment in self.investmentList:
 			investment.recordFinalValues()
 
+		self.book.unbind()
+
 		for job in self.jobList:
 			job.recordFinalValues()
 
 		for expense in self.expenseList:
 			expense.recordFinalValues()
 
-		self.recordFinalValues()
+		self.historySink.close()
+
+class scenarioCheckpoint:
+	'''!
+	The full state of a scenario part way through a run: current values
+	of every account, histories so far and each expense's random
+	stream. fork() makes independent copies that can be changed and
+	resumed, so that N what-ifs cost one run up to the checkpoint plus N
+	remainders, e.g.
+
+		scen.initializeRun()
+		scen.advance(365*5)
+		snapshot = scen.checkpoint()
+		branch = snapshot.fork()
+		branch.loanList[0].minimumPayment = 500
+		branch.resume()
+	'''
+	def __init__(self, scen):
+		self.time = scen.currentTime
+		self.scenario = self.copy(scen)
+
+	def copy(self, scen):
+		#the calendar isn't changed by a run, and whatever the sink
+		#shares, e.g. a callback, is shared with every copy
+		memo = {id(scen.calendar): scen.calendar}
+		for x in scen.historySink.shared():
+			memo[id(x)] = x
+		return copy.deepcopy(scen, memo)
+
+	def fork(self):
+		#a new scenario in the checkpointed state. Call its resume() to
+		#finish the run
+		return self.copy(self.scenario)
+
+def fromConfig(config):
+	#build a new simScenario from a dict made by simScenario.getConfig()
+	scen = simScenario()
+	scen.startDate = datetime.date.fromisoformat(config['startDate'])
+	scen.startTime = config['startTime']
+	scen.endTime = config['endTime']
+	scen.timeStep = config['timeStep']
+	scen.initialCash = config['initialCash']
+	scen.taxMonth = config['taxMonth']
+	scen.taxDay = config['taxDay']
+	try:
+		scen.seed = config['seed']
+	except:
+		pass
+	scen.addLoans([
+		accounts.fromConfig(accounts.loan, x) for x in config['loans']])
+	scen.addInvestments([
+		accounts.fromConfig(accounts.investment, x)
+		for x in config['investments']])
+	scen.addJobs([
+		accounts.fromConfig(accounts.job, x) for x in config['jobs']])
+	scen.addExpenses([
+		accounts.fromConfig(accounts.expense, x)
+		for x in config['expenses']])
+	return scen
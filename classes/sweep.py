@@ -0,0 +1,133 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : sweep.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Runs a simScenario over every combination of a set of
+#		parameter axes and returns results indexed by those axes
+#
+###############################################################################
+from numpy import asarray, meshgrid, repeat, concatenate
+from numpy.random import SeedSequence, default_rng
+from concurrent.futures import ProcessPoolExecutor
+import re
+import ensemble
+import simScenario
+
+#parameters are named as they are reached from a simScenario, either
+#'initialCash' or e.g. 'loanList[0].interestRate'
+parameterPattern = re.compile(r'^(\w+)\[(\d+)\]\.(\w+)$')
+
+class sweepResult:
+	resultFields = [
+		'finalCash', 'totalTaxesPaid', 'finalLoanPrincipal',
+		'totalLoanInterest', 'totalLoanPayment', 'finalInvestmentPrincipal',
+		'totalSpend']
+
+	def __init__(self):
+		self.axisNames = []
+		self.axisValues = []
+		self.nPaths = 1
+		#1 if every point ran in a single ensemble, 0 if points were
+		#run separately
+		self.batched = -1
+
+		#each result is shaped (axis 0 x axis 1 x ... x paths), with a
+		#trailing accounts dimension for per account results
+		self.finalCash = []
+		self.totalTaxesPaid = []
+		self.finalLoanPrincipal = []
+		self.totalLoanInterest = []
+		self.totalLoanPayment = []
+		self.finalInvestmentPrincipal = []
+		self.totalSpend = []
+
+	def index(self, axisName, value):
+		#position of value along the axis named axisName
+		axis = self.axisNames.index(axisName)
+		return list(self.axisValues[axis]).index(value)
+
+	def sel(self, field, selection):
+		#slice of result field at the axis values in selection, a dict
+		#from axis name to value. Axes left out are kept whole
+		key = []
+		for axis, axisName in enumerate(self.axisNames):
+			if axisName in selection:
+				key.append(self.index(axisName, selection[axisName]))
+			else:
+				key.append(slice(None))
+		return getattr(self, field)[tuple(key)]
+
+def setParameter(scen, name, value):
+	match = parameterPattern.match(name)
+	if match is None:
+		setattr(scen, name, value)
+	else:
+		account = getattr(scen, match.group(1))[int(match.group(2))]
+		setattr(account, match.group(3), value)
+
+def isBatchable(name):
+	#whether name can vary path by path inside one ensemble run
+	if name == 'initialCash': return True
+	match = parameterPattern.match(name)
+	if match is None: return False
+	return match.group(3) in ensemble.pathParameters.get(match.group(1), [])
+
+def runPoint(config, point, nPaths, seedSequence):
+	#run one sweep point on its own. point is a dict of parameter name
+	#to value, applied to a scenario rebuilt from config
+	scen = simScenario.fromConfig(config)
+	for name in point:
+		setParameter(scen, name, point[name])
+	return scen.propagateEnsemble(nPaths, rng=default_rng(seedSequence))
+
+def runSweep(scen, axes, nPaths=1, seed=None, nWorkers=None):
+	'''!
+	Run scen at every combination of axes, a list of (parameter name,
+	values) pairs, with nPaths Monte Carlo paths per combination. scen
+	itself is not modified. If every parameter can vary by path (see
+	isBatchable()) the whole grid runs as a single ensemble. Otherwise
+	each combination runs separately across nWorkers processes
+	(nWorkers=1 runs them in this process). Returns a sweepResult.
+	'''
+	result = sweepResult()
+	result.axisNames = [axis[0] for axis in axes]
+	result.axisValues = [asarray(axis[1]) for axis in axes]
+	result.nPaths = nPaths
+	shape = tuple(len(values) for values in result.axisValues)
+
+	grids = meshgrid(*result.axisValues, indexing='ij')
+	points = [grid.ravel() for grid in grids]
+	nPoints = len(points[0])
+	seedSequence = SeedSequence(seed)
+
+	if all([isBatchable(name) for name in result.axisNames]):
+		result.batched = 1
+		parameters = {}
+		for name, values in zip(result.axisNames, points):
+			parameters[name] = repeat(values, nPaths)
+		runs = [scen.propagateEnsemble(
+			nPoints*nPaths,
+			rng=default_rng(seedSequence),
+			parameters=parameters)]
+	else:
+		result.batched = 0
+		config = scen.getConfig()
+		args = (
+			[config]*nPoints,
+			[dict(zip(result.axisNames, [values[ind] for values in points]))
+				for ind in range(nPoints)],
+			[nPaths]*nPoints,
+			seedSequence.spawn(nPoints))
+		if nWorkers == 1:
+			runs = list(map(runPoint, *args))
+		else:
+			with ProcessPoolExecutor(nWorkers) as pool:
+				runs = list(pool.map(runPoint, *args))
+
+	for field in result.resultFields:
+		values = concatenate([getattr(run, field) for run in runs])
+		setattr(result, field,
+			values.reshape(shape + (nPaths,) + values.shape[1:]))
+	return result
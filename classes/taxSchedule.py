@@ -0,0 +1,159 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : taxSchedule.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Income tax and FICA schedules by jurisdiction and year, with
+#		cumulative bracket tables so that tax on any income (or array of
+#		incomes) is one searchsorted and a multiply-add
+#
+###############################################################################
+from numpy import array, asarray, broadcast_arrays, cumsum, diff, hstack
+from numpy import maximum, minimum, searchsorted
+
+###############################################################################
+#
+#	Schedule data. brackets are the upper edge of each bracket, rates are
+#	in percent. The top bracket's edge is a large placeholder; incomes
+#	above it are taxed at the top rate
+#
+###############################################################################
+
+scheduleData = {
+	('California', 2018): {
+		'standardDeduction': 8472,
+		'personalExemption': 222,
+		'brackets': [
+			16030, 38002, 59978, 83258, 105224,
+			537500, 644998, 1074996, 1e12],
+		'rates': [
+			1, 2, 4, 6, 8, 9.3,
+			10.3, 11.3, 12.3],
+		'socialSecurityRate': 0,
+		'socialSecurityCap': 0,
+		'medicareRate': 0
+	},
+	('Federal', 2018): {
+		'standardDeduction': 24000,
+		'personalExemption': 0,
+		'brackets': [
+			19050, 77400, 165000, 315000,
+			400000, 600000, 1e12],
+		'rates': [
+			10, 12, 22, 24, 32, 35, 37],
+		'socialSecurityRate': 6.2,
+		'socialSecurityCap': 118500,
+		'medicareRate': 1.45
+	}
+}
+
+class taxSchedule:
+	def __init__(self, brackets, rates, **kwargs):
+		self.jurisdiction = kwargs.get('jurisdiction', -1)
+		self.year = kwargs.get('year', -1)
+		self.standardDeduction = kwargs.get('standardDeduction', 0)
+		#carried for reference only. payTaxes() has never applied it
+		self.personalExemption = kwargs.get('personalExemption', 0)
+		self.socialSecurityRate = kwargs.get('socialSecurityRate', 0)
+		self.socialSecurityCap = kwargs.get('socialSecurityCap', 0)
+		self.medicareRate = kwargs.get('medicareRate', 0)
+
+		self.brackets = array(brackets, dtype=float)
+		self.rates = array(rates, dtype=float)
+
+		#lower edge of each bracket and the total tax owed on income
+		#up to that edge
+		self.lowerEdges = hstack([0, self.brackets[:-1]])
+		self.cumulativeTax = hstack([
+			0, cumsum(diff(self.lowerEdges)*self.rates[:-1]/100)])
+
+	def incomeTax(self, taxableIncome):
+		#taxableIncome may be a scalar or an array. The standard
+		#deduction is applied here
+		income = maximum(asarray(taxableIncome) - self.standardDeduction, 0)
+		#number of bracket edges strictly below income is the bracket
+		#income falls in
+		ind = minimum(
+			searchsorted(self.brackets, income), len(self.brackets) - 1)
+		return self.cumulativeTax[ind] + \
+			(income - self.lowerEdges[ind])*self.rates[ind]/100
+
+	def FICA(self, taxableIncome):
+		#FICA is charged before the standard deduction
+		income = asarray(taxableIncome)
+		return minimum(income, self.socialSecurityCap)* \
+			self.socialSecurityRate/100 + income*self.medicareRate/100
+
+	def tax(self, taxableIncome):
+		#returns (income tax, FICA)
+		return self.incomeTax(taxableIncome), self.FICA(taxableIncome)
+
+loadedSchedules = {}
+
+def loadSchedule(jurisdiction, year):
+	'''!
+	The schedule for jurisdiction in year. If that year isn't in
+	scheduleData the most recent earlier year is used, or the earliest
+	year on record if year is before all of them. Schedules are built
+	once and cached.
+	'''
+	years = sorted([
+		key[1] for key in scheduleData if key[0] == jurisdiction])
+	if len(years) == 0:
+		raise KeyError('No tax schedule for ' + str(jurisdiction))
+	earlier = [x for x in years if x <= year]
+	if len(earlier) > 0: year = earlier[-1]
+	else: year = years[0]
+
+	key = (jurisdiction, year)
+	if key not in loadedSchedules:
+		loadedSchedules[key] = taxSchedule(
+			jurisdiction=jurisdiction, year=year, **scheduleData[key])
+	return loadedSchedules[key]
+
+def taxableIncome(grossIncome, IRAContributions, _401kContributions):
+	#income left after pretax contributions. The limits are applied with
+	#% exactly as payTaxes() always has, so the two always agree
+	return grossIncome - IRAContributions%18500 - _401kContributions%5500
+
+class taxSweepResult:
+	def __init__(self):
+		#each is shaped like the broadcast inputs to taxSweep()
+		self.taxableIncome = -1
+		self.stateTax = -1
+		self.federalTax = -1
+		self.FICA = -1
+		self.totalTax = -1
+		self.afterTaxIncome = -1
+
+def taxSweep(
+	grossIncome, IRAContributions=0, _401kContributions=0,
+	state='California', year=2018):
+	'''!
+	State tax, federal tax and FICA for a household with grossIncome of
+	pay and the given pretax contributions, computed the same way as
+	simScenario.payTaxes() on the tax day. All three inputs are broadcast
+	together, so e.g. grossIncome[:,None] against IRAContributions[None,:]
+	gives a salary x contribution table in one pass. State FICA is added
+	to FICA for completeness, though current state schedules have none.
+	Returns a taxSweepResult.
+	'''
+	grossIncome, IRAContributions, _401kContributions = broadcast_arrays(
+		asarray(grossIncome, dtype=float),
+		asarray(IRAContributions, dtype=float),
+		asarray(_401kContributions, dtype=float))
+	income = taxableIncome(grossIncome, IRAContributions, _401kContributions)
+
+	stateSchedule = loadSchedule(state, year)
+	federalSchedule = loadSchedule('Federal', year)
+
+	result = taxSweepResult()
+	result.taxableIncome = income
+	result.stateTax = stateSchedule.incomeTax(income)
+	result.federalTax = federalSchedule.incomeTax(income)
+	result.FICA = stateSchedule.FICA(income) + federalSchedule.FICA(income)
+	result.totalTax = result.stateTax + result.federalTax + result.FICA
+	result.afterTaxIncome = grossIncome - IRAContributions - \
+		_401kContributions - result.totalTax
+	return result
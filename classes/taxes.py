@@ -8,8 +8,6 @@
 # 
 ###############################################################################
 from numpy import hstack, exp
-from scipy.linalg import norm, inv
-from scipy.integrate import ode
 from datetime import date
 import sys
 sys.path.insert(0, 'util')
@@ -0,0 +1,117 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : accountBook_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for the struct of arrays loan and investment store
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import testScenarios
+from datetime import timedelta
+
+###############################################################################
+#
+#	Create Scenario
+#
+###############################################################################
+
+def buildScenario():
+	return testScenarios.buildScenario(
+		initialCash=50000,
+		loans=[
+			{'initialPrincipal': principal, 'interestRate': rate,
+				'minimumPayment': minimum, 'paymentDOM': DOM}
+			for principal, rate, minimum, DOM in [
+				(9000., 4.5, 300., 1), (2500., 7.2, 120., 15),
+				(400., 3., 60., 31)]],
+		investments=[
+			{'initialPrincipal': principal, 'interestRate': rate}
+			for principal, rate in [(10000., 6.), (2000., 2.5)]])
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_book_matches_accounts():
+	'''!
+	Stepping the book must give the same values as calling accrue() and
+	makePayment() on each account, and the accounts must read their
+	current values from the book while bound.
+	'''
+	scen = buildScenario()
+	reference = buildScenario()
+	scen.initializeRun()
+	reference.currentCash = 0
+	for loan in reference.loanList:
+		loan.currentPrincipal = loan.initialPrincipal
+	for investment in reference.investmentList:
+		investment.currentPrincipal = investment.initialPrincipal
+
+	#the run starts on 1/1, so step ind of its daily calendar ends on
+	#day ind + 1 of the run
+	cash = 0
+	time = 0
+	for day, stepLength in [(14, 13), (15, 1), (31, 16), (1, 1)]:
+		time += stepLength
+		reference.currentDay = day
+		reference.currentStepLength = stepLength
+		for loan in reference.loanList:
+			loan.accrue()
+			loan.makePayment()
+		for investment in reference.investmentList:
+			investment.accrue()
+		scen.book.accrue(stepLength)
+		cash -= scen.book.payLoans(time - 1)
+
+		for loan, expected in zip(scen.loanList, reference.loanList):
+			assert( abs(loan.currentPrincipal - \
+				expected.currentPrincipal) < 1e-9 )
+			assert( abs(loan.currentAccruedInterest - \
+				expected.currentAccruedInterest) < 1e-9 )
+			assert( loan.currentPayment == expected.currentPayment )
+		for investment, expected in zip(
+			scen.investmentList, reference.investmentList):
+			assert( abs(investment.currentPrincipal - \
+				expected.currentPrincipal) < 1e-9 )
+		assert( abs(cash - reference.currentCash) < 1e-9 )
+
+	scen.investmentList[0].currentPrincipal = 1.
+	assert( scen.book.investmentPrincipal[0] == 1. )
+
+def test_book_run():
+	'''!
+	After a run, histories are published to the accounts, current values
+	are copied back, and loans are paid only on their paymentDOM. A loan
+	paid on the 31st skips short months, in the simulation and in its
+	amortization schedule.
+	'''
+	scen = buildScenario()
+	scen.propagate()
+	dates = [scen.startDate + timedelta(int(t)) for t in scen.timeHistory]
+
+	for loan in scen.loanList:
+		assert( loan.book is None )
+		assert( loan.currentPrincipal == loan.finalPrincipal )
+		assert( len(loan.principalHistory) == len(scen.timeHistory) )
+		for ind in loan.paymentHistory.nonzero()[0]:
+			assert( dates[ind].day == loan.paymentDOM )
+
+	loan = scen.loanList[2]
+	schedule = loan.amortize()
+	paid = loan.paymentHistory.nonzero()[0]
+	assert( [dates[ind] for ind in paid] == \
+		schedule.dates.astype(object).tolist() )
+	assert( abs(schedule.totalInterest - \
+		sum(loan.accruedInterestHistory)) < 1e-6 )
+	assert( all([x.day == 31 for x in schedule.dates.astype(object)]) )
+
+	investment = scen.investmentList[0]
+	assert( investment.book is None )
+	assert( investment.currentPrincipal == investment.finalPrincipal )
+	assert( type(investment.currentPrincipal) == float )
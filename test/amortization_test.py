@@ -0,0 +1,158 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : amortization_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for the month stepped loan amortization solver
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import accounts
+import simScenario
+import amortization
+import payoffOptimizer
+from datetime import date, timedelta
+from numpy import array
+
+###############################################################################
+#
+#	Create Scenario
+#
+###############################################################################
+
+scen = simScenario.simScenario()
+scen.startDate = date(2018, 1, 14)
+scen.initialCash = 10000
+scen.endTime = 365*5
+
+loan = accounts.loan()
+loan.initialPrincipal = 12000.
+loan.interestRate = 5.5
+loan.minimumPayment = 250.
+scen.addLoans([loan])
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_amortize_matches_propagate():
+	'''!
+	The payoff date and total interest from loan.amortize() must agree
+	with the daily simulation of the same loan.
+	'''
+	scen.propagate()
+	schedule = loan.amortize()
+
+	paidOff = (loan.principalHistory == 0).argmax()
+	payoffDate = scen.startDate + timedelta(int(scen.timeHistory[paidOff]))
+	assert( schedule.payoffDate == payoffDate )
+	assert( abs(schedule.totalInterest - \
+		sum(loan.accruedInterestHistory)) < 1e-6 )
+	assert( abs(schedule.totalPayment - sum(loan.paymentHistory)) < 1e-6 )
+	assert( schedule.principal[-1] == 0 )
+
+def test_amortize_vectorized():
+	'''!
+	Evaluating several payment levels in one call must give the same
+	answers as evaluating each level on its own. A payment too small to
+	cover interest never pays off.
+	'''
+	extra = array([0., 100., 1000.])
+	schedule = loan.amortize(extraPayment=extra)
+	for ind in range(len(extra)):
+		single = loan.amortize(extraPayment=extra[ind])
+		assert( schedule.monthsToPayoff[ind] == single.monthsToPayoff )
+		assert( abs(schedule.totalInterest[ind] - \
+			single.totalInterest) < 1e-6 )
+	assert( (schedule.monthsToPayoff[1:] < schedule.monthsToPayoff[:-1]).all() )
+
+	never = amortization.amortize(
+		12000., 5.5, 10., date(2018, 1, 1), maxMonths=24)
+	assert( never.monthsToPayoff == -1 )
+	assert( str(never.payoffDate) == 'NaT' )
+
+def test_amortize_loans_payment_dom():
+	'''!
+	Loans paid together must each be paid on their own paymentDOM,
+	exactly as amortize() pays them alone. With no surplus, the loan
+	paid off first has had nothing rolled into it yet.
+	'''
+	start = date(2018, 1, 14)
+	for dom in [1, 28]:
+		together = amortization.amortizeLoans([12000.], [5.5], [250.], 100.,
+			[[0]], start, paymentDOM=dom)
+		alone = amortization.amortize(12000., 5.5, 350., start,
+			paymentDOM=dom)
+		assert( together.payoffDate[0, 0] == alone.payoffDate )
+		assert( abs(together.totalInterest[0, 0] - \
+			alone.totalInterest) < 1e-6 )
+
+	together = amortization.amortizeLoans([3000., 12000.], [6., 4.],
+		[300., 200.], 0., [[0, 1], [1, 0]], start, paymentDOM=[28, 9])
+	alone = amortization.amortize(3000., 6., 300., start, paymentDOM=28)
+	assert( alone.payoffDate.item().day == 28 )
+	assert( (together.payoffDate[:, 0] == alone.payoffDate).all() )
+	assert( (abs(together.totalInterest[:, 0] - alone.totalInterest) \
+		< 1e-6).all() )
+	assert( together.payoffDate[0, 1].item().day == 9 )
+
+	loan.paymentDOM = 28
+	plans = payoffOptimizer.optimizePayoff(scen, 100.)
+	single = loan.amortize(extraPayment=100.)
+	loan.paymentDOM = 1
+	assert( plans['optimal'].payoffDate == single.payoffDate )
+	assert( abs(plans['optimal'].totalInterest - \
+		single.totalInterest) < 1e-6 )
+
+def test_payoff_optimizer():
+	'''!
+	For a single loan, every strategy must reproduce that loan's own
+	amortization with the surplus as extra payment. With several loans,
+	the optimal order can't cost more than avalanche or snowball, and
+	avalanche targets the highest rate first. A scenario with no loans is
+	refused.
+	'''
+	plans = payoffOptimizer.optimizePayoff(scen, 100.)
+	single = loan.amortize(extraPayment=100.)
+	for strategy in plans:
+		assert( abs(plans[strategy].totalInterest - \
+			single.totalInterest) < 1e-6 )
+		assert( plans[strategy].payoffDate == single.payoffDate )
+
+	household = simScenario.simScenario()
+	household.startDate = date(2018, 3, 9)
+	rates = [3.5, 6.8, 4.3, 5.0]
+	principals = [40000., 3500., 7000., 12000.]
+	minimums = [400., 40., 70., 150.]
+	for rate, principal, minimum in zip(rates, principals, minimums):
+		newLoan = accounts.loan()
+		newLoan.interestRate = rate
+		newLoan.initialPrincipal = principal
+		newLoan.minimumPayment = minimum
+		household.addLoans([newLoan])
+
+	totalInterest = 0
+	for eachLoan in household.loanList:
+		totalInterest += eachLoan.amortize().totalInterest
+
+	plans = payoffOptimizer.optimizePayoff(household, 800)
+	assert( list(plans['avalanche'].order) == [1, 3, 2, 0] )
+	assert( list(plans['snowball'].order) == [1, 2, 3, 0] )
+	assert( plans['optimal'].totalInterest <= \
+		plans['avalanche'].totalInterest + 1e-9 )
+	assert( plans['optimal'].totalInterest <= \
+		plans['snowball'].totalInterest + 1e-9 )
+	assert( plans['optimal'].totalInterest < totalInterest )
+	assert( plans['optimal'].payoffDate < \
+		max([x.amortize().payoffDate for x in household.loanList]) )
+
+	try:
+		payoffOptimizer.optimizePayoff(simScenario.simScenario(), 800)
+		assert( False )
+	except ValueError:
+		pass
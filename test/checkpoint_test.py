@@ -0,0 +1,114 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : checkpoint_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for checkpointing a run part way and forking it
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import testScenarios
+import historySink
+import tempfile
+
+###############################################################################
+#
+#	Create Scenario
+#
+###############################################################################
+
+def buildScenario():
+	return testScenarios.buildScenario(
+		endTime=365*8,
+		jobs=[{'payDOM': 20, 'withholding': 2000., 'initialSalary': 90000.}],
+		loans=[{'initialPrincipal': 30000., 'interestRate': 5.,
+			'minimumPayment': 300.}],
+		investments=[{'initialPrincipal': 5000., 'interestRate': 7.}],
+		expenses=[{'mean': 30., 'std': 5., 'spendDOM': -1}])
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_fork_matches_full_run():
+	'''!
+	An unchanged fork of a checkpoint must finish exactly as a run
+	straight through would, random expenses included, however many
+	forks are taken and in whatever order they are resumed.
+	'''
+	reference = buildScenario()
+	reference.seed = 7
+	reference.propagate()
+
+	scen = buildScenario()
+	scen.seed = 7
+	scen.initializeRun()
+	scen.advance(365*5)
+	assert( scen.currentTime == 365*5 )
+	snapshot = scen.checkpoint()
+	first = snapshot.fork()
+	second = snapshot.fork()
+	second.resume()
+	first.resume()
+	scen.resume()
+
+	for branch in [first, second, scen]:
+		assert( (branch.cashHistory == reference.cashHistory).all() )
+		assert( (branch.loanList[0].principalHistory == \
+			reference.loanList[0].principalHistory).all() )
+		assert( branch.expenseList[0].finalSpend == \
+			reference.expenseList[0].finalSpend )
+
+def test_fork_what_if():
+	'''!
+	A change made to a fork must only affect that fork, and only from
+	the checkpoint on.
+	'''
+	scen = buildScenario()
+	scen.initializeRun()
+	scen.advance(365*5)
+	snapshot = scen.checkpoint()
+	nSteps = scen.nextStep
+
+	base = snapshot.fork()
+	base.resume()
+	branch = snapshot.fork()
+	branch.loanList[0].minimumPayment = 600.
+	branch.loanList[0].interestRate = 2.
+	branch.resume()
+
+	basePrincipal = base.loanList[0].principalHistory
+	branchPrincipal = branch.loanList[0].principalHistory
+	assert( (branchPrincipal[:nSteps] == basePrincipal[:nSteps]).all() )
+	assert( branch.loanList[0].finalPrincipal < \
+		base.loanList[0].finalPrincipal )
+	assert( snapshot.scenario.loanList[0].minimumPayment == 300. )
+	assert( base.loanList[0].book is None )
+
+def test_checkpoint_sinks():
+	'''!
+	A callback is shared by every fork. A run recorded to disk can't be
+	checkpointed, since forks would write to the same files.
+	'''
+	records = []
+	scen = buildScenario()
+	scen.historySink = historySink.callbackSink(records.append)
+	scen.initializeRun()
+	scen.advance(365)
+	scen.checkpoint().fork().resume()
+	assert( len(records) == len(scen.calendar) )
+
+	scen = buildScenario()
+	scen.historySink = historySink.diskSink(tempfile.mkdtemp())
+	scen.initializeRun()
+	scen.advance(365)
+	try:
+		scen.checkpoint()
+		assert( False )
+	except ValueError:
+		pass
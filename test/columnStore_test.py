@@ -0,0 +1,109 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : columnStore_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for columnar export and memory mapped import of runs
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import testScenarios
+import historySink
+import columnStore
+from datetime import date, timedelta
+from numpy import memmap
+import tempfile
+
+###############################################################################
+#
+#	Create Scenario
+#
+###############################################################################
+
+def buildScenario():
+	return testScenarios.buildScenario(
+		endTime=365*3,
+		jobs=[{'payDOM': 20, 'withholding': 2000., 'initialSalary': 90000.}],
+		loans=[
+			{'initialPrincipal': principal, 'interestRate': 5.,
+				'minimumPayment': 200.}
+			for principal in [8000., 2000.]],
+		investments=[{'initialPrincipal': 5000., 'interestRate': 7.}],
+		expenses=[{'mean': 30., 'std': 5., 'spendDOM': -1}])
+
+reference = buildScenario()
+reference.propagate()
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_round_trip():
+	'''!
+	Importing an export must give back every history, as memmaps, and
+	the same final values and accounts.
+	'''
+	directory = tempfile.mkdtemp()
+	columnStore.exportScenario(reference, directory)
+	scen = columnStore.importScenario(directory)
+
+	assert( type(scen.cashHistory) == memmap )
+	for (owner, names), (expected, expectedNames) in zip(
+		columnStore.historyOwners(scen),
+		columnStore.historyOwners(reference)):
+		assert( names == expectedNames )
+		for field in owner.historyFields:
+			assert( (getattr(owner, field) == \
+				getattr(expected, field)).all() )
+	assert( scen.finalCash == reference.finalCash )
+	assert( scen.loanList[1].finalPrincipal == \
+		reference.loanList[1].finalPrincipal )
+	assert( scen.getConfig() == reference.getConfig() )
+
+	#exporting an imported scenario over its own files is harmless
+	columnStore.exportScenario(scen, directory)
+	again = columnStore.importScenario(directory)
+	assert( (again.cashHistory == reference.cashHistory).all() )
+
+def test_date_range():
+	'''!
+	Selecting a date range must give the same values as slicing the
+	full history by date, both for one series and a whole import.
+	'''
+	directory = tempfile.mkdtemp()
+	columnStore.exportScenario(reference, directory)
+	archive = columnStore.columnArchive(directory)
+	startDate = date(2019, 2, 1)
+	endDate = date(2019, 6, 30)
+
+	dates = [reference.startDate + timedelta(int(x))
+		for x in reference.timeHistory]
+	inRange = [ind for ind, x in enumerate(dates)
+		if startDate <= x <= endDate]
+	selected = archive.select(
+		'investmentList[0].principalHistory', startDate, endDate)
+	assert( len(selected) == 150 )
+	assert( (selected == reference.investmentList[0]
+		.principalHistory[inRange]).all() )
+
+	scen = columnStore.importScenario(directory, startDate, endDate)
+	assert( (scen.cashHistory == reference.cashHistory[inRange]).all() )
+	assert( scen.finalCash == reference.cashHistory[inRange[-1]] )
+
+def test_disk_sink_import():
+	'''!
+	A run recorded with a diskSink can be imported without exporting it.
+	'''
+	directory = tempfile.mkdtemp()
+	scen = buildScenario()
+	scen.historySink = historySink.diskSink(directory)
+	scen.propagate()
+	loaded = columnStore.importScenario(directory)
+	assert( (loaded.jobList[0].yearToDatePayHistory == \
+		scen.jobList[0].yearToDatePayHistory).all() )
+	assert( loaded.expenseList[0].finalSpend == scen.expenseList[0].finalSpend )
@@ -0,0 +1,212 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : ensemble_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for the vectorized Monte Carlo engine
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import testScenarios
+import simScenario
+import monteCarlo
+import returnModels
+from numpy import array
+from numpy.random import default_rng
+
+###############################################################################
+#
+#	Create Scenario
+#
+###############################################################################
+
+def buildScenario(std):
+	return testScenarios.buildScenario(
+		jobs=[{'payDOM': 16, 'withholding': 1000, 'initialSalary': 150000.}],
+		investments=[{'initialPrincipal': 20000., 'interestRate': 7.}],
+		loans=[
+			{'initialPrincipal': 15000., 'interestRate': 4.5,
+				'minimumPayment': 300.},
+			{'initialPrincipal': 2000., 'interestRate': 6.,
+				'minimumPayment': 250.}],
+		expenses=[
+			{'mean': 2500, 'std': std, 'spendDOM': 1},
+			{'mean': 40, 'std': std/100., 'spendDOM': -1}])
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_ensemble_matches_propagate():
+	'''!
+	With no randomness in the expenses, every path of the ensemble must
+	reproduce a single call to propagate().
+	'''
+	scen = buildScenario(0)
+	scen.propagate()
+	result = scen.propagateEnsemble(4, recordHistory=1)
+
+	for path in range(4):
+		assert( abs(result.finalCash[path] - scen.finalCash) < 1e-6 )
+		assert( abs(result.totalTaxesPaid[path] - \
+			sum(scen.taxesPaidHistory)) < 1e-6 )
+		assert( abs(result.cashHistory[path] - scen.cashHistory).max() \
+			< 1e-6 )
+		assert( abs(result.minCash[path] - \
+			min(scen.initialCash, min(scen.cashHistory))) < 1e-6 )
+		for ind, loan in enumerate(scen.loanList):
+			assert( abs(result.finalLoanPrincipal[path, ind] - \
+				loan.finalPrincipal) < 1e-6 )
+		for ind, investment in enumerate(scen.investmentList):
+			assert( abs(result.finalInvestmentPrincipal[path, ind] - \
+				investment.finalPrincipal) < 1e-6 )
+	assert( (result.timeHistory == scen.timeHistory).all() )
+
+def test_ensemble_accounting():
+	'''!
+	With random expenses, paths differ, but each path must still balance:
+	initial cash plus pay less taxes, loan payments and spend is final cash.
+	'''
+	scen = buildScenario(300)
+	scen.propagate()
+	totalPay = sum(scen.jobList[0].monthlyPayHistory)
+	result = scen.propagateEnsemble(50, rng=default_rng(1))
+
+	assert( result.finalCash.std() > 0 )
+	balance = scen.initialCash + totalPay - result.totalTaxesPaid - \
+		result.totalLoanPayment.sum(axis=1) - result.totalSpend.sum(axis=1)
+	assert( abs(balance - result.finalCash).max() < 1e-6 )
+
+def test_monteCarlo_worker_count():
+	'''!
+	The process pool runner must give the same merged result whatever the
+	number of workers, since each chunk of paths owns its seed. The
+	scenario's accounts all hold back references to it, which the runner
+	must not need to pickle.
+	'''
+	scen = buildScenario(300)
+	serial = monteCarlo.runMonteCarlo(
+		scen, 20, nWorkers=1, seed=42, chunkSize=7, historyStride=30)
+	pooled = monteCarlo.runMonteCarlo(
+		scen, 20, nWorkers=3, seed=42, chunkSize=7, historyStride=30)
+
+	assert( serial.finalCash.shape == (20,) )
+	assert( len(set(serial.finalCash)) == 20 )
+	assert( (serial.finalCash == pooled.finalCash).all() )
+	assert( (serial.totalSpend == pooled.totalSpend).all() )
+	assert( (serial.cashHistory == pooled.cashHistory).all() )
+	assert( serial.cashHistory.shape == \
+		(20, -(-scen.numberOfSteps()//30)) )
+
+	for nPaths, nWorkers, chunkSize in [(0, 1, 7), (20, 0, 7), (20, 1, 0)]:
+		try:
+			monteCarlo.runMonteCarlo(scen, nPaths, nWorkers=nWorkers,
+				chunkSize=chunkSize)
+			assert( False )
+		except ValueError:
+			pass
+
+def test_adaptive_monteCarlo():
+	'''!
+	Adaptive runs must stop at the first batch at which every interval
+	is within tolerance, using the same paths as a fixed size run and
+	whatever the number of workers, or at maxPaths if they never get
+	there.
+	'''
+	scen = buildScenario(300)
+	tolerances = {'finalCash': 250., 'negativeCash': 0.02}
+	results = [monteCarlo.runAdaptive(scen, tolerances, batchSize=100,
+		maxPaths=5000, nWorkers=nWorkers, seed=5) for nWorkers in [1, 3]]
+	result = results[0]
+	assert( result.converged == 1 )
+	assert( result.nPaths < 5000 and result.nPaths%100 == 0 )
+	assert( (result.finalCash == results[1].finalCash).all() )
+	assert( result.intervalWidths == results[1].intervalWidths )
+
+	fixed = monteCarlo.runMonteCarlo(
+		scen, result.nPaths, nWorkers=1, seed=5, chunkSize=100)
+	assert( (result.finalCash == fixed.finalCash).all() )
+	z = 1.959964
+	for nPaths, met in [(result.nPaths, True), (result.nPaths - 100, False)]:
+		width = 2*z*fixed.finalCash[:nPaths].std(ddof=1)/nPaths**0.5
+		assert( (width <= 250.) == met )
+	assert( abs(result.estimates['finalCash'] - fixed.finalCash.mean()) \
+		< 1e-6 )
+	#no path runs out of cash, which takes about z**2/0.02 paths to show
+	assert( result.estimates['negativeCash'] == 0 )
+	assert( result.intervalWidths['negativeCash'] <= 0.02 )
+	assert( result.nPaths > z**2/0.02 )
+
+	capped = monteCarlo.runAdaptive(scen, {'finalCash': 1.}, batchSize=100,
+		maxPaths=250, nWorkers=1, seed=5)
+	assert( capped.converged == 0 )
+	assert( capped.nPaths == 250 )
+	assert( capped.intervalWidths['finalCash'] > 1. )
+
+def test_variance_reduction():
+	'''!
+	Every sampling method must be unbiased and do better than random
+	draws. Net worth moves with the draws exactly as its controls do,
+	so control variates must give the deterministic run's net worth
+	from any paths, and an adaptive run using them must stop after one
+	batch.
+	'''
+	scen = buildScenario(300)
+	investment = scen.investmentList[0]
+	investment.returnModel = returnModels.lognormalReturn(7., 15.)
+
+	#the deterministic run: expenses at their means and the investment
+	#growing at its drift
+	deterministic = simScenario.fromConfig(scen.getConfig())
+	deterministic.investmentList[0].returnModel = None
+	for expense in deterministic.expenseList: expense.std = 0.
+	deterministic.propagate()
+	expected = deterministic.finalCash + \
+		deterministic.investmentList[0].finalPrincipal - \
+		sum([loan.finalPrincipal for loan in deterministic.loanList])
+
+	spread = {}
+	for sampling in ['random', 'antithetic', 'latinHypercube', 'sobol']:
+		means = []
+		for seed in range(10):
+			result = scen.propagateEnsemble(
+				128, rng=default_rng(seed), sampling=sampling)
+			netWorth = result.finalCash + \
+				result.finalInvestmentPrincipal.sum(axis=1) - \
+				result.finalLoanPrincipal.sum(axis=1)
+			means.append(netWorth.mean())
+			mean, error = monteCarlo.controlledMean(
+				netWorth, result.controls)
+			assert( abs(mean - expected) < 1e-3 )
+			assert( error < 1e-3 )
+		means = array(means)
+		spread[sampling] = means.std()
+		assert( abs(means.mean() - expected) < 4*means.std()/10**0.5 )
+	assert( result.controlNames == ['expenseList[0].totalSpend',
+		'expenseList[1].totalSpend', 'investmentList[0].finalPrincipal'] )
+	for sampling in ['antithetic', 'latinHypercube', 'sobol']:
+		assert( spread[sampling] < spread['random']/2 )
+
+	result = monteCarlo.runAdaptive(scen, {'finalNetWorth': 1.},
+		batchSize=64, nWorkers=1, seed=2, sampling='sobol',
+		controlVariates=1)
+	assert( result.converged == 1 )
+	assert( result.nPaths == 64 )
+	assert( abs(result.estimates['finalNetWorth'] - expected) < 1e-3 )
+
+def test_config_round_trip():
+	'''!
+	A scenario rebuilt from its config must propagate to the same result.
+	'''
+	scen = buildScenario(0)
+	copy = simScenario.fromConfig(scen.getConfig())
+	scen.propagate()
+	copy.propagate()
+	assert( copy.getConfig() == scen.getConfig() )
+	assert( copy.finalCash == scen.finalCash )
+
@@ -0,0 +1,66 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : eventEngine_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for the event driven propagator
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import testScenarios
+
+###############################################################################
+#
+#	Create Scenario
+#
+###############################################################################
+
+def buildScenario(dailyExpense):
+	expenses = [{'mean': 2500, 'std': 0, 'spendDOM': 5}]
+	if dailyExpense:
+		expenses.append({'mean': 40, 'std': 0, 'spendDOM': -1})
+	return testScenarios.buildScenario(
+		endTime=365*30,
+		jobs=[{'payDOM': 16, 'withholding': 1000, 'initialSalary': 90000.}],
+		investments=[{'initialPrincipal': 20000., 'interestRate': 7.}],
+		loans=[{'initialPrincipal': 150000., 'interestRate': 4.5,
+			'minimumPayment': 900.}],
+		expenses=expenses)
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_events_match_daily():
+	'''!
+	For deterministic scenarios, jumping between events must end with the
+	same balances as the daily loop, and totals summed over the histories
+	must agree even though the event run records far fewer steps.
+	'''
+	for dailyExpense in [0, 1]:
+		daily = buildScenario(dailyExpense)
+		daily.propagate()
+		events = buildScenario(dailyExpense)
+		events.propagateEvents()
+
+		assert( events.finalTime == daily.finalTime )
+		assert( abs(events.finalCash - daily.finalCash) < 1e-6 )
+		assert( abs(sum(events.taxesPaidHistory) - \
+			sum(daily.taxesPaidHistory)) < 1e-6 )
+		for dailyLoan, eventLoan in zip(daily.loanList, events.loanList):
+			assert( abs(eventLoan.finalPrincipal - \
+				dailyLoan.finalPrincipal) < 1e-6 )
+			assert( abs(sum(eventLoan.accruedInterestHistory) - \
+				sum(dailyLoan.accruedInterestHistory)) < 1e-6 )
+		for dailyInvestment, eventInvestment in \
+			zip(daily.investmentList, events.investmentList):
+			assert( abs(eventInvestment.finalPrincipal - \
+				dailyInvestment.finalPrincipal) < 1e-6 )
+
+		if not dailyExpense:
+			assert( len(events.timeHistory) < len(daily.timeHistory)/5 )
@@ -0,0 +1,139 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : fanChart_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for streaming percentile bands over ensemble paths
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import testScenarios
+import ensemble
+import monteCarlo
+from fanChart import fanChart, quantileSketch
+from numpy import hstack
+from numpy.random import default_rng
+
+###############################################################################
+#
+#	Create Scenario
+#
+###############################################################################
+
+def buildScenario(std):
+	return testScenarios.buildScenario(
+		seed=8,
+		jobs=[{'payDOM': 16, 'withholding': 1000, 'initialSalary': 90000.}],
+		investments=[{'initialPrincipal': 20000., 'interestRate': 7.}],
+		loans=[{'initialPrincipal': 15000., 'interestRate': 4.5,
+			'minimumPayment': 300.}],
+		expenses=[{'mean': 60, 'std': std, 'spendDOM': -1}])
+
+def rankError(values, estimates, percentiles):
+	#largest distance, in fraction of paths, between each estimate and
+	#the rank it should have among values (steps x paths)
+	error = 0
+	for estimate, p in zip(estimates, percentiles):
+		rank = (values < estimate[:, None]).mean(axis=1)
+		error = max(error, abs(rank - p/100.).max())
+	return error
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_sketch():
+	'''!
+	A sketch fed in batches must give percentiles within a small rank
+	error of the exact ones, exact means and stds, and the same answer
+	when built in pieces and merged.
+	'''
+	rng = default_rng(0)
+	percentiles = [1, 5, 50, 95, 99]
+	batches = [rng.lognormal(0., 1., (40, 300)) for ind in range(10)]
+	values = hstack(batches)
+
+	sketch = quantileSketch(40)
+	first = quantileSketch(40)
+	second = quantileSketch(40)
+	for ind, batch in enumerate(batches):
+		sketch.add(0, batch)
+		if ind < 5: first.add(0, batch)
+		else: second.add(0, batch)
+	first.merge(second)
+
+	for estimate in [sketch, first]:
+		assert( rankError(values, estimate.percentile(percentiles),
+			percentiles) < 0.005 )
+		assert( abs(estimate.mean - values.mean(axis=1)).max() < 1e-12 )
+		assert( abs(estimate.std() - \
+			values.std(axis=1, ddof=1)).max() < 1e-12 )
+	assert( (sketch.percentile([0, 100]) == \
+		[values.min(axis=1), values.max(axis=1)]).all() )
+
+	#a few values are kept exactly
+	few = quantileSketch(1)
+	few.add(0, [[3., 1., 2.]])
+	assert( (few.percentile([0, 50, 100])[:, 0] == [1., 2., 3.]).all() )
+
+def test_ensemble_fan_chart():
+	'''!
+	Bands filled while an ensemble runs, a block of steps at a time,
+	must match the percentiles of its recorded histories, and a chart
+	filled by monteCarlo must not depend on the number of workers.
+	'''
+	scen = buildScenario(20.)
+	nPaths = 1000
+	blockValues = ensemble.fanChartBlockValues
+	ensemble.fanChartBlockValues = nPaths*7
+	chart = fanChart(historyStride=3)
+	result = scen.propagateEnsemble(nPaths, recordHistory=1,
+		historyStride=3, fanChart=chart)
+	ensemble.fanChartBlockValues = blockValues
+
+	assert( result.fanChart is chart )
+	assert( chart.nPaths == nPaths )
+	assert( (chart.timeHistory == result.timeHistory).all() )
+	cash = result.cashHistory.T
+	assert( rankError(cash, chart.bands('cash'), chart.percentiles) < 0.01 )
+	assert( abs(chart.mean('cash') - cash.mean(axis=1)).max() < 1e-6 )
+	netWorth = cash + result.investmentPrincipalHistory.sum(axis=2).T - \
+		result.loanPrincipalHistory.sum(axis=2).T
+	assert( rankError(netWorth, chart.bands('netWorth'),
+		chart.percentiles) < 0.01 )
+
+	charts = []
+	for nWorkers in [1, 2]:
+		charts.append(fanChart(historyStride=30))
+		monteCarlo.runMonteCarlo(scen, 500, nWorkers=nWorkers, seed=3,
+			chunkSize=200, fanChart=charts[-1])
+	assert( charts[0].nPaths == 500 )
+	assert( (charts[0].bands('cash') == charts[1].bands('cash')).all() )
+
+def test_scenario_fan_chart():
+	'''!
+	Propagated scenarios are added as one path each, and with no
+	randomness every band is the scenario's own history.
+	'''
+	scen = buildScenario(0.)
+	scen.propagate()
+	chart = fanChart()
+	chart.addScenario(scen)
+	chart.addScenario(scen)
+	assert( chart.nPaths == 2 )
+	for band in chart.bands('cash'):
+		assert( abs(band - scen.cashHistory).max() < 1e-6 )
+	assert( abs(chart.std('netWorth')).max() < 1e-6 )
+
+	other = fanChart(historyStride=2)
+	other.addScenario(scen)
+	try:
+		chart.merge(other)
+		assert( False )
+	except ValueError:
+		pass
@@ -0,0 +1,105 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : goalSeek_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for seeking the parameter value that meets a goal
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import testScenarios
+from datetime import date
+from numpy import searchsorted
+
+###############################################################################
+#
+#	Create Scenario
+#
+###############################################################################
+
+def buildScenario():
+	#rent is due ten days before payday and the loan after it, so the
+	#cash needed up front is the first month's rent
+	return testScenarios.buildScenario(
+		initialCash=0,
+		endTime=365*5,
+		jobs=[{'payDOM': 20, 'withholding': 800., 'initialSalary': 60000.}],
+		loans=[{'initialPrincipal': 5000., 'interestRate': 5.,
+			'minimumPayment': 100.}],
+		expenses=[{'mean': 4000., 'std': 0., 'spendDOM': 10}])
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_stay_above():
+	'''!
+	The least initial cash that keeps cash from going negative is the
+	first month's rent. Trials that go negative must stop
+	early, and the scenario itself must not change.
+	'''
+	scen = buildScenario()
+	result = scen.goalSeek('initialCash', 0., 100000., metric='cash',
+		goal='stay', tolerance=0.5)
+	assert( result.converged == 1 )
+	assert( 0 <= result.value - 4000. <= 0.5 )
+	assert( result.unmetValue < 4000. )
+	assert( result.stepsTaken < result.stepsPossible )
+	assert( scen.initialCash == 0 )
+
+	try:
+		scen.goalSeek('initialCash', 5000., 100000., metric='cash',
+			goal='stay')
+		assert( False )
+	except ValueError:
+		pass
+
+def test_reach():
+	'''!
+	The salary found for cash to reach a target by a date must get there
+	in a full run, and the other end of the final bracket must not.
+	Loans are paid off by raising their minimum payment.
+	'''
+	scen = buildScenario()
+	scen.initialCash = 5000.
+	byDate = date(2021, 1, 1)
+	result = scen.goalSeek('jobList[0].initialSalary', 0., 300000.,
+		metric='cash', target=50000., byDate=byDate, tolerance=1.)
+	assert( result.unmetValue < result.value <= result.unmetValue + 1. )
+
+	byStep = searchsorted(scen.buildCalendar().times,
+		(byDate - scen.startDate).days, side='right')
+	for salary, reached in [
+		(result.metValue, True), (result.unmetValue, False)]:
+		scen.jobList[0].initialSalary = salary
+		scen.propagate()
+		assert( (scen.cashHistory[:byStep] >= 50000.).any() == reached )
+
+	result = scen.goalSeek('loanList[0].minimumPayment', 0., 5000.,
+		metric='loanPrincipal', below=1, byDate=date(2019, 1, 1),
+		tolerance=0.01)
+	scen.loanList[0].minimumPayment = result.value
+	scen.propagate()
+	assert( scen.loanList[0].principalHistory[:365].min() == 0. )
+	assert( 400. < result.value < 440. )
+
+def test_seek_date():
+	'''!
+	The date cash stays non negative from must be the day after it was
+	last negative in a full run.
+	'''
+	scen = buildScenario()
+	scen.initialCash = -20000.
+	found = scen.seekDate(metric='cash')
+	scen.propagate()
+	last = (scen.cashHistory < 0).nonzero()[0][-1]
+	assert( found == scen.calendar.date(last + 1) )
+
+	scen.initialCash = 0.
+	scen.expenseList[0].mean = 9000.
+	assert( scen.seekDate(metric='cash') is None )
@@ -0,0 +1,107 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : historicalReturns_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for the memory mapped historical returns bootstrap
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import accounts
+import simScenario
+import historicalReturns
+from datetime import date
+from numpy import array, cumsum, exp, log, memmap
+from numpy.random import default_rng
+import os
+import pickle
+import tempfile
+
+###############################################################################
+#
+#	Create Dataset
+#
+###############################################################################
+
+directory = tempfile.mkdtemp()
+textFile = os.path.join(directory, 'returns.csv')
+dataFile = os.path.join(directory, 'returns.f8')
+monthlyReturns = [1.2, -0.5, 2.0, 0.3, -1.1, 0.8]
+with open(textFile, 'w') as f:
+	f.write('date,return\n')
+	for ind, value in enumerate(monthlyReturns):
+		f.write('2000-%02d-01,%f\n' % (ind + 1, value))
+historicalReturns.convertReturns(textFile, dataFile, 30., percent=True)
+logReturns = log(1 + array(monthlyReturns)/100.)
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_dataset():
+	'''!
+	The converted file must hold the log returns, mapped rather than
+	read, and be mapped once per process.
+	'''
+	dataset = historicalReturns.loadDataset(dataFile)
+	assert( isinstance(dataset.logReturns, memmap) )
+	assert( abs(dataset.logReturns - logReturns).max() < 1e-12 )
+	assert( dataset.info['startDate'] == '2000-01-01' )
+	assert( historicalReturns.loadDataset(dataFile) is dataset )
+
+def test_bootstrap():
+	'''!
+	With blocks as long as the data every block is the whole history,
+	so growth is known exactly, however the steps are cut and however
+	many calls they are spread over. The model must pickle without its
+	data.
+	'''
+	model = historicalReturns.bootstrapReturn(dataFile, blockLength=6)
+	rng = default_rng(0)
+	logGrowth, state = model.sample([30.]*13, 4, rng)
+	assert( abs(logGrowth[:, :6] - logReturns).max() < 1e-12 )
+	assert( abs(logGrowth[:, 6:12] - logReturns).max() < 1e-12 )
+
+	#daily steps over two calls spread each month evenly over its days
+	first, state = model.sample([1.]*45, 2, rng)
+	second, state = model.sample([1.]*200, 2, rng, state)
+	daily = cumsum(list(first[0]) + list(second[0]))
+	assert( abs(daily[29] - logReturns[0]) < 1e-12 )
+	assert( abs(daily[44] - logReturns[0] - logReturns[1]/2) < 1e-12 )
+	assert( abs(daily[179] - logReturns.sum()) < 1e-12 )
+
+	assert( len(pickle.dumps(model)) < 500 )
+
+def test_bootstrap_scenario():
+	'''!
+	An investment driven by the bootstrap must grow by the history in
+	propagate() and in the ensemble, and random blocks must be drawn
+	from the history.
+	'''
+	scen = simScenario.simScenario()
+	scen.startDate = date(2018, 1, 1)
+	scen.endTime = 359
+	investment = accounts.investment()
+	investment.initialPrincipal = 1000.
+	investment.returnModel = \
+		historicalReturns.bootstrapReturn(dataFile, blockLength=6)
+	scen.addInvestments([investment])
+
+	scen.propagate()
+	expected = 1000.*exp(2*logReturns.sum())
+	assert( abs(investment.finalPrincipal - expected) < 1e-9 )
+	result = scen.propagateEnsemble(3)
+	assert( abs(result.finalInvestmentPrincipal - expected).max() < 1e-9 )
+
+	model = historicalReturns.bootstrapReturn(dataFile, blockLength=2)
+	logGrowth, state = model.sample([30.]*20, 50, default_rng(1))
+	for path in logGrowth:
+		for ind in range(0, 20, 2):
+			start = abs(logReturns[:-1] - path[ind]).argmin()
+			assert( abs(logReturns[start] - path[ind]) < 1e-12 )
+			assert( abs(logReturns[start + 1] - path[ind + 1]) < 1e-12 )
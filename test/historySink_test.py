@@ -0,0 +1,145 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : historySink_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for the memory, null, callback and disk history sinks
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import testScenarios
+import accounts
+import historySink
+import history
+from numpy import fromfile
+import json
+import os
+import tempfile
+
+###############################################################################
+#
+#	Create Scenario
+#
+###############################################################################
+
+def buildScenario():
+	#no spread, so that every run spends the same
+	return testScenarios.buildScenario(
+		jobs=[{'payDOM': 20, 'withholding': 2000., 'initialSalary': 90000.}],
+		loans=[{'initialPrincipal': 8000., 'interestRate': 5.,
+			'minimumPayment': 200.}],
+		investments=[{'initialPrincipal': 5000., 'interestRate': 7.}],
+		expenses=[{'mean': 30., 'std': 0., 'spendDOM': -1}])
+
+def finalValues(scen):
+	return [
+		scen.finalCash, scen.finalTaxesPaid,
+		scen.loanList[0].finalPrincipal,
+		scen.investmentList[0].finalPrincipal,
+		scen.jobList[0].finalYearToDatePay,
+		scen.expenseList[0].finalSpend]
+
+reference = buildScenario()
+reference.propagate()
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_null_sink():
+	'''!
+	Keeping final values only must give the same final values as keeping
+	every step, with empty histories.
+	'''
+	scen = buildScenario()
+	scen.historySink = historySink.nullSink()
+	scen.propagate()
+	assert( finalValues(scen) == finalValues(reference) )
+	assert( len(scen.cashHistory) == 0 )
+	assert( len(scen.loanList[0].principalHistory) == 0 )
+
+def test_callback_sink():
+	'''!
+	The callback must see every step, with the same values the memory
+	sink keeps. The generator must yield the same records.
+	'''
+	records = []
+	scen = buildScenario()
+	scen.historySink = historySink.callbackSink(records.append)
+	scen.propagate()
+	assert( len(records) == len(reference.timeHistory) )
+	assert( [x['cashHistory'] for x in records] == \
+		reference.cashHistory.tolist() )
+	assert( [x['loanList[0].principalHistory'] for x in records] == \
+		reference.loanList[0].principalHistory.tolist() )
+	assert( [x['expenseList[0].spendHistory'] for x in records] == \
+		reference.expenseList[0].spendHistory.tolist() )
+	assert( finalValues(scen) == finalValues(reference) )
+
+	scen = buildScenario()
+	assert( list(scen.propagateRecords()) == records )
+	assert( finalValues(scen) == finalValues(reference) )
+	assert( isinstance(scen.historySink, historySink.memorySink) )
+
+def test_disk_sink():
+	'''!
+	The disk sink must write every series to its own file, described by
+	the manifest, and publish histories as memmaps of those files. A
+	block size smaller than the run exercises the buffered appends.
+	'''
+	directory = tempfile.mkdtemp()
+	scen = buildScenario()
+	scen.historySink = historySink.diskSink(directory, blockSize=100)
+	scen.propagate()
+	assert( finalValues(scen) == finalValues(reference) )
+
+	manifest = json.load(open(os.path.join(directory, 'manifest.json')))
+	assert( manifest['config']['startDate'] == '2018-01-01' )
+	column = manifest['columns']['investmentList[0].principalHistory']
+	assert( column['length'] == len(reference.timeHistory) )
+	values = fromfile(os.path.join(directory, column['file']), dtype='<f8')
+	assert( (values == reference.investmentList[0].principalHistory).all() )
+
+	assert( (scen.cashHistory == reference.cashHistory).all() )
+	assert( (scen.jobList[0].monthlyPayHistory == \
+		reference.jobList[0].monthlyPayHistory).all() )
+	assert( len(manifest['columns']) == \
+		len(scen.historyFields) + len(accounts.job.historyFields) + \
+		len(accounts.loan.historyFields) + \
+		len(accounts.investment.historyFields) + \
+		len(accounts.expense.historyFields) )
+
+def test_no_steps():
+	'''!
+	A run whose endTime is before its first step records nothing, so it
+	must fail rather than report final values nobody recorded, whatever
+	the sink. Accounts must still read their own values afterwards.
+	'''
+	for sink in [historySink.memorySink(), historySink.nullSink()]:
+		scen = buildScenario()
+		scen.endTime = -1
+		scen.historySink = sink
+		try:
+			scen.propagate()
+			assert( False )
+		except ValueError:
+			pass
+		for loan in scen.loanList:
+			assert( loan.book is None )
+			assert( loan.currentPrincipal == loan.initialPrincipal )
+			loan.currentPrincipal = 0.
+			assert( loan.currentPrincipal == 0. )
+
+	table = history.historyTable(['cashHistory'])
+	try:
+		table.last('cashHistory')
+		assert( False )
+	except IndexError:
+		pass
+	table.record([5.])
+	assert( table.last('cashHistory') == 5. )
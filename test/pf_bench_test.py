@@ -0,0 +1,51 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : pf_bench_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for flagging benchmark regressions against a baseline
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+sys.path.insert(0, '../bench')
+import pf_bench
+import json
+import os
+import tempfile
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def writeResults(directory, name, results):
+	#a results file laid out as pf_bench.main() writes it
+	path = os.path.join(directory, name)
+	with open(path, 'w') as f:
+		json.dump({'machine': pf_bench.machineInfo(), 'results': results}, f)
+	return path
+
+def test_compare():
+	'''!
+	A benchmark slower than baseline by more than the threshold must be
+	flagged, one slower by less must pass, and benchmarks on only one
+	side are skipped.
+	'''
+	directory = tempfile.mkdtemp()
+	baseline = pf_bench.loadResults(writeResults(directory, 'baseline.json',
+		{'propagate': 1.0, 'ensemble': 2.0, 'removed': 1.0}))
+	results = pf_bench.loadResults(writeResults(directory, 'results.json',
+		{'propagate': 1.5, 'ensemble': 2.1, 'added': 9.0}))
+
+	regressions = pf_bench.compare(results, baseline, threshold=0.1)
+	assert( [x[0] for x in regressions] == ['propagate'] )
+	name, before, after, ratio = regressions[0]
+	assert( (before, after) == (1.0, 1.5) )
+	assert( abs(ratio - 1.5) < 1e-12 )
+
+	assert( pf_bench.compare(results, baseline, threshold=0.6) == [] )
+	assert( pf_bench.compare(baseline, baseline) == [] )
@@ -12,6 +12,7 @@ sys.path.insert(0, '../util')
 sys.path.insert(0, '../classes')
 import accounts
 import simScenario
+import history
 import pdb
 from datetime import date
 import matplotlib.pyplot as plt
@@ -282,6 +283,104 @@ def test_addLoans():
 			) < 1e-6
 		)
 
+def test_history_length():
+	'''!
+	test_history_length() checks that every history array holds exactly one
+	value per time step of the scenario, and that final values agree with
+	the last recorded entry. It also checks that a history table that was
+	never sized grows to fit every step.
+	'''
+	scen.reset()
+	scen.addJobs([job1,job2])
+	scen.addLoans([loan1,loan2,loan3])
+	scen.addInvestments([investment1, investment2, investment3])
+	scen.addExpenses([exp1,exp2])
+	scen.propagate()
+
+	nSteps = scen.numberOfSteps()
+	assert( len(scen.cashHistory) == nSteps )
+	assert( scen.finalCash == scen.cashHistory[-1] )
+	for obj in scen.loanList + scen.investmentList + \
+		scen.jobList + scen.expenseList:
+		for field in obj.historyFields:
+			assert( len(getattr(obj,field)) == nSteps )
+
+	table = history.historyTable(['xHistory'], capacity=1)
+	for i in range(100): table.record([i])
+	assert( (table.column('xHistory') == range(100)).all() )
+
+def test_tax_day():
+	'''!
+	test_tax_day() checks that taxes are paid on April 15 of every year,
+	including leap years, and that they are charged on the pay earned
+	since the previous tax day.
+	'''
+	scen.reset()
+	scen.addJobs([job1])
+	scen.startDate = date(2019, 6, 1)
+	scen.endTime = 365*3
+	scen.propagate()
+
+	taxSteps = (scen.taxesPaidHistory != 0).nonzero()[0]
+	taxDates = [scen.calendar.date(ind) for ind in taxSteps]
+	assert( taxDates == [date(2020,4,15), date(2021,4,15), date(2022,4,15)] )
+
+	ind = taxSteps[0]
+	paydays = scen.calendar.isDOM(job1.payDOM)[:ind].sum()
+	assert(
+		abs(
+			job1.yearToDatePayHistory[ind - 1] - \
+			job1.initialSalary/12*paydays
+			) < 1e-6
+		)
+	assert( job1.yearToDatePayHistory[ind] == 0 )
+
+	#year to date values must not carry over into a second run
+	taxesPaid = scen.taxesPaidHistory.copy()
+	scen.propagate()
+	assert( (scen.taxesPaidHistory == taxesPaid).all() )
+
+	scen.startDate = date(2018, 1, 1)
+	scen.endTime = 365
+
+def test_seed():
+	'''!
+	test_seed() checks that a seeded scenario spends exactly the same in
+	every run, whatever engine runs it and however the draws are blocked,
+	and that a different seed gives different spending.
+	'''
+	scen.reset()
+	scen.addJobs([job1])
+	scen.addExpenses([exp1,exp2])
+	exp2.spendDOM = 5
+	scen.seed = 2018
+	scen.propagate()
+	spend = [x.spendHistory.copy() for x in scen.expenseList]
+	finalCash = scen.finalCash
+
+	scen.propagateEvents()
+	assert( abs(scen.finalCash - finalCash) < 1e-6 )
+	for expense, expected in zip(scen.expenseList, spend):
+		assert( sum(expense.spendHistory) == sum(expected) )
+
+	#draws made a few at a time must follow the same stream
+	for expense in scen.expenseList:
+		expense.drawBlockSize = 3
+	scen.propagate()
+	for expense, expected in zip(scen.expenseList, spend):
+		assert( (expense.spendHistory == expected).all() )
+		del expense.drawBlockSize
+
+	scen.seed = 2019
+	scen.propagate()
+	assert( (scen.expenseList[0].spendHistory != spend[0]).any() )
+
+	first = scen.propagateEnsemble(10).finalCash
+	assert( (scen.propagateEnsemble(10).finalCash == first).all() )
+
+	scen.seed = None
+	exp2.spendDOM = -1
+
 # def test_withholding():
 # 	scen.reset()
 # 	scen.addJobs([job1,job2])
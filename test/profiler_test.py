@@ -0,0 +1,66 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : profiler_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for per phase profiling of simScenario.step()
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import testScenarios
+from profiler import phaseProfiler
+
+###############################################################################
+#
+#	Create Scenario
+#
+###############################################################################
+
+scen = testScenarios.buildScenario(
+	endTime=365*3,
+	jobs=[{'payDOM': 20, 'withholding': 2000., 'initialSalary': 90000.}],
+	loans=[{'initialPrincipal': 8000., 'interestRate': 5.,
+		'minimumPayment': 200.}],
+	expenses=[{'mean': 30., 'std': 0., 'spendDOM': -1}])
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_profiler():
+	'''!
+	Every phase must be counted once per step, taxes once per tax day,
+	and the callback must see every phase. Profiling must not change the
+	results of a run.
+	'''
+	scen.profiler = None
+	scen.propagate()
+	finalCash = scen.finalCash
+
+	timings = []
+	scen.profiler = phaseProfiler(
+		lambda phase, accountType, seconds: timings.append(seconds))
+	scen.propagate()
+	scen.profiler = None
+	assert( scen.finalCash == finalCash )
+
+	profiler = phaseProfiler()
+	scen.profiler = profiler
+	scen.propagate()
+	scen.profiler = None
+	report = dict(((x['phase'], x['accountType']), x)
+		for x in profiler.report())
+
+	nSteps = len(scen.calendar)
+	assert( report[('accrue', 'loan')]['calls'] == nSteps )
+	assert( report[('spend', 'expense')]['calls'] == nSteps )
+	assert( report[('record', 'job')]['calls'] == nSteps )
+	assert( report[('payTaxes', 'simScenario')]['calls'] == 3 )
+	assert( abs(sum([x['fraction'] for x in report.values()]) - 1) < 1e-9 )
+	assert( len(timings) == sum([x['calls'] for x in report.values()]) )
+	assert( 'payTaxes' in profiler.summary() )
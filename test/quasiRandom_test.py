@@ -0,0 +1,90 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : quasiRandom_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for antithetic, Latin hypercube and Sobol draws
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import quasiRandom
+from statistics import NormalDist
+from numpy import array, linspace, sort, arange
+from numpy.random import default_rng
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_inverse_normal():
+	'''!
+	The inverse normal CDF must match the standard library's, tails
+	included.
+	'''
+	u = linspace(1e-10, 1 - 1e-10, 10001)
+	exact = array([NormalDist().inv_cdf(x) for x in u])
+	assert( abs(quasiRandom.inverseNormal(u) - exact).max() < 1e-8 )
+
+def test_sobol_points():
+	'''!
+	Scrambled Sobol points must be a net: 2**m points put one point in
+	every interval of width 2**-m in each dimension, and the first two
+	dimensions put one point in every square of side 2**-(m/2). A new
+	scramble must give different points.
+	'''
+	rng = default_rng(3)
+	points = quasiRandom.sobolPoints(0, 40, 1024, rng)
+	assert( points.shape == (1024, 40) )
+	assert( (points > 0).all() and (points < 1).all() )
+	for dim in range(40):
+		assert( (sort((points[:, dim]*1024).astype(int)) == \
+			arange(1024)).all() )
+	squares = set(zip((points[:, 0]*32).astype(int),
+		(points[:, 1]*32).astype(int)))
+	assert( len(squares) == 1024 )
+
+	other = quasiRandom.sobolPoints(0, 40, 1024, rng)
+	assert( (other != points).any() )
+
+	try:
+		quasiRandom.sobolPoints(len(quasiRandom.directions()) - 1, 2, 4, rng)
+		assert( False )
+	except ValueError:
+		pass
+
+def test_samplers():
+	'''!
+	Antithetic draws must come in mirrored pairs, Latin hypercube draws
+	must fill every stratum, and Sobol draws that run past the
+	dimensions available must carry on as Latin hypercube draws. Draws
+	not of every path are refused.
+	'''
+	nPaths = 64
+	sampler = quasiRandom.variateSampler(default_rng(0), 'antithetic', nPaths)
+	z = sampler.standard_normal((nPaths, 5))
+	assert( (z[:32] == -z[32:]).all() )
+	u = sampler.random(nPaths)
+	assert( (u[:32] == 1 - u[32:]).all() )
+
+	for method in ['latinHypercube', 'sobol']:
+		sampler = quasiRandom.variateSampler(default_rng(0), method, nPaths)
+		sampler.dimension = len(quasiRandom.directions()) - 2
+		u = sampler.random((nPaths, 2, 3))
+		assert( u.shape == (nPaths, 2, 3) )
+		for column in u.reshape(nPaths, 6).T:
+			assert( (sort((column*nPaths).astype(int)) == \
+				arange(nPaths)).all() )
+		x = sampler.normal(5., 2., nPaths)
+		assert( abs(x.mean() - 5.) < 0.05 )
+		assert( 0 < sampler.integers(1, 10) < 10 )
+
+	try:
+		sampler.standard_normal(nPaths - 1)
+		assert( False )
+	except ValueError:
+		pass
@@ -0,0 +1,113 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : returnModels_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for random investment return models
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import testScenarios
+import simScenario
+import returnModels
+from numpy import exp, log, sqrt
+from numpy.random import default_rng
+
+###############################################################################
+#
+#	Create Scenario
+#
+###############################################################################
+
+def buildScenario(returnModel):
+	return testScenarios.buildScenario(
+		seed=3,
+		investments=[
+			{'initialPrincipal': 10000., 'interestRate': 6.,
+				'returnModel': None if model is None else model.getConfig()}
+			for model in [None, returnModel]])
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_no_volatility():
+	'''!
+	With no volatility a model must grow exactly as interestRate does,
+	in propagate(), propagateEvents() and propagateEnsemble(), and even
+	across ensemble return blocks. A regime switch that happens every
+	day alternates between the two drifts.
+	'''
+	scen = buildScenario(returnModels.lognormalReturn(6., 0.))
+	for run in [scen.propagate, scen.propagateEvents]:
+		run()
+		fixed, modeled = scen.investmentList
+		assert( abs(modeled.finalPrincipal - fixed.finalPrincipal) < 1e-6 )
+		assert( abs(sum(modeled.interestHistory) - \
+			sum(fixed.interestHistory)) < 1e-6 )
+
+	result = scen.propagateEnsemble(5)
+	assert( abs(result.finalInvestmentPrincipal[:, 1] - \
+		fixed.finalPrincipal).max() < 1e-6 )
+
+	alternating = returnModels.regimeSwitchingReturn(
+		[10., 2.], [0., 0.], [[0., 1.], [1., 0.]])
+	scen = buildScenario(alternating)
+	scen.propagate()
+	nSteps = len(scen.calendar)
+	logGrowth = (0.1*(nSteps - nSteps//2) + 0.02*(nSteps//2))/365.
+	assert( abs(scen.investmentList[1].finalPrincipal - \
+		10000.*exp(logGrowth)) < 1e-6 )
+
+def test_lognormal_ensemble():
+	'''!
+	Ensemble paths of a lognormal model must have the mean and spread
+	of log growth that the model implies, and a seeded scenario must
+	draw the same path every run.
+	'''
+	model = returnModels.lognormalReturn(8., 20.)
+	scen = buildScenario(model)
+	nPaths = 4000
+	result = scen.propagateEnsemble(nPaths, rng=default_rng(11))
+	years = scen.numberOfSteps()/365.
+	logGrowth = log(result.finalInvestmentPrincipal[:, 1]/10000.)
+	expectedMean = (0.08 - 0.2**2/2)*years
+	expectedStd = 0.2*sqrt(years)
+	assert( abs(logGrowth.mean() - expectedMean) < \
+		4*expectedStd/sqrt(nPaths) )
+	assert( abs(logGrowth.std()/expectedStd - 1) < 0.05 )
+
+	scen.propagate()
+	first = scen.investmentList[1].principalHistory.copy()
+	scen.propagate()
+	assert( (scen.investmentList[1].principalHistory == first).all() )
+
+def test_regime_switching():
+	'''!
+	Paths drawn a block at a time must carry their regimes from block to
+	block, and a model must survive a config round trip.
+	'''
+	absorbing = returnModels.regimeSwitchingReturn(
+		[12., -8.], [0., 0.], [[0., 1.], [0., 1.]])
+	rng = default_rng(5)
+	first, state = absorbing.sample([1.]*60, 50, rng)
+	assert( (first[:, 0] == 0.12/365).all() )
+	assert( (first[:, 1:] == -0.08/365).all() )
+	second, state = absorbing.sample([7.]*10, 50, rng, state)
+	assert( (state == 1).all() )
+	assert( (abs(second - -0.08*7/365) < 1e-15).all() )
+
+	model = returnModels.regimeSwitchingReturn(
+		[12., -8.], [15., 30.], [[0.99, 0.01], [0.03, 0.97]])
+	scen = buildScenario(model)
+	config = scen.getConfig()
+	copy = simScenario.fromConfig(config)
+	assert( copy.getConfig() == config )
+	assert( copy.investmentList[1].returnModel.transition == \
+		model.transition )
+	assert( copy.investmentList[0].returnModel is None )
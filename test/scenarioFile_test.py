@@ -0,0 +1,137 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : scenarioFile_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for running scenario files headless
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import testScenarios
+import scenarioFile
+import columnStore
+import json
+import os
+import subprocess
+import tempfile
+
+###############################################################################
+#
+#	Create Scenario
+#
+###############################################################################
+
+def buildScenario():
+	return testScenarios.buildScenario(
+		seed=12,
+		jobs=[{'payDOM': 20, 'withholding': 1500., 'initialSalary': 80000.}],
+		loans=[{'name': 'car', 'initialPrincipal': 15000.,
+			'interestRate': 4., 'minimumPayment': 400.}],
+		expenses=[{'mean': 50., 'std': 10., 'spendDOM': -1}])
+
+reference = buildScenario()
+reference.propagate()
+
+#the same scenario as a TOML file, leaving out everything that has a
+#default
+scenarioToml = '''
+startDate = 2018-01-01
+endTime = 730
+initialCash = 10000
+seed = 12
+
+[[jobs]]
+payDOM = 20
+withholding = 1500.0
+initialSalary = 80000.0
+
+[[loans]]
+name = "car"
+initialPrincipal = 15000.0
+interestRate = 4.0
+minimumPayment = 400.0
+
+[[expenses]]
+mean = 50.0
+std = 10.0
+spendDOM = -1
+'''
+
+def writeScenarioFiles(directory):
+	jsonFile = os.path.join(directory, 'household.json')
+	with open(jsonFile, 'w') as f:
+		json.dump(reference.getConfig(), f)
+	tomlFile = os.path.join(directory, 'household.toml')
+	with open(tomlFile, 'w') as f:
+		f.write(scenarioToml)
+	return jsonFile, tomlFile
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_run_files():
+	'''!
+	JSON and TOML files of the same scenario must give the results of
+	propagate(), whether run in this process or across workers, each in
+	its own directory. A file that can't be run is reported without
+	stopping the rest.
+	'''
+	directory = tempfile.mkdtemp()
+	jsonFile, tomlFile = writeScenarioFiles(directory)
+	assert( scenarioFile.loadScenario(tomlFile).getConfig() == \
+		reference.getConfig() )
+
+	paths = [jsonFile, tomlFile, os.path.join(directory, 'missing.json')]
+	for nWorkers in [1, 2]:
+		output = os.path.join(directory, 'output%d' % nWorkers)
+		summaries = scenarioFile.runScenarioFiles(paths, output, nWorkers)
+		for summary in summaries[:2]:
+			assert( summary['finalCash'] == reference.finalCash )
+			assert( summary['loans'][0]['finalPrincipal'] == \
+				reference.loanList[0].finalPrincipal )
+		assert( 'FileNotFoundError' in summaries[2]['error'] )
+		assert( sorted(os.listdir(output)) == ['household', 'household_2'] )
+		with open(os.path.join(output, 'household', 'summary.json')) as f:
+			assert( json.load(f)['finalCash'] == reference.finalCash )
+
+def test_history_and_ensemble():
+	'''!
+	Histories written by a run must import as the scenario's own, and
+	an ensemble summary must hold statistics over its paths.
+	'''
+	directory = tempfile.mkdtemp()
+	jsonFile, tomlFile = writeScenarioFiles(directory)
+	output = os.path.join(directory, 'output')
+	scenarioFile.runScenarioFile(jsonFile, output, history=1)
+	scen = columnStore.importScenario(os.path.join(output, 'history'))
+	assert( (scen.cashHistory == reference.cashHistory).all() )
+
+	summary = scenarioFile.runScenarioFile(tomlFile, output, nPaths=200)
+	assert( summary['nPaths'] == 200 )
+	cash = summary['finalCash']
+	assert( cash['p5'] < cash['p50'] < cash['p95'] )
+	assert( abs(cash['mean'] - reference.finalCash) < 4*cash['std'] )
+
+def test_no_plotting_imports():
+	'''!
+	Running from the command line without --plot must not import
+	matplotlib or scipy.
+	'''
+	directory = tempfile.mkdtemp()
+	jsonFile, tomlFile = writeScenarioFiles(directory)
+	root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+	check = 'import sys; sys.path.insert(0, sys.argv[1]); import main; ' + \
+		'main.main(sys.argv[2:]); ' + \
+		'print(sorted(set(["matplotlib", "scipy"]) & set(sys.modules)))'
+	output = subprocess.run(
+		[sys.executable, '-c', check, root, jsonFile,
+			'--output', os.path.join(directory, 'output')],
+		capture_output=True, text=True)
+	assert( output.returncode == 0 )
+	assert( output.stdout.strip().split('\n')[-1] == '[]' )
@@ -0,0 +1,128 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : simCalendar_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for the run calendar and for weekly and monthly steps
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import testScenarios
+import simScenario
+from simCalendar import simCalendar
+from datetime import date
+from numpy import arange, sqrt
+
+###############################################################################
+#
+#	Create Scenario
+#
+###############################################################################
+
+def buildScenario(timeStep, endTime, std=0.):
+	#the job is paid before the tax date, so a step holding both is
+	#taxed on the same pay as the daily run. The loan is never paid
+	#off, so every payment is the minimum
+	return testScenarios.buildScenario(
+		endTime=endTime,
+		timeStep=timeStep,
+		jobs=[{'payDOM': 10, 'withholding': 1500., 'initialSalary': 90000.}],
+		investments=[{'initialPrincipal': 20000., 'interestRate': 7.}],
+		loans=[{'initialPrincipal': 150000., 'interestRate': 4.5,
+			'minimumPayment': 900.}],
+		expenses=[
+			{'mean': mean, 'std': std, 'spendDOM': spendDOM}
+			for spendDOM, mean in [(5, 2500.), (-1, 40.)]])
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_counts():
+	'''!
+	Counts of a day of month over steps of any length must add up to
+	the count over the same days one at a time, and the tax date must be
+	found in whichever step holds it. Monthly steps end on the start's
+	day of month, or the end of shorter months.
+	'''
+	daily = simCalendar(date(2018, 1, 1), arange(1, 400))
+	weekly = simCalendar(date(2018, 1, 1), arange(7, 400, 7), startTime=0)
+	nDays = weekly.times[-1]
+	for dom in [-1, 1, 15, 31]:
+		assert( (daily.count(dom) == daily.isDOM(dom)).all() )
+		assert( daily.count(dom)[:nDays].sum() == weekly.count(dom).sum() )
+	assert( (weekly.stepLength == 7).all() )
+	assert( weekly.isTaxDay.sum() == 1 )
+	assert( weekly.date(weekly.isTaxDay.nonzero()[0][0]) == date(2018, 4, 16) )
+
+	scen = simScenario.simScenario()
+	scen.startDate = date(2019, 1, 31)
+	scen.endTime = 200
+	scen.timeStep = 'monthly'
+	calendar = scen.buildCalendar()
+	assert( len(calendar) == scen.numberOfSteps() == 7 )
+	assert( [calendar.date(ind) for ind in range(3)] == \
+		[date(2019, 2, 28), date(2019, 3, 31), date(2019, 4, 30)] )
+	assert( calendar.stepLength[0] == 28 )
+	assert( calendar.taxDayList[:3] == [False, False, True] )
+
+def test_coarse_steps():
+	'''!
+	Weekly and monthly runs must move the same cash as a daily run over
+	the same days, with pay and taxes counted on the right steps, and
+	grow investments the same. Loans pay the same, but accrue interest
+	on each step's payments until its end, so their balances are only
+	close. The ensemble must give the same results as propagate().
+	'''
+	for timeStep, endTime in [(7, 7*52 - 1), ('monthly', 364)]:
+		daily = buildScenario(1, endTime)
+		daily.propagate()
+		coarse = buildScenario(timeStep, endTime)
+		coarse.propagate()
+
+		assert( coarse.calendar.timeList[-1] == daily.calendar.timeList[-1] )
+		assert( len(coarse.calendar) < len(daily.calendar)/6 )
+		assert( abs(coarse.finalCash - daily.finalCash) < 1e-6 )
+		assert( abs(sum(coarse.taxesPaidHistory) - \
+			sum(daily.taxesPaidHistory)) < 1e-6 )
+		assert( abs(sum(coarse.jobList[0].monthlyPayHistory) - \
+			sum(daily.jobList[0].monthlyPayHistory)) < 1e-6 )
+		assert( coarse.jobList[0].finalWithheldTax == \
+			daily.jobList[0].finalWithheldTax )
+		for coarseExpense, dailyExpense in zip(
+			coarse.expenseList, daily.expenseList):
+			assert( abs(sum(coarseExpense.spendHistory) - \
+				sum(dailyExpense.spendHistory)) < 1e-6 )
+		assert( abs(coarse.investmentList[0].finalPrincipal/ \
+			daily.investmentList[0].finalPrincipal - 1) < 1e-12 )
+		assert( sum(coarse.loanList[0].paymentHistory) == \
+			sum(daily.loanList[0].paymentHistory) )
+		assert( abs(coarse.loanList[0].finalPrincipal/ \
+			daily.loanList[0].finalPrincipal - 1) < 1e-3 )
+
+		result = coarse.propagateEnsemble(3)
+		assert( abs(result.finalCash - coarse.finalCash).max() < 1e-6 )
+		assert( abs(result.finalLoanPrincipal[:, 0] - \
+			coarse.loanList[0].finalPrincipal).max() < 1e-6 )
+
+def test_coarse_spread():
+	'''!
+	Daily spending summed over a week must have the spread of the daily
+	draws it replaces, in propagate() and in the ensemble.
+	'''
+	scen = buildScenario(7, 7*52 - 1, std=10.)
+	nDays = 7*52
+	result = scen.propagateEnsemble(4000)
+	expectedStd = 10.*sqrt(nDays)
+	assert( abs(result.totalSpend[:, 1].std()/expectedStd - 1) < 0.05 )
+	assert( abs(result.totalSpend[:, 1].mean() - 40.*nDays) < \
+		4*expectedStd/sqrt(4000) )
+
+	scen.propagate()
+	food = scen.expenseList[1].spendHistory
+	assert( abs((food - 40.*7).std()/(10.*sqrt(7)) - 1) < 0.3 )
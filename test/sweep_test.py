@@ -0,0 +1,85 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : sweep_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for parameter sweeps
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import testScenarios
+import sweep
+
+###############################################################################
+#
+#	Create Scenario
+#
+###############################################################################
+
+def buildScenario():
+	return testScenarios.buildScenario(
+		jobs=[{'payDOM': 20, 'withholding': 1500, 'initialSalary': 95000.}],
+		loans=[{'initialPrincipal': 15000., 'interestRate': 4.5,
+			'minimumPayment': 300.}],
+		expenses=[{'mean': 2500, 'std': 0, 'spendDOM': 1}])
+
+def propagatePoint(point):
+	scen = buildScenario()
+	for name in point:
+		sweep.setParameter(scen, name, point[name])
+	scen.propagate()
+	return scen
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_batched_sweep():
+	'''!
+	A grid over parameters that can vary by path runs as one ensemble,
+	and every cell must match propagating that point on its own.
+	'''
+	scen = buildScenario()
+	axes = [
+		('initialCash', [0., 5000.]),
+		('loanList[0].interestRate', [3., 6., 9.]),
+		('jobList[0].initialSalary', [60000., 250000.])]
+	result = sweep.runSweep(scen, axes)
+
+	assert( result.batched == 1 )
+	assert( result.finalCash.shape == (2, 3, 2, 1) )
+	assert( result.finalLoanPrincipal.shape == (2, 3, 2, 1, 1) )
+	assert( scen.loanList[0].interestRate == 4.5 )
+	for cash in axes[0][1]:
+		for rate in axes[1][1]:
+			for salary in axes[2][1]:
+				point = dict(zip(result.axisNames, [cash, rate, salary]))
+				single = propagatePoint(point)
+				assert( abs(result.sel('finalCash', point)[0] - \
+					single.finalCash) < 1e-6 )
+				assert( abs(result.sel('finalLoanPrincipal', point)[0,0] - \
+					single.loanList[0].finalPrincipal) < 1e-6 )
+
+def test_unbatched_sweep():
+	'''!
+	Parameters that change the calendar can't vary by path, so the points
+	are run separately. Results must still line up with the axes.
+	'''
+	scen = buildScenario()
+	axes = [
+		('jobList[0].payDOM', [5, 20]),
+		('endTime', [365, 500])]
+	result = sweep.runSweep(scen, axes, nWorkers=1)
+
+	assert( result.batched == 0 )
+	for payDOM in axes[0][1]:
+		for endTime in axes[1][1]:
+			point = {'jobList[0].payDOM': payDOM, 'endTime': endTime}
+			single = propagatePoint(point)
+			assert( abs(result.sel('finalCash', point)[0] - \
+				single.finalCash) < 1e-6 )
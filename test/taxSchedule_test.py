@@ -0,0 +1,110 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : taxSchedule_test.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Tests for the compiled tax schedules
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import taxSchedule
+import accounts
+import simScenario
+from datetime import date
+from numpy import array, hstack, linspace
+
+###############################################################################
+#
+#	Reference implementation. This is the bracket loop payTaxes() used
+#	before schedules were compiled
+#
+###############################################################################
+
+def referenceTax(dollarAmt, percent, standardDeduction, taxableIncome):
+	dollarAmt = array(dollarAmt)
+	percent = array(percent)
+	taxableIncome -= standardDeduction
+	if taxableIncome < 0: taxableIncome = 0
+	ind = dollarAmt < taxableIncome
+	if sum(ind) > 0:
+		lowerBrackets = \
+		sum((dollarAmt[ind] -hstack([0,dollarAmt[ind][0:-1]]))*percent[ind]/100)
+		highestAmount = dollarAmt[ind][-1]
+		highestPercent = percent[sum(ind)]
+		highestBracket = (taxableIncome - highestAmount)*highestPercent/100
+	else:
+		highestBracket = taxableIncome*percent[0]/100
+		lowerBrackets = 0
+	return highestBracket + lowerBrackets
+
+###############################################################################
+#
+#	Run tests
+#
+###############################################################################
+
+def test_schedule_matches_reference():
+	'''!
+	Tax from the cumulative tables must match the bracket loop for incomes
+	on, between and far beyond the bracket edges, evaluated as one array.
+	'''
+	for jurisdiction in ['California', 'Federal']:
+		data = taxSchedule.scheduleData[(jurisdiction, 2018)]
+		schedule = taxSchedule.loadSchedule(jurisdiction, 2018)
+		incomes = hstack([
+			linspace(0, 2e6, 2001),
+			array(data['brackets'][:-1]) + data['standardDeduction']])
+		tax = schedule.incomeTax(incomes)
+		for ind, income in enumerate(incomes):
+			expected = referenceTax(
+				data['brackets'], data['rates'],
+				data['standardDeduction'], income)
+			assert( abs(tax[ind] - expected) < 1e-6 )
+
+	federal = taxSchedule.loadSchedule('Federal', 2018)
+	assert( abs(federal.FICA(50000) - (50000*0.062 + 50000*0.0145)) < 1e-9 )
+	assert( abs(federal.FICA(2e5) - (118500*0.062 + 2e5*0.0145)) < 1e-9 )
+
+def test_load_schedule_year():
+	'''!
+	Years without their own schedule fall back to the nearest earlier year,
+	or the earliest year on record.
+	'''
+	assert( taxSchedule.loadSchedule('Federal', 2025).year == 2018 )
+	assert( taxSchedule.loadSchedule('Federal', 2001).year == 2018 )
+	assert( taxSchedule.loadSchedule('Federal', 2018) is \
+		taxSchedule.loadSchedule('Federal', 2019) )
+
+def test_sweep_matches_payTaxes():
+	'''!
+	Every cell of a salary x contribution sweep must match what payTaxes()
+	charges a job with that year to date pay and those contributions.
+	'''
+	salaries = linspace(20000, 400000, 7)
+	IRA = array([0., 3000., 5500.])
+	sweep = taxSchedule.taxSweep(salaries[:,None], IRA[None,:], 12000.)
+	assert( sweep.federalTax.shape == (7, 3) )
+
+	scen = simScenario.simScenario()
+	scen.startDate = date(2019, 1, 1)
+	scen.currentTime = 104
+	scen.currentCash = 0
+	job = accounts.job()
+	scen.addJobs([job])
+	for i, salary in enumerate(salaries):
+		for j, contribution in enumerate(IRA):
+			job.currentYearToDatePay = salary
+			job.currentIRAContributions = contribution
+			job.current401kContributions = 12000.
+			scen.currentTaxesPaid = 0
+			scen.payTaxes('California')
+			stateTax = scen.currentTaxBill
+			scen.payTaxes('Federal')
+			assert( abs(sweep.stateTax[i,j] - stateTax) < 1e-9 )
+			assert( abs(sweep.federalTax[i,j] - scen.currentTaxBill) < 1e-9 )
+			assert( abs(sweep.FICA[i,j] - scen.currentFICABill) < 1e-9 )
+			assert( abs(sweep.totalTax[i,j] - scen.currentTaxesPaid) < 1e-9 )
+
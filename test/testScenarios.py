@@ -0,0 +1,40 @@
+#! /usr/bin/env python3
+###############################################################################
+#
+#	Title   : testScenarios.py
+#	Author  : Matt Muszynski
+#	Date    : 10/18/26
+#	Synopsis: Builds the scenarios the tests run, so that each test file
+#		only gives what its scenario has
+#
+###############################################################################
+import sys
+sys.path.insert(0, '../util')
+sys.path.insert(0, '../classes')
+import simScenario
+from scenarioFile import scenarioDefaults
+
+#what a test scenario has unless it says otherwise, on top of
+#scenarioFile.scenarioDefaults
+testDefaults = {
+	'startDate': '2018-01-01',
+	'initialCash': 10000,
+	'endTime': 365*2
+}
+
+def buildScenario(**config):
+	'''!
+	A scenario from config, laid out as simScenario.getConfig() writes
+	it, e.g.
+
+		buildScenario(endTime=365*3,
+			jobs=[{'payDOM': 20, 'initialSalary': 90000.}],
+			loans=[{'initialPrincipal': 8000., 'minimumPayment': 200.}])
+
+	Anything left out comes from testDefaults, then scenarioDefaults,
+	and accounts get their class defaults for fields they leave out.
+	'''
+	full = dict(scenarioDefaults)
+	full.update(testDefaults)
+	full.update(config)
+	return simScenario.fromConfig(full)